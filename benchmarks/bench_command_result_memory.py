@@ -0,0 +1,105 @@
+"""
+Benchmark de memoria por ``CommandResult``.
+
+Compara el dataclass original (que siempre conserva ``output_lines``) con
+el ``CommandResult`` compacto, sin líneas y con líneas en un
+``OutputBuffer`` compartido.
+
+Uso:
+    python benchmarks/bench_command_result_memory.py [--devices 2000] [--params 20]
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+import argparse
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.models.command_result import CommandResult  # noqa: E402
+from src.models.output_buffer import OutputBuffer  # noqa: E402
+
+
+@dataclass
+class LegacyCommandResult:
+    """Copia del modelo original basado en dataclass."""
+    device_name: str
+    parameter: str
+    output_lines: List[str]
+    line_count: int
+    success: bool
+    error_message: str = ""
+
+
+PARAMETERS = ["interface", "vlan", "bgp", "ospf", "shutdown", "description", "ip address"]
+
+
+def build_outputs(devices: int, params: int, seed: int = 7):
+    """Genera (dispositivo, parámetro, salida) con salidas casi idénticas entre equipos."""
+    rng = random.Random(seed)
+    for d in range(devices):
+        # Los switches de acceso comparten plantilla: muchas salidas se repiten
+        template = rng.randint(0, 9)
+        for p in range(params):
+            param = PARAMETERS[p % len(PARAMETERS)] + str(p // len(PARAMETERS) or "")
+            count = 5 + (p * 7 + template) % 40
+            lines = [f" {param} GigabitEthernet1/0/{i} template-{template}" for i in range(count)]
+            yield f"sw-access-{d:05d}", param, "\n".join(lines)
+
+
+def measure(factory, devices: int, params: int):
+    """Retorna (bytes por resultado, resultados) creando todos los resultados."""
+    inputs = list(build_outputs(devices, params))
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    results = [factory(name, param, output) for name, param, output in inputs]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / len(results), results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=2000)
+    parser.add_argument("--params", type=int, default=20)
+    args = parser.parse_args()
+    
+    # Cada factoría recibe la salida del comando tal como la recibe SSHService
+    def legacy(name, param, output):
+        lines = output.split("\n")
+        return LegacyCommandResult(name, param, lines, len(lines), True)
+    
+    def compact(name, param, output):
+        return CommandResult(name, param, None, output.count("\n") + 1, True)
+    
+    buffer = OutputBuffer(compress=True)
+    
+    def compact_buffer(name, param, output):
+        lines = output.split("\n")
+        return CommandResult(name, param, lines, len(lines), True, buffer=buffer)
+    
+    cases = [
+        ("dataclass original (con líneas)", legacy),
+        ("CommandResult compacto", compact),
+        ("CommandResult + OutputBuffer", compact_buffer),
+    ]
+    
+    total = args.devices * args.params
+    print(f"Resultados: {total} ({args.devices} dispositivos × {args.params} parámetros)\n")
+    print(f"{'Modelo':<36}{'Bytes/resultado':>16}{'Total (MB)':>12}")
+    print("-" * 64)
+    
+    for name, factory in cases:
+        per_result, results = measure(factory, args.devices, args.params)
+        print(f"{name:<36}{per_result:>16.0f}{per_result * total / 1e6:>12.1f}")
+        del results
+    
+    print(f"\nOutputBuffer: {buffer.block_count} bloques distintos, "
+          f"{buffer.size_bytes / 1e6:.2f} MB comprimidos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Benchmark del índice jerárquico de la configuración (consultas por sección).
+
+Construye el índice de una configuración sintética grande y mide la
+latencia de cada tipo de consulta: texto, regex, sección y sección
+anidada. Como referencia, mide también una pasada lineal con
+``MultiPatternMatcher`` por consulta, que es lo que costaría evaluar cada
+parámetro por separado sobre la configuración.
+
+Antes de medir comprueba que el índice da las mismas líneas que aplicar
+cada patrón línea a línea con ``re.search`` sobre configuraciones con
+muchas líneas indentadas seguidas (coincidencias que podrían cruzar el
+salto de línea); si no, termina con error.
+
+Uso:
+    python benchmarks/bench_config_index.py [--interfaces 5000]
+"""
+from pathlib import Path
+import argparse
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.config_index import ConfigIndex, match_parameters  # noqa: E402
+from src.services.config_matcher import MultiPatternMatcher  # noqa: E402
+from src.services.output_filter import OutputFilter  # noqa: E402
+
+QUERIES = [
+    ("texto", "switchport access vlan 10"),
+    ("regex", r"^ ip address 10\.\d+\.\d+\.1 "),
+    ("sección", "interface Vlan >> ip helper-address"),
+    ("sección anidada", "router bgp >> address-family ipv4 vrf >> neighbor .* activate"),
+    ("sección (cabecera frecuente)", "interface >> ^ shutdown"),
+]
+
+
+# Patrones que pueden empezar en el salto de línea anterior o mirar la línea vecina
+CHECK_PATTERNS = [
+    r"\s+no", r"\s+", r"\s*\S", r"^\s", r"\s$", r"$\s*", r"\n", r"no\s",
+    r"(?<=\s)no", r"s(?=\s)", r"[^a-z]+", r"\bno\b", r"^$", r"x*", r"\A ", r"shutdown\Z", "[",
+]
+CHECK_LINES = [
+    "interface Gi1", " no ip address", " no shutdown", "  no cdp enable", " description x",
+    "router bgp 1", " neighbor 10.0.0.1", "  no activate", "!", "no service pad", "",
+]
+
+
+def check_equivalence(configs: int = 2000, seed: int = 7) -> bool:
+    """Compara el índice con ``re.search`` línea a línea; retorna False al primer desacuerdo."""
+    rng = random.Random(seed)
+    for _ in range(configs):
+        lines = [rng.choice(CHECK_LINES) for _ in range(rng.randint(0, 15))]
+        index = ConfigIndex(lines)
+        for pattern in CHECK_PATTERNS:
+            regex = MultiPatternMatcher._compile(pattern)
+            expected = [i for i, line in enumerate(lines) if regex.search(line)]
+            if index.search(pattern) != expected:
+                print(f"✗ {pattern!r} sobre {lines}: {index.search(pattern)} ≠ {expected}")
+                return False
+    
+    # Una consulta por sección no debe alterar los conteos de los parámetros planos
+    lines = ["interface Gi1", " no ip address", " no shutdown", "interface Gi2", " no ip address", " no shutdown"]
+    counts = [count for count, _ in match_parameters([r"interface >> \s+no", r"\s+no"], lines)]
+    if counts != [4, 4]:
+        print(f"✗ interface >> \\s+no / \\s+no: {counts} ≠ [4, 4]")
+        return False
+    return True
+
+
+def device_config(interfaces: int) -> str:
+    """Configuración sintética de un switch de distribución."""
+    lines = ["Building configuration...", "!", "hostname dist-01", "!"]
+    for i in range(interfaces):
+        lines += [
+            f"interface GigabitEthernet{i // 48 + 1}/0/{i % 48}",
+            f" description acceso-{i}",
+            " switchport mode access",
+            f" switchport access vlan {10 + i % 4}",
+            " shutdown" if i % 5 == 0 else " no shutdown",
+            "!",
+        ]
+    for vlan in range(interfaces // 10):
+        lines += [
+            f"interface Vlan{vlan}",
+            f" ip address 10.{vlan // 256}.{vlan % 256}.1 255.255.255.0",
+            " ip helper-address 10.255.0.10",
+            "!",
+        ]
+    lines.append("router bgp 65000")
+    for vrf in range(interfaces // 50):
+        lines += [
+            f" address-family ipv4 vrf cliente-{vrf}",
+            f"  neighbor 10.{vrf}.0.2 remote-as 650{vrf % 100:02d}",
+            f"  neighbor 10.{vrf}.0.2 activate",
+            " exit-address-family",
+        ]
+    lines += ["!", "end"]
+    return "\n".join(lines)
+
+
+def timed_us(func, repeat: int) -> float:
+    """Mediana en microsegundos."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1e6)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--interfaces", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    
+    if not check_equivalence():
+        return 1
+    print("✓ El índice da las mismas líneas que re.search línea a línea\n")
+    
+    output_filter = OutputFilter()
+    config = device_config(args.interfaces)
+    lines = list(output_filter.iter_lines(config))
+    
+    start = time.perf_counter()
+    index = ConfigIndex(lines)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"Configuración: {len(lines)} líneas · índice construido en {build_ms:.1f} ms\n")
+    
+    print(f"{'Consulta':<32}{'Líneas':>8}{'1ª (µs)':>10}{'Repetida (µs)':>15}{'Pasada lineal (µs)':>20}")
+    print("-" * 85)
+    for name, query in QUERIES:
+        # La primera consulta de cada patrón busca en el texto; las siguientes usan la memoria
+        fresh_us = timed_us(lambda: ConfigIndex.query(_fresh_copy(index), query), args.repeat)
+        count = index.count(query)
+        cached_us = timed_us(lambda: index.query(query), args.repeat)
+        if ">>" in query:
+            linear = "-"
+        else:
+            matcher = MultiPatternMatcher([query])
+            linear = f"{timed_us(lambda: matcher.count_matches(lines), args.repeat):,.0f}"
+        print(f"{name:<32}{count:>8}{fresh_us:>10,.0f}{cached_us:>15,.1f}{linear:>20}")
+    
+    return 0
+
+
+def _fresh_copy(index: ConfigIndex) -> ConfigIndex:
+    """El mismo índice sin las búsquedas ya memorizadas."""
+    copy = ConfigIndex.__new__(ConfigIndex)
+    copy.__dict__.update(index.__dict__)
+    copy._matches = {}
+    return copy
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Benchmark de la lectura del inventario.
+
+Compara el lector original (``pd.read_excel`` + ``iterrows``) con
+``InventoryLoader`` en modo streaming, con su caché y con inventarios
+CSV/JSONL, sobre un inventario sintético.
+
+Uso:
+    python benchmarks/bench_inventory_loader.py [--rows 50000]
+
+El lector original solo se mide si pandas está instalado.
+"""
+from pathlib import Path
+import argparse
+import csv
+import json
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config.constants import EXCEL_COLUMNS, EXCEL_SHEET_NAME  # noqa: E402
+from src.models.device import Device  # noqa: E402
+from src.services.inventory_loader import InventoryLoader  # noqa: E402
+
+
+def legacy_read_devices(path: Path):
+    """Implementación original basada en pandas."""
+    import pandas as pd
+    
+    df = pd.read_excel(path, sheet_name=EXCEL_SHEET_NAME)
+    devices = []
+    for _, row in df.iterrows():
+        if pd.isna(row['Name']) or row['Name'] == '':
+            continue
+        devices.append(Device.from_dict(row.to_dict()))
+    return devices
+
+
+def build_rows(num_rows: int):
+    """Genera filas de inventario sintéticas."""
+    for i in range(num_rows):
+        yield (
+            f"sw-{i:06d}.example.net",
+            "netops",
+            f"Secret{i % 97}!",
+            "interface, vlan, router bgp, ip address",
+        )
+
+
+def write_inventories(directory: Path, num_rows: int):
+    """Escribe el mismo inventario en xlsx, csv y jsonl."""
+    from openpyxl import Workbook
+    
+    xlsx_path = directory / "inventory.xlsx"
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(EXCEL_SHEET_NAME)
+    ws.append(EXCEL_COLUMNS)
+    for row in build_rows(num_rows):
+        ws.append(row)
+    wb.save(xlsx_path)
+    
+    csv_path = directory / "inventory.csv"
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(EXCEL_COLUMNS)
+        writer.writerows(build_rows(num_rows))
+    
+    jsonl_path = directory / "inventory.jsonl"
+    with open(jsonl_path, "w", encoding="utf-8") as f:
+        for row in build_rows(num_rows):
+            f.write(json.dumps(dict(zip(EXCEL_COLUMNS, row))) + "\n")
+    
+    return xlsx_path, csv_path, jsonl_path
+
+
+def measure(func) -> tuple:
+    """Retorna (segundos, número de dispositivos)."""
+    start = time.perf_counter()
+    count = len(func())
+    return time.perf_counter() - start, count
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        print(f"Generando inventario sintético de {args.rows} filas...")
+        xlsx_path, csv_path, jsonl_path = write_inventories(tmp_dir, args.rows)
+        
+        no_cache = InventoryLoader(use_cache=False)
+        cached = InventoryLoader(cache_path=tmp_dir / "inventory_cache.json", use_cache=True)
+        cached.load(xlsx_path)  # Primera lectura: rellena la caché
+        
+        cases = []
+        try:
+            import pandas  # noqa: F401
+            cases.append(("pandas read_excel + iterrows", lambda: legacy_read_devices(xlsx_path)))
+        except ImportError:
+            print("⚠ pandas no está instalado: se omite el lector original")
+        cases += [
+            ("InventoryLoader xlsx (streaming)", lambda: no_cache.load(xlsx_path)),
+            ("InventoryLoader xlsx (caché)", lambda: cached.load(xlsx_path)),
+            ("InventoryLoader csv", lambda: no_cache.load(csv_path)),
+            ("InventoryLoader jsonl", lambda: no_cache.load(jsonl_path)),
+        ]
+        
+        print(f"\n{'Lector':<36}{'Tiempo (s)':>12}{'Filas/s':>12}{'Speedup':>10}")
+        print("-" * 70)
+        
+        baseline = None
+        for name, func in cases:
+            elapsed, count = measure(func)
+            if count != args.rows:
+                print(f"✗ {name}: {count} dispositivos, se esperaban {args.rows}")
+                return 1
+            baseline = baseline or elapsed
+            print(
+                f"{name:<36}{elapsed:>12.2f}{count / elapsed:>12.0f}"
+                f"{baseline / elapsed:>9.1f}x"
+            )
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+Benchmark de carga contra una red simulada.
+
+Para cada tamaño de inventario arranca una red de dispositivos falsos
+(``fake_network.py``, en un proceso aparte) y ejecuta la automatización
+completa con ``DeviceService`` en otro proceso nuevo, de modo que el
+pico de memoria de cada tamaño se mide por separado. Reporta
+dispositivos/segundo, latencia por dispositivo (p50/p99) y pico de RSS.
+
+Uso:
+    python benchmarks/bench_load.py [--sizes 10,50,200] [--workers 20]
+        [--backend netmiko|asyncssh] [--latency 0.02] [--config-lines 200]
+        [--auth-failure-rate 0.05] [--unreachable-rate 0.05] [--drop-rate 0]
+        [--bastion] [--results bench_results.jsonl]
+
+Con ``--results`` cada medida se añade como una línea JSON junto con el
+commit actual, para comparar el rendimiento entre commits.
+"""
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+import argparse
+import io
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+FAKE_NETWORK = Path(__file__).resolve().parent / "fake_network.py"
+JUMP_USER = "bench"
+JUMP_PASS = "bench"
+
+
+def percentile(values, q: float) -> float:
+    """Percentil por rango más cercano."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def run_client(args) -> dict:
+    """Ejecuta la automatización sobre el inventario y retorna las medidas."""
+    from src.services.device_service import DeviceService
+    from src.services.inventory_loader import InventoryLoader
+    from src.services.reachability import CircuitBreaker
+    from src.services.session_profiles import SessionProfileCache
+    
+    workdir = Path(tempfile.mkdtemp(prefix="bench_load_"))
+    devices = InventoryLoader(use_cache=False).load(args.inventory)
+    device_service = DeviceService(
+        max_workers=args.workers,
+        backend=args.backend,
+        use_cache=False,
+        autodetect=False,
+        export_metrics=False,
+        store_results=False,
+        journal_path=workdir / "run_journal.jsonl",
+    )
+    if device_service.circuit_breaker is not None:
+        # El estado del circuit breaker no debe pasar de una medida a otra
+        device_service.circuit_breaker = CircuitBreaker(path=workdir / "circuit_breaker.json")
+    if device_service.ssh_service.session_profiles is not None:
+        # Cada medida parte sin perfiles de sesión (primera conexión)
+        device_service.ssh_service.session_profiles = SessionProfileCache(
+            path=workdir / "session_profiles.json"
+        )
+    
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        report = device_service.execute_automation(
+            devices,
+            jump_host=args.jump_host,
+            jump_user=JUMP_USER if args.jump_host else None,
+            jump_pass=JUMP_PASS if args.jump_host else None,
+            report_format="jsonl",
+            report_path=workdir / "report.jsonl",
+        )
+    elapsed = time.perf_counter() - start
+    
+    ok = failed = 0
+    with open(report, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get("type") == "result":
+                if record["success"]:
+                    ok += 1
+                else:
+                    failed += 1
+    shutil.rmtree(workdir, ignore_errors=True)
+    
+    latencies = device_service.ssh_service.metrics.samples("device")
+    return {
+        "devices": len(devices),
+        "elapsed_s": round(elapsed, 3),
+        "devices_per_s": round(len(devices) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_s": round(percentile(latencies, 0.50), 3),
+        "p99_s": round(percentile(latencies, 0.99), 3),
+        # En Linux ru_maxrss está en KiB
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "commands_ok": ok,
+        "commands_failed": failed,
+    }
+
+
+def start_network(args, size: int, inventory: Path) -> tuple:
+    """Arranca la red simulada y espera a que esté lista."""
+    command = [
+        sys.executable, str(FAKE_NETWORK),
+        "--devices", str(size),
+        "--latency", str(args.latency),
+        "--config-lines", str(args.config_lines),
+        "--auth-failure-rate", str(args.auth_failure_rate),
+        "--unreachable-rate", str(args.unreachable_rate),
+        "--drop-rate", str(args.drop_rate),
+        "--inventory", str(inventory),
+    ]
+    if args.bastion:
+        command.append("--bastion")
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    ready = process.stdout.readline()
+    if not ready.startswith("READY"):
+        process.kill()
+        raise RuntimeError("La red simulada no arrancó")
+    bastion = None
+    if " bastion en " in ready:
+        bastion = ready.split(" bastion en ", 1)[1].split(" ", 1)[0]
+    return process, bastion
+
+
+def measure(args, size: int) -> dict:
+    """Arranca la red y mide un tamaño de inventario en un proceso nuevo."""
+    with tempfile.TemporaryDirectory() as tmp:
+        inventory = Path(tmp) / "inventory.csv"
+        network, bastion = start_network(args, size, inventory)
+        try:
+            command = [
+                sys.executable, __file__, "--client",
+                "--inventory", str(inventory),
+                "--workers", str(args.workers),
+                "--backend", args.backend,
+            ]
+            if bastion:
+                command += ["--jump-host", bastion]
+            output = subprocess.run(
+                command, capture_output=True, text=True, check=True, cwd=PROJECT_ROOT
+            ).stdout
+        finally:
+            network.terminate()
+            network.wait()
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def git_commit() -> str:
+    """Commit actual del repositorio, si se puede obtener."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=PROJECT_ROOT,
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,50,200", help="Tamaños de inventario separados por comas")
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--backend", choices=["netmiko", "asyncssh"], default="netmiko")
+    parser.add_argument("--latency", type=float, default=0.02, help="Segundos por comando")
+    parser.add_argument("--config-lines", type=int, default=200)
+    parser.add_argument("--auth-failure-rate", type=float, default=0.05)
+    parser.add_argument("--unreachable-rate", type=float, default=0.05)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--bastion", action="store_true", help="Conectar a través del bastion simulado")
+    parser.add_argument("--results", type=Path, help="Fichero JSONL al que añadir las medidas")
+    # Modo interno: proceso cliente de una medida
+    parser.add_argument("--client", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--inventory", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--jump-host", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.client:
+        print(json.dumps(run_client(args)))
+        return
+    
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(
+        f"Backend {args.backend} · {args.workers} workers · latencia {args.latency}s · "
+        f"{args.config_lines} líneas de configuración · bastion: {'sí' if args.bastion else 'no'}\n"
+    )
+    print(f"{'Dispositivos':>12} {'Tiempo':>9} {'Disp/s':>8} {'p50':>8} {'p99':>8} {'RSS pico':>10} {'OK/Fallo':>10}")
+    
+    commit = git_commit()
+    for size in sizes:
+        result = measure(args, size)
+        print(
+            f"{result['devices']:>12} {result['elapsed_s']:>8.2f}s {result['devices_per_s']:>8.1f} "
+            f"{result['p50_s']:>7.3f}s {result['p99_s']:>7.3f}s {result['peak_rss_mb']:>8.1f}MB "
+            f"{result['commands_ok']:>5}/{result['commands_failed']}"
+        )
+        if args.results is not None:
+            record = {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "commit": commit,
+                "backend": args.backend,
+                "workers": args.workers,
+                "latency": args.latency,
+                "config_lines": args.config_lines,
+                "bastion": args.bastion,
+                **result,
+            }
+            with open(args.results, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Micro-benchmark del filtrado de salida de comandos.
+
+Compara la implementación original de ``_process_command_output`` con
+``OutputFilter`` sobre salidas sintéticas de 100k líneas.
+
+Uso:
+    python benchmarks/bench_output_filter.py [--lines 100000] [--repeat 5]
+"""
+from pathlib import Path
+import argparse
+import random
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config.constants import SKIP_PATTERNS  # noqa: E402
+from src.services.output_filter import OutputFilter  # noqa: E402
+
+
+def legacy_filter(output: str) -> int:
+    """Implementación original: minúsculas por línea y por patrón."""
+    all_lines = output.strip().split("\n")
+    filtered_lines = []
+    for line in all_lines:
+        line_stripped = line.strip()
+        if not line_stripped:
+            continue
+        if any(pat.lower() in line_stripped.lower() for pat in SKIP_PATTERNS):
+            continue
+        filtered_lines.append(line)
+    return len(filtered_lines)
+
+
+def build_output(num_lines: int, seed: int = 42) -> str:
+    """Genera una salida tipo running-config con comentarios y líneas vacías."""
+    rng = random.Random(seed)
+    lines = ["Building configuration...", "Current configuration : 123456 bytes"]
+    for i in range(num_lines):
+        r = rng.random()
+        if r < 0.10:
+            lines.append("!")
+        elif r < 0.12:
+            lines.append("")
+        elif r < 0.20:
+            lines.append(f"interface GigabitEthernet{i % 8}/0/{i % 48}")
+        else:
+            lines.append(
+                f" description uplink-{i} ip address 10.{i % 256}.{i % 200}.1 255.255.255.0"
+            )
+    return "\r\n".join(lines)
+
+
+def measure(func, output: str, repeat: int) -> float:
+    """Retorna el mejor tiempo de ``repeat`` ejecuciones."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(output)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    output = build_output(args.lines)
+    output_filter = OutputFilter()
+    
+    expected = legacy_filter(output)
+    counted = output_filter.count(output)
+    retained, _ = output_filter.filter(output, retain_lines=True)
+    if not expected == counted == retained:
+        print(f"✗ Conteos distintos: legacy={expected} count={counted} retain={retained}")
+        return 1
+    
+    size_mb = len(output) / 1e6
+    cases = [
+        ("legacy", legacy_filter),
+        ("OutputFilter.count", output_filter.count),
+        ("OutputFilter.filter(retain)", lambda o: output_filter.filter(o, retain_lines=True)),
+    ]
+    
+    print(f"Salida sintética: {args.lines} líneas, {size_mb:.1f} MB, {expected} relevantes\n")
+    print(f"{'Implementación':<30}{'Tiempo (ms)':>12}{'MB/s':>10}{'Speedup':>10}")
+    print("-" * 62)
+    
+    baseline = None
+    for name, func in cases:
+        elapsed = measure(func, output, args.repeat)
+        baseline = baseline or elapsed
+        print(
+            f"{name:<30}{elapsed * 1000:>12.1f}{size_mb / elapsed:>10.1f}"
+            f"{baseline / elapsed:>9.2f}x"
+        )
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+Benchmark del parseo en un pool de procesos frente al parseo en los hilos de E/S.
+
+Simula una ejecución en modo snapshot: cada worker de E/S "descarga" una
+configuración grande (una espera fija que libera el GIL, como la red) y
+después la evalúa contra varios parámetros. Con el parseo en los hilos,
+el GIL limita el conjunto a un núcleo; con el pool, el parseo se reparte
+entre procesos mientras los hilos siguen con la E/S.
+
+Uso:
+    python benchmarks/bench_parse_pool.py [--devices 200] [--workers 20] [--processes 4]
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.config_matcher import MultiPatternMatcher  # noqa: E402
+from src.services.output_filter import OutputFilter  # noqa: E402
+from src.services.parse_pool import ParsePool  # noqa: E402
+
+PARAMETERS = ["interface", "shutdown", "switchport access vlan", "description", "router bgp"]
+
+
+def device_config(device: int, interfaces: int) -> str:
+    """Configuración sintética de un equipo."""
+    lines = [f"hostname sw-{device:05d}", "!", "Building configuration...", "!"]
+    for i in range(interfaces):
+        lines += [
+            f"interface GigabitEthernet1/0/{i}",
+            f" description acceso-{(device + i) % 40}",
+            " switchport mode access",
+            f" switchport access vlan {10 + i % 4}",
+            " shutdown" if i % 7 == 0 else " no shutdown",
+            "!",
+        ]
+    lines += ["router bgp 65000", " neighbor 10.255.0.1 remote-as 65000", "!", "end"]
+    return "\n".join(lines)
+
+
+def run(configs, workers: int, latency: float, parse, collect=None) -> float:
+    """
+    Procesa todos los dispositivos; retorna los segundos transcurridos.
+    
+    Con ``collect``, los workers no esperan al parseo: ``parse`` retorna
+    un Future y ``collect`` lo recoge en el hilo principal (el writer).
+    """
+    def process(config: str):
+        time.sleep(latency)  # Descarga de la configuración
+        return parse(config)
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(process, configs):
+            if collect is not None:
+                collect(result)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--processes", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--interfaces", type=int, default=2000, help="Interfaces por configuración")
+    parser.add_argument("--latency", type=float, default=0.05, help="Segundos de E/S por dispositivo")
+    args = parser.parse_args()
+    
+    configs = [device_config(d, args.interfaces) for d in range(args.devices)]
+    size_mb = sum(len(c) for c in configs) / 1024 / 1024
+    print(f"{args.devices} configuraciones ({size_mb:.0f} MB), {args.workers} workers de E/S, "
+          f"{args.latency * 1000:.0f} ms de E/S por dispositivo\n")
+    
+    output_filter = OutputFilter()
+    
+    def parse_inline(config: str) -> list:
+        matcher = MultiPatternMatcher(PARAMETERS)
+        return matcher.count_matches(output_filter.iter_lines(config))
+    
+    pool = ParsePool(processes=args.processes)
+    
+    def parse_pool(config: str) -> Future:
+        return pool.submit("snapshot", PARAMETERS, config)
+    
+    def collect(future: Future) -> list:
+        return [count for count, _ in future.result()]
+    
+    # Verifica que ambos caminos dan los mismos conteos y arranca los procesos
+    assert parse_inline(configs[0]) == collect(parse_pool(configs[0]))
+    pool.reset_stats()
+    
+    inline_elapsed = run(configs, args.workers, args.latency, parse_inline)
+    pool_elapsed = run(configs, args.workers, args.latency, parse_pool, collect)
+    stats = pool.stats()
+    pool.close()
+    
+    print(f"{'Parseo':<34}{'Tiempo (s)':>12}{'Disp./s':>10}")
+    print("-" * 56)
+    print(f"{'En los hilos de E/S':<34}{inline_elapsed:>12.2f}{args.devices / inline_elapsed:>10.1f}")
+    label = f"Pool de {args.processes} procesos"
+    print(f"{label:<34}{pool_elapsed:>12.2f}{args.devices / pool_elapsed:>10.1f}")
+    print(f"\nSpeedup: {inline_elapsed / pool_elapsed:.2f}x")
+    print(
+        f"Pool: parseo {stats['parse_seconds']:.1f}s de CPU, "
+        f"utilización {100 * stats['parse_seconds'] / (pool_elapsed * args.processes):.0f}%, "
+        f"máx. {stats['max_in_flight']} en vuelo, "
+        f"E/S bloqueada {stats['blocked_seconds']:.1f}s por cola llena"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
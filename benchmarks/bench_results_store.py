@@ -0,0 +1,93 @@
+"""
+Benchmark del histórico de resultados en SQLite.
+
+Llena una base temporal con ejecuciones sintéticas (por defecto 500
+ejecuciones de 1000 dispositivos × 4 parámetros = 2M resultados) y mide
+la velocidad de escritura y la latencia de las consultas: evolución de
+una serie en las últimas 90 ejecuciones y diferencias entre dos
+ejecuciones.
+
+Uso:
+    python benchmarks/bench_results_store.py [--runs 500] [--devices 1000]
+"""
+from pathlib import Path
+import argparse
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.models.command_result import CommandResult  # noqa: E402
+from src.services.results_store import ResultsStore  # noqa: E402
+
+PARAMETERS = ["interface", "shutdown", "router bgp", "ip address"]
+
+
+def run_results(run: int, num_devices: int, rng: random.Random):
+    """Resultados sintéticos de una ejecución: pocos cambian entre ejecuciones."""
+    for i in range(num_devices):
+        device = f"sw-{i:05d}.example.net"
+        if rng.random() < 0.01:
+            for parameter in PARAMETERS:
+                yield CommandResult(device, parameter, None, 0, False, "Timeout de conexión")
+            continue
+        for j, parameter in enumerate(PARAMETERS):
+            # El conteo varía de vez en cuando para que haya diferencias
+            yield CommandResult(device, parameter, None, 10 + j + (run // 50) % 3, True)
+
+
+def timed(func, repeat: int = 20) -> tuple:
+    """Retorna (mediana en ms, resultado de la última llamada)."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return times[len(times) // 2], result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--devices", type=int, default=1000)
+    args = parser.parse_args()
+    
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultsStore(path=Path(tmp) / "results.db")
+        rows = args.runs * args.devices * len(PARAMETERS)
+        print(f"Escribiendo {args.runs} ejecuciones ({rows} resultados)...")
+        
+        start = time.perf_counter()
+        for run in range(args.runs):
+            run_id = store.start_run()
+            store.add_results(run_id, run_results(run, args.devices, rng))
+            store.finish_run(run_id, successful=0, failed=0, total_lines=0)
+        elapsed = time.perf_counter() - start
+        size_mb = store.path.stat().st_size / 1024 / 1024
+        print(f"  {elapsed:.1f}s · {rows / elapsed:,.0f} resultados/s · {size_mb:.0f} MB\n")
+        
+        device = f"sw-{args.devices // 2:05d}.example.net"
+        old_run, new_run = store.latest_run_ids(2)
+        cases = [
+            ("history (serie, 90 ejecuciones)", lambda: store.history(device, "router bgp", limit=90)),
+            ("history (dispositivo, 90 ejecuciones)", lambda: store.history(device, limit=90)),
+            ("diff (dos últimas ejecuciones)", lambda: store.diff(old_run, new_run)),
+            ("runs (20 últimas)", lambda: store.runs(limit=20)),
+        ]
+        
+        print(f"{'Consulta':<40}{'Mediana (ms)':>14}{'Filas':>8}")
+        print("-" * 62)
+        for name, func in cases:
+            median_ms, result = timed(func)
+            print(f"{name:<40}{median_ms:>14.2f}{len(result):>8}")
+        store.close()
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
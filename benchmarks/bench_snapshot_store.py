@@ -0,0 +1,115 @@
+"""
+Benchmark del almacén de snapshots (salida de los comandos deduplicada).
+
+Simula varias ejecuciones sobre una flota de equipos con configuraciones
+parecidas (misma plantilla, distintas direcciones y descripciones) en las
+que cada ejecución cambia unas pocas líneas de unos pocos equipos. Mide
+lo que se escribiría guardando cada salida tal cual frente a lo que
+escribe el almacén, y la velocidad de escritura y lectura.
+
+Uso:
+    python benchmarks/bench_snapshot_store.py [--devices 200] [--runs 10] [--interfaces 400]
+"""
+from pathlib import Path
+import argparse
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.snapshot_store import SnapshotStore  # noqa: E402
+
+
+def device_config(device: int, interfaces: int, rng: random.Random) -> list:
+    """Configuración sintética de un equipo: bloques de plantilla casi iguales."""
+    lines = [f"hostname sw-{device:05d}", "!", "service timestamps log datetime msec", "!"]
+    for i in range(interfaces):
+        lines += [
+            f"interface GigabitEthernet1/0/{i}",
+            f" description acceso-{rng.randint(1, 40)}",
+            " switchport mode access",
+            f" switchport access vlan {10 + i % 4}",
+            " spanning-tree portfast",
+            "!",
+        ]
+    lines += [
+        "router bgp 65000",
+        f" bgp router-id 10.0.{device // 256}.{device % 256}",
+        " neighbor 10.255.0.1 remote-as 65000",
+        "!",
+        "end",
+    ]
+    return lines
+
+
+def drift(config: list, rng: random.Random) -> None:
+    """Cambia, añade o quita una línea de la configuración."""
+    idx = rng.randrange(4, len(config) - 5)
+    action = rng.random()
+    if action < 0.6:
+        config[idx] = f" description cambio-{rng.randint(1, 10**6)}"
+    elif action < 0.8:
+        config.insert(idx, " shutdown")
+    else:
+        del config[idx]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--interfaces", type=int, default=400)
+    parser.add_argument(
+        "--changed", type=float, default=0.05,
+        help="Fracción de equipos que cambian en cada ejecución (por defecto: %(default)s)",
+    )
+    args = parser.parse_args()
+    
+    rng = random.Random(42)
+    configs = [device_config(d, args.interfaces, rng) for d in range(args.devices)]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SnapshotStore(root=Path(tmp) / "snapshots")
+        print(f"{'Ejecución':>9} {'Salida (MB)':>12} {'Escrito (KB)':>13} {'Chunks nuevos':>14} {'Tiempo (s)':>11}")
+        print("-" * 63)
+        
+        snapshot_ids = []
+        total_start = time.perf_counter()
+        for run in range(1, args.runs + 1):
+            if run > 1:
+                for config in rng.sample(configs, max(1, int(args.devices * args.changed))):
+                    drift(config, rng)
+            
+            before = store.stats()
+            start = time.perf_counter()
+            snapshot_ids = [store.put("\n".join(config)) for config in configs]
+            elapsed = time.perf_counter() - start
+            after = store.stats()
+            print(
+                f"{run:>9} {(after['bytes_in'] - before['bytes_in']) / 1024 / 1024:>12.1f} "
+                f"{(after['bytes_written'] - before['bytes_written']) / 1024:>13.0f} "
+                f"{after['chunks_written'] - before['chunks_written']:>14} {elapsed:>11.2f}"
+            )
+        total_elapsed = time.perf_counter() - total_start
+        
+        stats = store.stats()
+        disk = sum(f.stat().st_size for f in Path(tmp).rglob("*") if f.is_file())
+        print("-" * 63)
+        print(f"Salida total:   {stats['bytes_in'] / 1024 / 1024:.1f} MB "
+              f"({stats['bytes_in'] / 1024 / 1024 / total_elapsed:.0f} MB/s)")
+        print(f"En disco:       {disk / 1024 / 1024:.2f} MB "
+              f"({stats['bytes_in'] / max(disk, 1):.0f}x menos)")
+        
+        start = time.perf_counter()
+        for snapshot_id in snapshot_ids:
+            store.get(snapshot_id)
+        elapsed = time.perf_counter() - start
+        print(f"Lectura:        {len(snapshot_ids)} salidas en {elapsed:.2f}s")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Benchmark del tiempo de arranque.
+
+Mide, en intérpretes nuevos, el tiempo hasta la primera salida de la CLI
+(``main.py --version``), hasta tener la GUI importada y, si hay display,
+hasta mostrar la primera ventana. Como referencia mide también la
+importación completa de los servicios (lo que se cargaba antes al
+arrancar).
+
+Falla (código 1) si algún caso supera el presupuesto o si el arranque
+carga módulos pesados (pandas, openpyxl, netmiko, paramiko, asyncssh).
+
+Uso:
+    python benchmarks/bench_startup.py [--repeat 5] [--budget-ms 500]
+"""
+from pathlib import Path
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("pandas", "openpyxl", "netmiko", "paramiko", "asyncssh")
+
+CHECK_HEAVY = (
+    "import sys; "
+    f"loaded = [m for m in {HEAVY_MODULES!r} if m in sys.modules]; "
+    "print(','.join(loaded))"
+)
+
+GUI_IMPORT = "import main; from src.gui.main_window import MainWindow; " + CHECK_HEAVY
+
+FIRST_WINDOW = (
+    "import tkinter as tk; from src.gui.main_window import MainWindow; "
+    "root = tk.Tk(); MainWindow(root); root.update(); root.destroy(); " + CHECK_HEAVY
+)
+
+FULL_IMPORT = (
+    "import src.services.device_service, src.services.excel_service, "
+    "src.services.inventory_loader, openpyxl"
+)
+
+
+def run(args) -> tuple:
+    """Ejecuta un intérprete nuevo y retorna (segundos, stdout, código)."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, *args],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    return time.perf_counter() - start, proc.stdout.strip(), proc.returncode
+
+
+def display_available() -> bool:
+    """Comprueba si se puede crear una ventana Tk."""
+    _, _, code = run(["-c", "import tkinter; tkinter.Tk().destroy()"])
+    return code == 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=500.0)
+    args = parser.parse_args()
+    
+    # (nombre, argumentos, con presupuesto, imprime los módulos pesados cargados)
+    cases = [
+        ("CLI: main.py --version", ["main.py", "--version"], True, False),
+        ("GUI importada", ["-c", GUI_IMPORT], True, True),
+    ]
+    if display_available():
+        cases.append(("Primera ventana", ["-c", FIRST_WINDOW], True, True))
+    else:
+        print("⚠ Sin display: se omite la medición de la primera ventana")
+    cases.append(("Referencia: importación completa", ["-c", FULL_IMPORT], False, False))
+    
+    print(f"Presupuesto: {args.budget_ms:.0f} ms (mediana de {args.repeat} ejecuciones)\n")
+    print(f"{'Caso':<36}{'Mediana (ms)':>14}{'Mín (ms)':>10}  Estado")
+    print("-" * 70)
+    
+    failed = False
+    for name, command, budgeted, checks_modules in cases:
+        timings = []
+        heavy = ""
+        for _ in range(args.repeat):
+            elapsed, output, code = run(command)
+            if code != 0:
+                print(f"✗ {name}: el proceso terminó con código {code}")
+                return 1
+            timings.append(elapsed * 1000)
+            if checks_modules:
+                heavy = output.splitlines()[-1] if output else ""
+        
+        median = statistics.median(timings)
+        status = "-"
+        if budgeted:
+            if heavy:
+                status = f"✗ carga {heavy}"
+                failed = True
+            elif median > args.budget_ms:
+                status = "✗ fuera de presupuesto"
+                failed = True
+            else:
+                status = "✓"
+        print(f"{name:<36}{median:>14.0f}{min(timings):>10.0f}  {status}")
+    
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,437 @@
+"""
+Red simulada para benchmarks: dispositivos SSH falsos y un bastion.
+
+Cada dispositivo escucha en su propio puerto de 127.0.0.1, presenta un
+prompt tipo Cisco (``R<n>#``) y responde a los comandos que usa la
+aplicación (``show configuration running-config | in <patrón>``, la
+configuración completa, ``show version``, ``terminal length 0``...). El
+bastion opcional acepta canales ``direct-tcpip`` y los reenvía al puerto
+del dispositivo.
+
+Parámetros de la simulación:
+    latency            segundos de espera antes de responder cada comando
+    config_lines       tamaño aproximado de la configuración de cada equipo
+    auth_failure_rate  fracción de dispositivos que rechazan la contraseña
+    unreachable_rate   fracción de dispositivos con el puerto cerrado
+    drop_rate          fracción de dispositivos que cortan la sesión tras
+                       el primer comando
+
+La selección de dispositivos que fallan es determinista (``seed``).
+
+Uso como script (sirve la red hasta Ctrl+C y escribe el inventario):
+    python benchmarks/fake_network.py --devices 50 --latency 0.05 \\
+        --inventory /tmp/fake_inventory.csv [--bastion]
+
+Los nombres del inventario usan la forma ``127.0.0.1:<puerto>``.
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import argparse
+import csv
+import logging
+import random
+import re
+import socket
+import sys
+import threading
+import time
+
+import paramiko
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config.constants import (  # noqa: E402
+    CHANGE_INDICATOR_MARKER, EXCEL_COLUMNS, SNAPSHOT_COMMAND,
+)
+from src.models.device import Device  # noqa: E402
+
+HOST = "127.0.0.1"
+USER = "admin"
+PASSWORD = "admin"
+PARAMETERS = "interface,shutdown,bgp"
+
+_HOST_KEY: Optional[paramiko.PKey] = None
+_HOST_KEY_LOCK = threading.Lock()
+
+
+def host_key() -> paramiko.PKey:
+    """Clave de host compartida por todos los servidores falsos."""
+    global _HOST_KEY
+    with _HOST_KEY_LOCK:
+        if _HOST_KEY is None:
+            _HOST_KEY = paramiko.RSAKey.generate(2048)
+        return _HOST_KEY
+
+
+def build_config(lines: int) -> str:
+    """Configuración sintética tipo IOS de aproximadamente ``lines`` líneas."""
+    config = [
+        "Building configuration...",
+        "",
+        "Current configuration : 4096 bytes",
+        f"! {CHANGE_INDICATOR_MARKER} at 10:00:00 UTC Mon Oct 5 2026 by admin",
+        "!",
+        "hostname ROUTER",
+        "!",
+    ]
+    interface = 0
+    while len(config) < lines - 8:
+        config += [
+            f"interface GigabitEthernet0/{interface}",
+            f" description uplink {interface}",
+            " shutdown" if interface % 3 == 0 else " no shutdown",
+            "!",
+        ]
+        interface += 1
+    config += [
+        "router bgp 65000",
+        " neighbor 10.0.0.1 remote-as 65001",
+        " neighbor 10.0.0.2 remote-as 65002",
+        "!",
+        "line vty 0 4",
+        " transport input ssh",
+        "!",
+        "end",
+    ]
+    return "\n".join(config)
+
+
+class _DeviceServer(paramiko.ServerInterface):
+    """Autenticación y canales de un dispositivo o del bastion."""
+    
+    def __init__(self, reject_auth: bool = False, bastion: bool = False):
+        self.reject_auth = reject_auth
+        self.bastion = bastion
+        self.destinations: Dict[int, tuple] = {}
+    
+    def get_allowed_auths(self, username: str) -> str:
+        return "password"
+    
+    def check_auth_password(self, username: str, password: str) -> int:
+        if self.reject_auth:
+            return paramiko.AUTH_FAILED
+        return paramiko.AUTH_SUCCESSFUL
+    
+    def check_channel_request(self, kind: str, chanid: int) -> int:
+        return paramiko.OPEN_SUCCEEDED
+    
+    def check_channel_pty_request(self, *args) -> bool:
+        return True
+    
+    def check_channel_shell_request(self, channel) -> bool:
+        return True
+    
+    def check_channel_direct_tcpip_request(self, chanid: int, origin, destination) -> int:
+        if not self.bastion:
+            return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+        self.destinations[chanid] = destination
+        return paramiko.OPEN_SUCCEEDED
+
+
+class _Listener:
+    """Acepta conexiones en un puerto y atiende cada una en un hilo."""
+    
+    def __init__(self, handler):
+        self.handler = handler
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((HOST, 0))
+        self.sock.listen(128)
+        self.port = self.sock.getsockname()[1]
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._thread.start()
+    
+    def _accept_loop(self) -> None:
+        while True:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self.handler, args=(client,), daemon=True).start()
+    
+    def close(self) -> None:
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class FakeDevice:
+    """Dispositivo SSH simulado con prompt tipo Cisco."""
+    
+    def __init__(
+        self,
+        hostname: str,
+        config: str,
+        latency: float = 0.0,
+        reject_auth: bool = False,
+        drop_session: bool = False,
+    ):
+        self.hostname = hostname
+        self.config = config
+        self.config_lines = config.split("\n")
+        self.latency = latency
+        self.reject_auth = reject_auth
+        self.drop_session = drop_session
+        self._listener = _Listener(self._handle)
+        self.port = self._listener.port
+    
+    def _handle(self, client: socket.socket) -> None:
+        transport = paramiko.Transport(client)
+        transport.add_server_key(host_key())
+        try:
+            transport.start_server(server=_DeviceServer(self.reject_auth))
+        except (paramiko.SSHException, EOFError, OSError):
+            return
+        channel = transport.accept(30)
+        if channel is None:
+            transport.close()
+            return
+        try:
+            self.serve_shell(channel)
+        except (OSError, EOFError, paramiko.SSHException):
+            pass
+        finally:
+            transport.close()
+    
+    def serve_shell(self, channel) -> None:
+        """Sesión interactiva: eco del comando, salida y prompt."""
+        prompt = f"{self.hostname}#"
+        channel.sendall(f"\r\n{prompt}".encode())
+        buffer = ""
+        commands = 0
+        while True:
+            data = channel.recv(4096)
+            if not data:
+                return
+            buffer += data.decode(errors="replace")
+            while "\n" in buffer:
+                line, buffer = buffer.split("\n", 1)
+                line = line.strip("\r").strip()
+                if line == "exit":
+                    channel.close()
+                    return
+                if self.latency and line:
+                    time.sleep(self.latency)
+                output = self.run_command(line)
+                if output is not None:
+                    commands += 1
+                    if self.drop_session and commands > 1:
+                        channel.close()
+                        return
+                body = output.replace("\n", "\r\n") + "\r\n" if output else ""
+                channel.sendall(f"{line}\r\n{body}{prompt}".encode())
+    
+    def run_command(self, line: str) -> Optional[str]:
+        """Salida de un comando, o None si no produce salida (terminal, vacío...)."""
+        if line.startswith("show configuration running-config | in ") or line.startswith(
+            "show running-config | include "
+        ):
+            pattern = line.split(" | ", 1)[1].split(" ", 1)[1]
+            return "\n".join(l for l in self.config_lines if re.search(pattern, l))
+        if line in (SNAPSHOT_COMMAND, "show running-config"):
+            return self.config
+        if line.startswith("show version"):
+            return (
+                "Cisco IOS Software, C2900 Software (C2900-UNIVERSALK9-M), "
+                "Version 15.2(4)M7, RELEASE SOFTWARE (fc2)\n"
+                f"{self.hostname} uptime is 1 week, 2 days"
+            )
+        if not line or line.startswith("terminal"):
+            return None
+        return "% Invalid input detected at '^' marker."
+    
+    def close(self) -> None:
+        self._listener.close()
+
+
+class FakeBastion:
+    """Jump host simulado que reenvía canales direct-tcpip."""
+    
+    def __init__(self):
+        self._listener = _Listener(self._handle)
+        self.port = self._listener.port
+    
+    def _handle(self, client: socket.socket) -> None:
+        transport = paramiko.Transport(client)
+        transport.add_server_key(host_key())
+        server = _DeviceServer(bastion=True)
+        try:
+            transport.start_server(server=server)
+        except (paramiko.SSHException, EOFError, OSError):
+            return
+        while transport.is_active():
+            channel = transport.accept(1)
+            if channel is None:
+                continue
+            destination = server.destinations.pop(channel.get_id(), None)
+            if destination is None:
+                channel.close()
+                continue
+            threading.Thread(
+                target=self._forward, args=(channel, destination), daemon=True
+            ).start()
+    
+    @staticmethod
+    def _forward(channel, destination: tuple) -> None:
+        """Copia bytes en ambos sentidos entre el canal y el dispositivo."""
+        try:
+            upstream = socket.create_connection(destination, timeout=5)
+        except OSError:
+            channel.close()
+            return
+        upstream.settimeout(None)
+        
+        def pump(source_recv, target_send, on_close) -> None:
+            try:
+                while True:
+                    data = source_recv(65536)
+                    if not data:
+                        break
+                    target_send(data)
+            except (OSError, EOFError):
+                pass
+            finally:
+                on_close()
+        
+        threading.Thread(
+            target=pump,
+            args=(upstream.recv, channel.sendall, channel.close),
+            daemon=True,
+        ).start()
+        pump(channel.recv, upstream.sendall, lambda: upstream.close())
+    
+    def close(self) -> None:
+        self._listener.close()
+
+
+class FakeNetwork:
+    """
+    Conjunto de dispositivos simulados (y bastion opcional).
+    
+    Se usa como context manager; ``devices()`` retorna el inventario con
+    nombres ``127.0.0.1:<puerto>``.
+    """
+    
+    def __init__(
+        self,
+        size: int,
+        latency: float = 0.0,
+        config_lines: int = 200,
+        auth_failure_rate: float = 0.0,
+        unreachable_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        bastion: bool = False,
+        seed: int = 0,
+    ):
+        self.size = size
+        self.latency = latency
+        self.config = build_config(config_lines)
+        self.auth_failure_rate = auth_failure_rate
+        self.unreachable_rate = unreachable_rate
+        self.drop_rate = drop_rate
+        self.with_bastion = bastion
+        self.seed = seed
+        self.bastion: Optional[FakeBastion] = None
+        self._devices: List[FakeDevice] = []
+        self._names: List[str] = []
+    
+    def __enter__(self) -> "FakeNetwork":
+        self.start()
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.close()
+    
+    def start(self) -> None:
+        """Arranca los servidores."""
+        # Las pruebas TCP del pre-flight cierran sin handshake SSH y
+        # paramiko lo registraría como error en cada dispositivo
+        logging.getLogger("paramiko").setLevel(logging.CRITICAL)
+        host_key()
+        rng = random.Random(self.seed)
+        for i in range(self.size):
+            roll = rng.random()
+            if roll < self.unreachable_rate:
+                # Puerto libre sin nadie escuchando: conexión rechazada
+                with socket.socket() as sock:
+                    sock.bind((HOST, 0))
+                    port = sock.getsockname()[1]
+                self._names.append(f"{HOST}:{port}")
+                continue
+            roll -= self.unreachable_rate
+            device = FakeDevice(
+                f"R{i}",
+                self.config,
+                latency=self.latency,
+                reject_auth=roll < self.auth_failure_rate,
+                drop_session=self.auth_failure_rate <= roll < self.auth_failure_rate + self.drop_rate,
+            )
+            self._devices.append(device)
+            self._names.append(f"{HOST}:{device.port}")
+        if self.with_bastion:
+            self.bastion = FakeBastion()
+    
+    @property
+    def bastion_address(self) -> Optional[str]:
+        """``127.0.0.1:<puerto>`` del bastion, si se arrancó."""
+        return f"{HOST}:{self.bastion.port}" if self.bastion else None
+    
+    def devices(self, parameters: str = PARAMETERS) -> List[Device]:
+        """Inventario de la red simulada."""
+        return [Device(name, USER, PASSWORD, parameters) for name in self._names]
+    
+    def write_inventory(self, path: Path, parameters: str = PARAMETERS) -> Path:
+        """Escribe el inventario en CSV con las columnas del Excel."""
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(EXCEL_COLUMNS)
+            for device in self.devices(parameters):
+                writer.writerow([device.name, device.user, device.password, device.parameter])
+        return path
+    
+    def close(self) -> None:
+        """Detiene los servidores."""
+        for device in self._devices:
+            device.close()
+        if self.bastion is not None:
+            self.bastion.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Red SSH simulada para benchmarks")
+    parser.add_argument("--devices", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--config-lines", type=int, default=200)
+    parser.add_argument("--auth-failure-rate", type=float, default=0.0)
+    parser.add_argument("--unreachable-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--bastion", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--inventory", type=Path, required=True, help="CSV de inventario a generar")
+    args = parser.parse_args()
+    
+    network = FakeNetwork(
+        args.devices,
+        latency=args.latency,
+        config_lines=args.config_lines,
+        auth_failure_rate=args.auth_failure_rate,
+        unreachable_rate=args.unreachable_rate,
+        drop_rate=args.drop_rate,
+        bastion=args.bastion,
+        seed=args.seed,
+    )
+    with network:
+        network.write_inventory(args.inventory)
+        bastion = f" · bastion en {network.bastion_address}" if network.bastion else ""
+        # La línea READY indica al proceso que lanza la red que ya puede conectar
+        print(f"READY {args.devices} dispositivos{bastion} · inventario en {args.inventory}", flush=True)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
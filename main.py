@@ -2,12 +2,19 @@
 Network Device Automation Tool
 Punto de entrada principal de la aplicación.
 """
-import tkinter as tk
-from src.gui.main_window import MainWindow
+import sys
 
 
 def main():
-    """Función principal que inicia la aplicación."""
+    """Función principal: CLI si hay argumentos, GUI si no."""
+    if len(sys.argv) > 1:
+        # Modo sin GUI (cron, servidores sin display): no se carga tkinter
+        from src.cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+    
+    import tkinter as tk
+    from src.gui.main_window import MainWindow
+    
     root = tk.Tk()
     app = MainWindow(root)
     root.mainloop()
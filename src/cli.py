@@ -0,0 +1,485 @@
+"""
+Interfaz de línea de comandos para ejecuciones sin GUI.
+
+Uso:
+    python main.py run [--inventory PATH] [--workers N] [--format txt|jsonl|csv]
+                       [--jump-host HOST --jump-user USER] [--shard i/N]
+                       [--resume | --retry-failed]
+    python main.py merge REPORTE [REPORTE ...] [--output PATH] [--inventory PATH]
+    python main.py serve [--port 8765] [--workers N]
+    python main.py query [--inventory PATH] [--url http://127.0.0.1:8765]
+    python main.py history [--device NAME [--parameter PARAM]] [--limit N]
+    python main.py diff [RUN_ANTIGUA RUN_NUEVA]
+    python main.py show SNAPSHOT
+
+La contraseña del jump host se lee de la variable de entorno
+JUMP_PASSWORD (o de --jump-pass) para no dejarla en el crontab. El token
+del servicio se lee de DAEMON_TOKEN (obligatorio si no escucha en loopback).
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+import argparse
+import os
+import sys
+
+from . import __version__
+from .config.constants import (
+    DATA_DIR, EXCEL_PATH, MAX_WORKERS, SSH_BACKEND, REPORT_FORMAT, RESULT_CACHE_ENABLED,
+    DAEMON_HOST, DAEMON_PORT, PREFLIGHT_ENABLED, RESULTS_STORE_ENABLED, RESULTS_DB_PATH,
+    RUN_JOURNAL_PATH, SNAPSHOT_STORE_ENABLED, SNAPSHOT_STORE_DIR, PARSE_PROCESSES,
+    PLATFORM_AUTODETECT, FAST_CONNECT, METRICS_ENABLED, METRICS_PROMETHEUS_PATH,
+)
+
+
+JUMP_PASSWORD_ENV = "JUMP_PASSWORD"
+DAEMON_TOKEN_ENV = "DAEMON_TOKEN"
+REPORT_FORMATS = ["txt", "jsonl", "csv"]
+SNAPSHOT_ID_PREFIX = 12  # Caracteres del identificador de salida mostrados en history
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Convierte "i/N" en (i, N) con 1 <= i <= N."""
+    try:
+        shard, shard_count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"formato esperado i/N, recibido '{value}'")
+    if shard_count < 1 or not 1 <= shard <= shard_count:
+        raise argparse.ArgumentTypeError(f"shard fuera de rango: '{value}' (1 <= i <= N)")
+    return shard, shard_count
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Construye el parser de argumentos."""
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Network Device Automation (modo sin GUI)",
+    )
+    parser.add_argument("--version", action="version", version=f"Network Device Automation {__version__}")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    run = subparsers.add_parser("run", help="Ejecuta la automatización sobre el inventario")
+    run.add_argument(
+        "--inventory", type=Path, default=EXCEL_PATH,
+        help="Inventario .xlsx, .csv o .jsonl (por defecto: %(default)s)",
+    )
+    run.add_argument(
+        "--workers", type=int, default=MAX_WORKERS,
+        help="Dispositivos en paralelo (por defecto: %(default)s)",
+    )
+    run.add_argument(
+        "--backend", choices=["netmiko", "asyncssh"], default=SSH_BACKEND,
+        help="Backend SSH (por defecto: %(default)s)",
+    )
+    run.add_argument(
+        "--parse-processes", type=int, default=PARSE_PROCESSES, metavar="N",
+        help="Procesos de parseo fuera de los workers de E/S; 0 = desactivado (por defecto: %(default)s)",
+    )
+    add_jump_host_arguments(run)
+    run.add_argument("--format", choices=REPORT_FORMATS, default=REPORT_FORMAT)
+    run.add_argument("--output", type=Path, help="Ruta del reporte")
+    run.add_argument(
+        "--shard", type=parse_shard, metavar="i/N",
+        help="Procesa solo el shard i de N (reparto estable por nombre de dispositivo)",
+    )
+    run.add_argument(
+        "--cache", action=argparse.BooleanOptionalAction, default=RESULT_CACHE_ENABLED,
+        help="Reutilizar resultados de dispositivos sin cambios",
+    )
+    run.add_argument(
+        "--preflight", action=argparse.BooleanOptionalAction, default=PREFLIGHT_ENABLED,
+        help="Comprobar el puerto SSH antes de conectar y omitir los dispositivos que fallan",
+    )
+    run.add_argument(
+        "--autodetect", action=argparse.BooleanOptionalAction, default=PLATFORM_AUTODETECT,
+        help="Detectar el driver de cada dispositivo (una vez, se guarda en caché)",
+    )
+    run.add_argument(
+        "--fast-connect", action=argparse.BooleanOptionalAction, default=FAST_CONNECT,
+        help="Reutilizar el prompt y la preparación de la sesión anterior de cada dispositivo",
+    )
+    run.add_argument(
+        "--metrics", action=argparse.BooleanOptionalAction, default=METRICS_ENABLED,
+        help="Exportar las métricas de latencia (Prometheus) y la traza de la ejecución",
+    )
+    run.add_argument(
+        "--store", action=argparse.BooleanOptionalAction, default=RESULTS_STORE_ENABLED,
+        help="Guardar los resultados en el histórico SQLite",
+    )
+    run.add_argument(
+        "--snapshots", action=argparse.BooleanOptionalAction, default=SNAPSHOT_STORE_ENABLED,
+        help="Guardar la salida completa de cada comando (deduplicada) para auditoría",
+    )
+    resume = run.add_mutually_exclusive_group()
+    resume.add_argument(
+        "--resume", dest="resume", action="store_const", const="resume",
+        help="Reanuda la ejecución anterior sin repetir los dispositivos completados",
+    )
+    resume.add_argument(
+        "--retry-failed", dest="resume", action="store_const", const="retry-failed",
+        help="Repite solo los dispositivos que fallaron (o no terminaron) en la ejecución anterior",
+    )
+    run.add_argument(
+        "--journal", type=Path,
+        help="Journal de la ejecución (por defecto data/run_journal[_shard<i>of<N>].jsonl)",
+    )
+    
+    merge = subparsers.add_parser("merge", help="Combina los reportes de varios shards")
+    merge.add_argument("reports", nargs="+", type=Path, help="Reportes a combinar")
+    merge.add_argument("--output", type=Path, help="Ruta del reporte combinado")
+    merge.add_argument("--format", choices=REPORT_FORMATS, default=REPORT_FORMAT)
+    merge.add_argument(
+        "--inventory", type=Path,
+        help="Inventario para ordenar el reporte combinado como el original",
+    )
+    
+    serve = subparsers.add_parser(
+        "serve", help="Servicio residente que mantiene las sesiones SSH abiertas"
+    )
+    serve.add_argument("--host", default=DAEMON_HOST, help="Dirección de escucha (por defecto: %(default)s)")
+    serve.add_argument("--port", type=int, default=DAEMON_PORT)
+    serve.add_argument(
+        "--workers", type=int, default=MAX_WORKERS,
+        help="Dispositivos consultados en paralelo (por defecto: %(default)s)",
+    )
+    
+    query = subparsers.add_parser("query", help="Envía el inventario al servicio residente")
+    query.add_argument("--inventory", type=Path, default=EXCEL_PATH)
+    query.add_argument("--url", default=f"http://{DAEMON_HOST}:{DAEMON_PORT}")
+    add_jump_host_arguments(query)
+    query.add_argument("--format", choices=REPORT_FORMATS, default=REPORT_FORMAT)
+    query.add_argument("--output", type=Path, help="Ruta del reporte")
+    
+    history = subparsers.add_parser("history", help="Consulta el histórico de resultados")
+    history.add_argument("--device", help="Evolución de un dispositivo (por defecto, lista las ejecuciones)")
+    history.add_argument("--parameter", help="Solo este parámetro del dispositivo")
+    history.add_argument(
+        "--limit", type=int, default=20,
+        help="Número de ejecuciones (por defecto: %(default)s)",
+    )
+    history.add_argument(
+        "--db", type=Path, default=RESULTS_DB_PATH,
+        help="Base de datos del histórico (por defecto: %(default)s)",
+    )
+    
+    diff = subparsers.add_parser("diff", help="Compara los resultados de dos ejecuciones")
+    diff.add_argument(
+        "runs", nargs="*", type=int, metavar="RUN",
+        help="Ejecución antigua y nueva (por defecto, las dos últimas)",
+    )
+    diff.add_argument(
+        "--db", type=Path, default=RESULTS_DB_PATH,
+        help="Base de datos del histórico (por defecto: %(default)s)",
+    )
+    
+    show = subparsers.add_parser("show", help="Muestra una salida guardada en el almacén de snapshots")
+    show.add_argument("snapshot", help="Identificador de la salida (basta un prefijo)")
+    show.add_argument(
+        "--store", type=Path, default=SNAPSHOT_STORE_DIR,
+        help="Directorio del almacén (por defecto: %(default)s)",
+    )
+    
+    return parser
+
+
+def add_jump_host_arguments(parser: argparse.ArgumentParser) -> None:
+    """Opciones del jump host comunes a run y query."""
+    parser.add_argument("--jump-host", help="Host/IP del jump host")
+    parser.add_argument("--jump-user", help="Usuario del jump host")
+    parser.add_argument(
+        "--jump-pass",
+        help=f"Contraseña del jump host (mejor usar la variable {JUMP_PASSWORD_ENV})",
+    )
+
+
+def default_report_path(report_format: str, shard: Optional[Tuple[int, int]] = None) -> Path:
+    """data/output_<timestamp>[_shard<i>of<N>].<formato>"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    suffix = f"_shard{shard[0]}of{shard[1]}" if shard else ""
+    return DATA_DIR / f"output_{timestamp}{suffix}.{report_format}"
+
+
+def default_journal_path(shard: Optional[Tuple[int, int]] = None) -> Path:
+    """Cada shard tiene su propio journal para poder reanudarlo por separado."""
+    if not shard:
+        return RUN_JOURNAL_PATH
+    return RUN_JOURNAL_PATH.with_name(
+        f"{RUN_JOURNAL_PATH.stem}_shard{shard[0]}of{shard[1]}{RUN_JOURNAL_PATH.suffix}"
+    )
+
+
+def default_metrics_path(shard: Optional[Tuple[int, int]] = None) -> Path:
+    """Cada shard exporta sus métricas en su propio fichero para el textfile collector."""
+    if not shard:
+        return METRICS_PROMETHEUS_PATH
+    return METRICS_PROMETHEUS_PATH.with_name(
+        f"{METRICS_PROMETHEUS_PATH.stem}_shard{shard[0]}of{shard[1]}{METRICS_PROMETHEUS_PATH.suffix}"
+    )
+
+
+def run_command(args: argparse.Namespace) -> int:
+    """Subcomando run."""
+    from .services.excel_service import ExcelService
+    from .services.device_service import DeviceService
+    from .services.inventory_loader import shard_devices
+    from .services.report_writer import create_report_writer
+    
+    excel_service = ExcelService(excel_path=args.inventory)
+    if not excel_service.exists():
+        print(f"✗ El inventario no existe: {args.inventory}", file=sys.stderr)
+        return 1
+    
+    devices = excel_service.iter_devices()
+    if args.shard:
+        devices = shard_devices(devices, *args.shard)
+        print(f"⚙ Shard {args.shard[0]}/{args.shard[1]}")
+    devices = list(devices)
+    
+    output_path = args.output or default_report_path(args.format, args.shard)
+    if not devices:
+        # Un shard vacío no es un error: se genera igualmente su reporte para el merge
+        print("⚠ No hay dispositivos para procesar")
+        create_report_writer(args.format, path=output_path, expected_total=0).close()
+        print(f"✓ Archivo generado: {output_path}")
+        return 0
+    
+    jump_pass = args.jump_pass or os.environ.get(JUMP_PASSWORD_ENV)
+    device_service = DeviceService(
+        max_workers=args.workers,
+        backend=args.backend,
+        use_cache=args.cache,
+        preflight=args.preflight,
+        autodetect=args.autodetect,
+        fast_connect=args.fast_connect,
+        export_metrics=args.metrics,
+        store_results=args.store,
+        store_snapshots=args.snapshots,
+        parse_processes=args.parse_processes,
+        journal_path=args.journal or default_journal_path(args.shard),
+        metrics_path=default_metrics_path(args.shard),
+        metrics_labels={"shard": f"{args.shard[0]}of{args.shard[1]}"} if args.shard else None,
+    )
+    device_service.execute_automation(
+        devices,
+        jump_host=args.jump_host or None,
+        jump_user=args.jump_user or None,
+        jump_pass=jump_pass or None,
+        report_format=args.format,
+        report_path=output_path,
+        resume=args.resume,
+    )
+    return 0
+
+
+def merge_command(args: argparse.Namespace) -> int:
+    """Subcomando merge."""
+    from .services.report_reader import merge_reports
+    from .services.report_writer import create_report_writer
+    
+    missing = [str(p) for p in args.reports if not p.exists()]
+    if missing:
+        print(f"✗ Reportes no encontrados: {', '.join(missing)}", file=sys.stderr)
+        return 1
+    
+    device_order = None
+    if args.inventory is not None:
+        from .services.excel_service import ExcelService
+        device_order = [d.name for d in ExcelService(excel_path=args.inventory).iter_devices()]
+    
+    writer = create_report_writer(args.format, path=args.output or default_report_path(args.format))
+    output_file = merge_reports(args.reports, writer, device_order=device_order)
+    print(f"✓ {len(args.reports)} reportes combinados en: {output_file}")
+    print(f"  • Comandos exitosos: {writer.successful}")
+    print(f"  • Comandos fallidos: {writer.failed}")
+    return 0
+
+
+def serve_command(args: argparse.Namespace) -> int:
+    """Subcomando serve."""
+    from .services.query_daemon import serve
+    
+    serve(
+        host=args.host,
+        port=args.port,
+        max_workers=args.workers,
+        token=os.environ.get(DAEMON_TOKEN_ENV),
+    )
+    return 0
+
+
+def query_command(args: argparse.Namespace) -> int:
+    """Subcomando query: consulta al servicio y escribe el reporte."""
+    import json
+    import urllib.request
+    from .models.command_result import CommandResult
+    from .services.excel_service import ExcelService
+    from .services.report_writer import create_report_writer
+    
+    devices = ExcelService(excel_path=args.inventory).read_devices()
+    payload = {
+        "devices": [
+            {"name": d.name, "user": d.user, "password": d.password, "parameter": d.parameter}
+            for d in devices
+        ],
+        "jump_host": args.jump_host,
+        "jump_user": args.jump_user,
+        "jump_pass": args.jump_pass or os.environ.get(JUMP_PASSWORD_ENV),
+    }
+    request = urllib.request.Request(
+        args.url.rstrip("/") + "/query",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={
+            "Content-Type": "application/json",
+            "X-Auth-Token": os.environ.get(DAEMON_TOKEN_ENV, ""),
+        },
+    )
+    with urllib.request.urlopen(request) as response:
+        body = json.load(response)
+    
+    results = [
+        CommandResult(
+            device_name=r["device"],
+            parameter=r["parameter"],
+            output_lines=None,
+            line_count=r["line_count"],
+            success=r["success"],
+            error_message=r["error_message"],
+        )
+        for r in body["results"]
+    ]
+    writer = create_report_writer(
+        args.format,
+        path=args.output or default_report_path(args.format),
+        expected_total=len(results),
+    )
+    writer.write_results(results)
+    output_file = writer.close()
+    print(f"✓ {len(devices)} dispositivos consultados en {body['elapsed']:.2f}s")
+    print(f"📄 Resultados guardados en: {output_file}")
+    return 0
+
+
+def history_command(args: argparse.Namespace) -> int:
+    """Subcomando history: ejecuciones guardadas o evolución de un dispositivo."""
+    from .services.results_store import ResultsStore
+    
+    if not args.db.exists():
+        print(f"✗ No hay histórico de resultados: {args.db}", file=sys.stderr)
+        return 1
+    
+    store = ResultsStore(path=args.db)
+    try:
+        if args.device is None:
+            runs = store.runs(limit=args.limit)
+            if not runs:
+                print("⚠ No hay ejecuciones en el histórico")
+                return 0
+            print(f"{'Ejecución':>9}  {'Fecha':<19}  {'OK':>7} {'Fallos':>7} {'Líneas':>9}  Reporte")
+            for run in runs:
+                status = ""
+                if run["finished_at"] is None:
+                    status = " (sin terminar)"
+                elif run["interrupted"]:
+                    status = " (interrumpida)"
+                print(
+                    f"{run['run_id']:>9}  {format_timestamp(run['started_at'])}  "
+                    f"{run['successful']:>7} {run['failed']:>7} {run['total_lines']:>9}  "
+                    f"{run['report_path'] or ''}{status}"
+                )
+            return 0
+        
+        rows = store.history(args.device, args.parameter, limit=args.limit)
+        if not rows:
+            print(f"⚠ Sin resultados en el histórico para {args.device}")
+            return 0
+        print(f"{'Ejecución':>9}  {'Fecha':<19}  {'Parámetro':<20} {'Líneas':<8} Salida")
+        for row in rows:
+            value = row["line_count"] if row["success"] else f"✗ {row['error_message']}"
+            snapshot = row["snapshot_id"][:SNAPSHOT_ID_PREFIX] if row["snapshot_id"] else ""
+            print(
+                f"{row['run_id']:>9}  {format_timestamp(row['started_at'])}  "
+                f"{row['parameter']:<20} {str(value):<8} {snapshot}".rstrip()
+            )
+        return 0
+    finally:
+        store.close()
+
+
+def diff_command(args: argparse.Namespace) -> int:
+    """Subcomando diff: cambios entre dos ejecuciones del histórico."""
+    from .services.results_store import ResultsStore
+    
+    if len(args.runs) not in (0, 2):
+        print("✗ Indica dos ejecuciones, o ninguna para comparar las dos últimas", file=sys.stderr)
+        return 1
+    if not args.db.exists():
+        print(f"✗ No hay histórico de resultados: {args.db}", file=sys.stderr)
+        return 1
+    
+    store = ResultsStore(path=args.db)
+    try:
+        runs = args.runs or store.latest_run_ids(2)
+        if len(runs) != 2:
+            print("⚠ Hacen falta al menos dos ejecuciones terminadas para comparar")
+            return 0
+        old_run, new_run = runs
+        changes = store.diff(old_run, new_run)
+    finally:
+        store.close()
+    
+    print(f"Cambios de la ejecución {old_run} a la {new_run}: {len(changes)}")
+    for change in changes:
+        old = "—" if change["status"] == "nuevo" else change["old"]
+        new = "—" if change["status"] == "eliminado" else change["new"]
+        print(
+            f"  • {change['device']} ({change['parameter']}): "
+            f"{'error' if old is None else old} → {'error' if new is None else new} "
+            f"[{change['status']}]"
+        )
+    return 0
+
+
+def show_command(args: argparse.Namespace) -> int:
+    """Subcomando show: imprime una salida del almacén de snapshots."""
+    from .services.snapshot_store import SnapshotStore
+    
+    store = SnapshotStore(root=args.store)
+    try:
+        snapshot_id = store.resolve(args.snapshot)
+    except KeyError as e:
+        print(f"✗ {e.args[0]}", file=sys.stderr)
+        return 1
+    for line in store.iter_lines(snapshot_id):
+        print(line)
+    return 0
+
+
+def format_timestamp(timestamp: float) -> str:
+    """Fecha local legible de un timestamp."""
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada de la CLI; retorna el código de salida."""
+    args = build_parser().parse_args(argv)
+    commands = {
+        "run": run_command,
+        "merge": merge_command,
+        "serve": serve_command,
+        "query": query_command,
+        "history": history_command,
+        "diff": diff_command,
+        "show": show_command,
+    }
+    try:
+        return commands[args.command](args)
+    except KeyboardInterrupt:
+        print("\n⚠ Ejecución interrumpida por el usuario", file=sys.stderr)
+        return 130
+    except (OSError, ValueError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,15 +9,133 @@ EXCEL_PATH = DATA_DIR / EXCEL_FILENAME
 
 # Configuración Excel
 EXCEL_COLUMNS = ["Name", "User", "Password", "Parameter"]
+EXCEL_SHEET_NAME = "Devices"
+
+# Ficheros de estado compartidos (cachés, circuit breaker): espera máxima por el
+# lock al guardarlos cuando varios procesos (shards) terminan a la vez
+STATE_LOCK_TIMEOUT = 10.0
+
+# Inventario (Excel, CSV o JSONL): caché de la forma ya parseada (incluye las
+# contraseñas del inventario, por eso no está activa por defecto)
+INVENTORY_CACHE_ENABLED = False
+INVENTORY_CACHE_PATH = DATA_DIR / "inventory_cache.json"
 
 # Configuración GUI
 WINDOW_TITLE = "Network Device Automation"
 WINDOW_WIDTH = 500
-WINDOW_HEIGHT = 500
+WINDOW_HEIGHT = 580
 BUTTON_WIDTH = 20
 BUTTON_HEIGHT = 2
 BUTTON_PADDING = 10
+PROGRESS_POLL_INTERVAL_MS = 100  # Frecuencia de actualización del progreso
 
 # Jump host (bastion)
 JUMP_HOST_ENABLED = True  # Pon False si quieres desactivar el túnel
-JUMP_HOST = "10.52.130.8"  # IP/host de la máquina de salto por defecto (editable en GUI)
\ No newline at end of file
+JUMP_HOST = "10.52.130.8"  # IP/host de la máquina de salto por defecto (editable en GUI)
+
+# Ejecución concurrente
+MAX_WORKERS = 10  # Dispositivos procesados en paralelo (1 = ejecución en serie)
+
+# Tipo de dispositivo (driver de Netmiko)
+DEVICE_TYPE = "cisco_ios"  # Driver por defecto y si la detección no identifica la plataforma
+# Las optimizaciones que cambian cómo se conecta o qué se escribe en disco
+# son opcionales: se activan aquí o con su opción de la CLI
+PLATFORM_AUTODETECT = False  # Detecta el driver una vez por dispositivo y lo guarda en caché
+PLATFORM_CACHE_PATH = DATA_DIR / "platform_cache.json"
+
+# Conexión rápida: reutiliza el prompt y los comandos de preparación de la sesión anterior
+FAST_CONNECT = False
+SESSION_PROFILE_CACHE_PATH = DATA_DIR / "session_profiles.json"
+SESSION_PROFILE_TIMEOUT = 5.0  # Segundos para confirmar el prompt guardado antes de la preparación completa
+
+# Pre-flight: comprobación rápida del puerto SSH antes de conectar
+SSH_PORT = 22
+PREFLIGHT_ENABLED = False
+PREFLIGHT_TIMEOUT = 3.0  # Segundos por prueba TCP
+PREFLIGHT_WORKERS = 100  # Pruebas simultáneas
+
+# Circuit breaker: omite durante un tiempo los dispositivos que han fallado
+CIRCUIT_BREAKER_PATH = DATA_DIR / "circuit_breaker.json"
+CIRCUIT_BREAKER_BASE_DELAY = 300  # Segundos tras el primer fallo; se duplica con cada fallo
+CIRCUIT_BREAKER_MAX_DELAY = 24 * 3600
+
+# Métricas de latencia por fase
+METRICS_ENABLED = False  # Exporta métricas y traza al terminar cada ejecución
+METRICS_TRACE = True  # Guarda un evento por fase para la traza de la ejecución
+METRICS_TRACE_MAX_EVENTS = 200_000  # Eventos de traza por ejecución; los siguientes se descartan
+METRICS_PROMETHEUS_PATH = DATA_DIR / "metrics.prom"  # Para el textfile collector de node_exporter
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Pool de conexiones al jump host
+MAX_CHANNELS_PER_JUMP_HOST = 10  # Canales direct-tcpip simultáneos por bastion
+JUMP_HOST_KEEPALIVE = 30  # Segundos entre keepalives (0 = desactivado)
+
+# Backend de ejecución SSH
+SSH_BACKEND = "netmiko"  # "netmiko" (hilos) o "asyncssh" (asyncio, requiere asyncssh)
+ASYNC_MAX_SESSIONS = 500  # Sesiones simultáneas con el backend asyncssh
+
+# Modo snapshot: descarga la configuración una vez y evalúa los parámetros en local
+SNAPSHOT_MODE = False
+SNAPSHOT_COMMAND = "show configuration running-config"
+SNAPSHOT_READ_TIMEOUT = 120  # Segundos para descargar la configuración completa
+
+# Ritmo de envío de comandos (token bucket, comandos por segundo)
+GLOBAL_COMMAND_RATE = 200.0  # Límite total para toda la ejecución
+JUMP_HOST_COMMAND_RATE = 50.0  # Límite por jump host (protege bastion y TACACS+)
+DEVICE_COMMAND_RATE = 2.0  # Ritmo inicial por dispositivo, se adapta a su latencia
+DEVICE_COMMAND_RATE_MIN = 0.2
+DEVICE_COMMAND_RATE_MAX = 50.0
+SLOW_COMMAND_LATENCY = 5.0  # Segundos; por encima se reduce el ritmo del dispositivo
+
+# Caché de resultados para dispositivos sin cambios de configuración
+RESULT_CACHE_ENABLED = False
+RESULT_CACHE_PATH = DATA_DIR / "result_cache.json"
+RESULT_CACHE_TTL = 24 * 3600  # Segundos que una entrada se considera válida
+RESULT_CACHE_MAX_DEVICES = 50000
+CHANGE_INDICATOR_COMMAND = "show configuration running-config | in Last configuration change"
+CHANGE_INDICATOR_MARKER = "Last configuration change"
+
+# Procesado de la salida de los comandos
+SKIP_PATTERNS = [
+    "Building configuration",
+    "Current configuration",
+    "Date:",
+    "!",  # Comentarios de Cisco
+]
+RETAIN_OUTPUT_LINES = False  # Conservar las líneas encontradas además del conteo
+STREAMING_OUTPUT = False  # Procesar la salida a medida que llega, sin acumularla (backend netmiko)
+OUTPUT_BUFFER_COMPRESS = True  # Comprimir las líneas conservadas en memoria
+
+# Modo servicio: sesiones de dispositivo que se mantienen abiertas entre consultas
+SESSION_POOL_MAX_SESSIONS = 200  # Sesiones abiertas como máximo (LRU)
+SESSION_IDLE_TIMEOUT = 300  # Segundos sin uso antes de cerrar una sesión
+SESSION_KEEPALIVE = 30  # Segundos entre keepalives SSH (0 = desactivado)
+DAEMON_HOST = "127.0.0.1"  # Solo local: las consultas incluyen credenciales
+DAEMON_PORT = 8765
+
+# Reportes
+REPORT_FORMAT = "txt"  # "txt", "jsonl" o "csv"
+
+# Histórico de resultados (SQLite)
+RESULTS_STORE_ENABLED = False  # Guarda los resultados de cada ejecución en la base de datos
+RESULTS_DB_PATH = DATA_DIR / "results.db"
+RESULTS_STORE_BATCH_SIZE = 1000  # Resultados por transacción
+
+# Journal de la ejecución: permite reanudarla tras una interrupción
+RUN_JOURNAL_PATH = DATA_DIR / "run_journal.jsonl"
+
+# Almacén de la salida de los comandos (direccionado por contenido, deduplicado)
+SNAPSHOT_STORE_ENABLED = False  # Guarda la salida completa detrás de cada conteo, para auditoría
+SNAPSHOT_STORE_DIR = DATA_DIR / "snapshots"
+SNAPSHOT_CHUNK_MIN_LINES = 16  # Líneas mínimas por chunk
+SNAPSHOT_CHUNK_AVG_LINES = 64  # Tamaño medio de chunk buscado (en líneas)
+SNAPSHOT_CHUNK_MAX_LINES = 512  # Corte forzado si no aparece un punto de corte
+SNAPSHOT_COMPRESS_LEVEL = 6  # Nivel de zlib
+
+# Parseo de la salida en un pool de procesos (etapa entre la E/S y el writer)
+PARSE_PROCESSES = 0  # Procesos de parseo (0 = se parsea en el propio worker de E/S)
+PARSE_QUEUE_SIZE = 64  # Salidas pendientes de parsear como máximo (backpressure)
+PARSE_POOL_MIN_BYTES = 64 * 1024  # Las salidas más pequeñas se parsean sin cambiar de proceso
+
+# Consultas por sección sobre la configuración completa: "padre >> hijo"
+SECTION_QUERY_SEPARATOR = ">>"
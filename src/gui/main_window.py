@@ -1,16 +1,22 @@
 """Ventana principal de la aplicación."""
 import tkinter as tk
-from tkinter import messagebox
-from typing import Callable
+from tkinter import messagebox, ttk
+from typing import TYPE_CHECKING, Callable, Optional, Union
 import os
 import platform
+import queue
+import threading
 
 from ..config.constants import (
     WINDOW_TITLE, WINDOW_WIDTH, WINDOW_HEIGHT,
-    BUTTON_PADDING, JUMP_HOST_ENABLED, JUMP_HOST,
+    BUTTON_PADDING, JUMP_HOST_ENABLED, JUMP_HOST, PROGRESS_POLL_INTERVAL_MS,
+    RUN_JOURNAL_PATH,
 )
-from ..services.excel_service import ExcelService
-from ..services.device_service import DeviceService
+from ..models.progress import Progress
+
+if TYPE_CHECKING:
+    from ..services.excel_service import ExcelService
+    from ..services.device_service import DeviceService
 
 
 class MainWindow:
@@ -19,8 +25,17 @@ class MainWindow:
     def __init__(self, root: tk.Tk):
         """Inicializa la ventana principal."""
         self.root = root
-        self.excel_service = ExcelService()
-        self.device_service = DeviceService()
+        # Los servicios se crean al primer uso para que la ventana aparezca
+        # sin esperar a importar netmiko, paramiko u openpyxl
+        self._excel_service: Optional["ExcelService"] = None
+        self._device_service: Optional["DeviceService"] = None
+        
+        # Estado de la ejecución en segundo plano: el hilo worker solo se
+        # comunica con la interfaz a través de la cola
+        self._events: "queue.Queue[tuple]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._cancel_event: Optional[threading.Event] = None
+        self._close_requested = False
         
         # Variables para jump host (las leeremos al pulsar Run)
         self.jump_host_var = tk.StringVar(value=JUMP_HOST)
@@ -29,6 +44,23 @@ class MainWindow:
         
         self._setup_window()
         self._create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+    
+    @property
+    def excel_service(self) -> "ExcelService":
+        """Servicio de Excel, creado la primera vez que se necesita."""
+        if self._excel_service is None:
+            from ..services.excel_service import ExcelService
+            self._excel_service = ExcelService()
+        return self._excel_service
+    
+    @property
+    def device_service(self) -> "DeviceService":
+        """Servicio de dispositivos, creado la primera vez que se necesita."""
+        if self._device_service is None:
+            from ..services.device_service import DeviceService
+            self._device_service = DeviceService()
+        return self._device_service
     
     def _setup_window(self) -> None:
         """Configura las propiedades de la ventana."""
@@ -127,6 +159,32 @@ class MainWindow:
             fg="white",
         )
         self.clear_excel_button.pack(pady=BUTTON_PADDING)
+        
+        # Progreso de la ejecución
+        progress_frame = tk.Frame(main_frame)
+        progress_frame.pack(fill="x", pady=(5, 0))
+        
+        self.progress_bar = ttk.Progressbar(
+            progress_frame, orient="horizontal", mode="determinate", maximum=100
+        )
+        self.progress_bar.pack(side="left", expand=True, fill="x")
+        
+        self.cancel_button = tk.Button(
+            progress_frame,
+            text="✖ Cancel",
+            command=self._on_cancel_click,
+            state="disabled",
+            font=("Arial", 9),
+        )
+        self.cancel_button.pack(side="left", padx=(5, 0))
+        
+        self.progress_var = tk.StringVar()
+        tk.Label(
+            main_frame,
+            textvariable=self.progress_var,
+            font=("Arial", 9),
+            fg="#7F8C8D",
+        ).pack(fill="x", pady=(4, 0))
     
     def _create_button(
         self,
@@ -157,6 +215,9 @@ class MainWindow:
     
     def _on_run_click(self) -> None:
         """Maneja el click del botón Run."""
+        if self._worker is not None:
+            return
+        
         if not self.excel_service.exists():
             messagebox.showwarning(
                 "Excel no encontrado",
@@ -165,51 +226,190 @@ class MainWindow:
             )
             return
         
+        resume = self._ask_resume()
+        if resume is False:
+            return
+        
         # Recoger config de jump host
         jump_host = self.jump_host_var.get().strip()
         jump_user = self.jump_user_var.get().strip()
         jump_pass = self.jump_pass_var.get().strip()
         
-        # Deshabilitar botón durante ejecución
+        # Deshabilitar botones durante ejecución
         self.run_button.config(state="disabled", text="⏳ Ejecutando...")
-        self.root.update()
+        self.clear_excel_button.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        self.progress_bar["value"] = 0
+        self.progress_var.set("Leyendo dispositivos...")
+        
+        # La ejecución corre en un hilo aparte para no bloquear la ventana
+        self._cancel_event = threading.Event()
+        self._worker = threading.Thread(
+            target=self._run_automation,
+            args=(
+                jump_host if jump_host else None,
+                jump_user if jump_user else None,
+                jump_pass if jump_pass else None,
+                self._cancel_event,
+                resume,
+            ),
+            name="automation-worker",
+            daemon=True,
+        )
+        self._worker.start()
+        self.root.after(PROGRESS_POLL_INTERVAL_MS, self._poll_events)
+    
+    def _ask_resume(self) -> Union[str, None, bool]:
+        """
+        Si la ejecución anterior no terminó, pregunta si reanudarla.
         
+        Returns:
+            "resume" para reanudarla, None para empezar de cero o False si
+            el usuario cancela
+        """
+        from ..services.run_journal import RESUME, RunJournal
+        
+        status = RunJournal(RUN_JOURNAL_PATH).status()
+        if status is None or status["finished"] or not status["completed"]:
+            return None
+        
+        answer = messagebox.askyesnocancel(
+            "Ejecución interrumpida",
+            f"La ejecución anterior no terminó: {status['completed']} dispositivos "
+            "completados.\n\n¿Reanudarla sin repetir esos dispositivos?\n\n"
+            "Sí: reanudar · No: empezar de cero",
+        )
+        if answer is None:
+            return False
+        return RESUME if answer else None
+    
+    def _run_automation(
+        self,
+        jump_host: Optional[str],
+        jump_user: Optional[str],
+        jump_pass: Optional[str],
+        cancel_event: threading.Event,
+        resume: Optional[str] = None,
+    ) -> None:
+        """Ejecuta la automatización en el hilo worker (sin tocar widgets)."""
         try:
             devices = self.excel_service.read_devices()
             
             if not devices:
-                messagebox.showwarning(
-                    "Sin dispositivos",
-                    "No hay dispositivos registrados en el Excel.\n\n"
-                    "Agrega dispositivos antes de ejecutar.",
-                )
+                self._events.put(("empty",))
                 return
             
+            self._events.put(("started", len(devices)))
+            
             # Ejecutar automatización (pasando datos de jump host)
             output_file = self.device_service.execute_automation(
                 devices,
-                jump_host=jump_host if jump_host else None,
-                jump_user=jump_user if jump_user else None,
-                jump_pass=jump_pass if jump_pass else None,
-            )
-            
-            self._open_text_file(output_file)
-            
-            messagebox.showinfo(
-                "✓ Proceso Completado",
-                f"Se procesaron {len(devices)} dispositivos correctamente.\n\n"
-                f"El archivo de resultados se ha abierto automáticamente.",
+                jump_host=jump_host,
+                jump_user=jump_user,
+                jump_pass=jump_pass,
+                progress_callback=lambda progress: self._events.put(("progress", progress)),
+                cancel_event=cancel_event,
+                resume=resume,
             )
+            self._events.put(("done", output_file, len(devices), cancel_event.is_set()))
         
         except Exception as e:
+            self._events.put(("error", str(e)))
+    
+    def _poll_events(self) -> None:
+        """Procesa los eventos del worker desde el hilo de la interfaz."""
+        finished = False
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                break
+            
+            kind = event[0]
+            if kind == "started":
+                self.progress_var.set(f"0/{event[1]} dispositivos")
+            elif kind == "progress":
+                self._show_progress(event[1])
+            else:
+                finished = True
+                self._finish_run()
+                if not self._close_requested:
+                    self._show_result(event)
+        
+        if self._close_requested and finished:
+            self.root.destroy()
+        elif not finished:
+            self.root.after(PROGRESS_POLL_INTERVAL_MS, self._poll_events)
+    
+    def _show_progress(self, progress: Progress) -> None:
+        """Actualiza la barra y el texto de progreso."""
+        self.progress_bar["value"] = progress.percent
+        text = str(progress)
+        if self._cancel_event is not None and self._cancel_event.is_set():
+            text += " · cancelando..."
+        self.progress_var.set(text)
+    
+    def _finish_run(self) -> None:
+        """Restablece los controles al terminar la ejecución."""
+        self._worker = None
+        self._cancel_event = None
+        self.run_button.config(state="normal", text="▶ Run")
+        self.clear_excel_button.config(state="normal")
+        self.cancel_button.config(state="disabled")
+    
+    def _show_result(self, event: tuple) -> None:
+        """Muestra el resultado final de la ejecución."""
+        kind = event[0]
+        if kind == "empty":
+            self.progress_var.set("")
+            messagebox.showwarning(
+                "Sin dispositivos",
+                "No hay dispositivos registrados en el Excel.\n\n"
+                "Agrega dispositivos antes de ejecutar.",
+            )
+        elif kind == "error":
+            self.progress_var.set("✗ Error en la ejecución")
             messagebox.showerror(
                 "Error",
-                f"Error al ejecutar el proceso:\n\n{str(e)}\n\n"
+                f"Error al ejecutar el proceso:\n\n{event[1]}\n\n"
                 f"Revisa la consola para más detalles.",
             )
+        elif kind == "done":
+            _, output_file, device_count, cancelled = event
+            self._open_text_file(output_file)
+            
+            if cancelled:
+                self.progress_var.set(f"⚠ Cancelado · {self.progress_var.get()}")
+                messagebox.showwarning(
+                    "Proceso cancelado",
+                    "La ejecución se ha cancelado.\n\n"
+                    "El archivo de resultados contiene los dispositivos ya procesados "
+                    "y se ha abierto automáticamente.",
+                )
+            else:
+                self.progress_bar["value"] = 100
+                messagebox.showinfo(
+                    "✓ Proceso Completado",
+                    f"Se procesaron {device_count} dispositivos correctamente.\n\n"
+                    f"El archivo de resultados se ha abierto automáticamente.",
+                )
+    
+    def _on_cancel_click(self) -> None:
+        """Solicita la cancelación: no se inician más dispositivos."""
+        if self._cancel_event is not None and not self._cancel_event.is_set():
+            self._cancel_event.set()
+            self.cancel_button.config(state="disabled")
+            self.progress_var.set(self.progress_var.get() + " · cancelando...")
+    
+    def _on_close(self) -> None:
+        """Cierra la ventana, cancelando antes la ejecución en curso."""
+        if self._worker is None:
+            self.root.destroy()
+            return
         
-        finally:
-            self.run_button.config(state="normal", text="▶ Run")
+        # Se espera a que el worker cierre el reporte con los resultados parciales
+        self._close_requested = True
+        self._on_cancel_click()
     
     def _on_open_excel_click(self) -> None:
         """Maneja el click del botón Open Excel."""
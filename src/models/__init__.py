@@ -1,5 +1,7 @@
 """Models module."""
 from .device import Device
 from .command_result import CommandResult
+from .output_buffer import OutputBuffer
+from .progress import Progress
 
-__all__ = ['Device', 'CommandResult']
+__all__ = ['Device', 'CommandResult', 'OutputBuffer', 'Progress']
@@ -1,17 +1,98 @@
 """Modelo para resultados de comandos SSH."""
-from dataclasses import dataclass
-from typing import List
+from concurrent.futures import Future
+from typing import List, Optional
+import sys
+
+from .output_buffer import OutputBuffer
 
 
-@dataclass
 class CommandResult:
-    """Representa el resultado de ejecutar un comando en un dispositivo."""
-    device_name: str
-    parameter: str
-    output_lines: List[str]
-    line_count: int
-    success: bool
-    error_message: str = ""
+    """
+    Representa el resultado de ejecutar un comando en un dispositivo.
+    
+    Usa ``__slots__`` y por defecto no conserva las líneas de salida, ya que
+    el reporte solo necesita el conteo. Si se indica un ``OutputBuffer``, las
+    líneas se guardan en él y el resultado solo mantiene su referencia.
+    """
+    
+    __slots__ = (
+        "device_name",
+        "parameter",
+        "line_count",
+        "success",
+        "error_message",
+        "_buffer",
+        "_output_ref",
+        "snapshot_id",
+        "parsing",
+    )
+    
+    def __init__(
+        self,
+        device_name: str,
+        parameter: str,
+        output_lines: Optional[List[str]],
+        line_count: int,
+        success: bool,
+        error_message: str = "",
+        buffer: Optional[OutputBuffer] = None,
+        snapshot_id: Optional[str] = None,
+    ):
+        # Nombres, parámetros y errores se repiten en miles de resultados
+        self.device_name = sys.intern(device_name)
+        self.parameter = sys.intern(parameter)
+        self.line_count = line_count
+        self.success = success
+        self.error_message = sys.intern(error_message) if error_message else ""
+        self._buffer = buffer
+        self._output_ref = buffer.store(output_lines) if buffer is not None and output_lines else None
+        # Identificador de la salida completa en el SnapshotStore, si se guardó
+        self.snapshot_id = snapshot_id
+        # Future del parseo en el ParsePool; None cuando el conteo es definitivo
+        self.parsing: Optional[Future] = None
+    
+    def fill(self, line_count: int, output_lines: Optional[List[str]]) -> None:
+        """Completa un resultado creado antes de que terminara su parseo."""
+        self.line_count = line_count
+        self._output_ref = (
+            self._buffer.store(output_lines) if self._buffer is not None and output_lines else None
+        )
+    
+    @property
+    def output_lines(self) -> List[str]:
+        """Líneas de salida, solo disponibles si se guardaron en un buffer."""
+        if self._output_ref is None:
+            return []
+        return self._buffer.load(self._output_ref)
+    
+    def to_dict(self) -> dict:
+        """Representación serializable (sin las líneas de salida)."""
+        data = {
+            "device": self.device_name,
+            "parameter": self.parameter,
+            "line_count": self.line_count,
+            "success": self.success,
+            "error_message": self.error_message,
+        }
+        if self.snapshot_id:
+            data["snapshot_id"] = self.snapshot_id
+        return data
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CommandResult):
+            return NotImplemented
+        return (
+            self.device_name == other.device_name
+            and self.parameter == other.parameter
+            and self.line_count == other.line_count
+            and self.success == other.success
+            and self.error_message == other.error_message
+        )
+    
+    def __repr__(self) -> str:
+        return (f"CommandResult(device_name={self.device_name!r}, "
+                f"parameter={self.parameter!r}, line_count={self.line_count}, "
+                f"success={self.success}, error_message={self.error_message!r})")
     
     def __str__(self) -> str:
         """Representación string del resultado."""
@@ -1,6 +1,26 @@
 """Modelo de datos para dispositivos de red."""
 from dataclasses import dataclass
-from typing import List
+from typing import List, Tuple
+
+from ..config.constants import SSH_PORT
+
+
+def parse_address(value: str, default_port: int = SSH_PORT) -> Tuple[str, int]:
+    """
+    Separa ``host:puerto`` en (host, puerto).
+    
+    Sin puerto se usa ``default_port``. Las direcciones IPv6 con puerto
+    van entre corchetes (``[2001:db8::1]:2222``); sin corchetes se toman
+    completas como host.
+    """
+    if value.startswith("["):
+        host, _, rest = value[1:].partition("]")
+        port = rest[1:] if rest.startswith(":") else ""
+    elif value.count(":") == 1:
+        host, _, port = value.partition(":")
+    else:
+        host, port = value, ""
+    return host, int(port) if port.isdigit() else default_port
 
 
 @dataclass
@@ -18,6 +38,11 @@ class Device:
         # Limpiar espacios y separar por comas
         return [p.strip() for p in self.parameter.split(',') if p.strip()]
     
+    @property
+    def address(self) -> Tuple[str, int]:
+        """(host, puerto SSH); el nombre admite la forma ``host:puerto``."""
+        return parse_address(self.name)
+    
     def __str__(self) -> str:
         """Representación string del dispositivo (oculta password)."""
         return (f"Device(name={self.name}, user={self.user}, "
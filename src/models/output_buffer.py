@@ -0,0 +1,72 @@
+"""Almacén compartido para las líneas de salida de los comandos."""
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import threading
+import zlib
+
+
+OutputRef = Tuple[int, int]
+
+
+class OutputBuffer:
+    """
+    Guarda las líneas de salida de muchos resultados en un único buffer.
+    
+    Cada bloque de líneas se identifica por su hash: si dos resultados
+    tienen exactamente la misma salida, ambos apuntan al mismo bloque.
+    Los bloques se guardan comprimidos con zlib y se referencian por
+    (offset, longitud).
+    """
+    
+    def __init__(self, compress: bool = True):
+        """Inicializa el buffer vacío."""
+        self.compress = compress
+        self._data = bytearray()
+        self._index: Dict[bytes, OutputRef] = {}
+        self._lock = threading.Lock()
+    
+    def store(self, lines: List[str]) -> Optional[OutputRef]:
+        """
+        Guarda un bloque de líneas.
+        
+        Returns:
+            Referencia (offset, longitud) al bloque, o None si no hay líneas
+        """
+        if not lines:
+            return None
+        
+        raw = "\n".join(lines).encode("utf-8")
+        key = hashlib.blake2b(raw, digest_size=16).digest()
+        
+        with self._lock:
+            ref = self._index.get(key)
+            if ref is not None:
+                return ref
+        
+        blob = zlib.compress(raw) if self.compress else raw
+        
+        with self._lock:
+            ref = self._index.get(key)
+            if ref is None:
+                ref = (len(self._data), len(blob))
+                self._data += blob
+                self._index[key] = ref
+            return ref
+    
+    def load(self, ref: OutputRef) -> List[str]:
+        """Recupera las líneas de un bloque."""
+        offset, length = ref
+        with self._lock:
+            blob = bytes(self._data[offset:offset + length])
+        raw = zlib.decompress(blob) if self.compress else blob
+        return raw.decode("utf-8").split("\n")
+    
+    @property
+    def size_bytes(self) -> int:
+        """Bytes ocupados por los bloques almacenados."""
+        return len(self._data)
+    
+    @property
+    def block_count(self) -> int:
+        """Número de bloques distintos almacenados."""
+        return len(self._index)
@@ -0,0 +1,36 @@
+"""Modelo para el progreso de una ejecución."""
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class Progress:
+    """Estado de la ejecución tras terminar un dispositivo."""
+    completed: int
+    total: int
+    device_name: str
+    elapsed: float
+    reused: int = 0  # Completados en una ejecución anterior (reanudación)
+    
+    @property
+    def throughput(self) -> float:
+        """Dispositivos terminados por segundo (sin contar los reutilizados)."""
+        return (self.completed - self.reused) / self.elapsed if self.elapsed > 0 else 0.0
+    
+    @property
+    def eta(self) -> Optional[float]:
+        """Segundos estimados hasta terminar, o None si aún no se puede estimar."""
+        if self.throughput <= 0:
+            return None
+        return (self.total - self.completed) / self.throughput
+    
+    @property
+    def percent(self) -> float:
+        """Porcentaje de dispositivos terminados."""
+        return 100.0 * self.completed / self.total if self.total else 100.0
+    
+    def __str__(self) -> str:
+        """Representación string del progreso."""
+        eta = f"{self.eta:.0f}s" if self.eta is not None else "--"
+        return (f"{self.completed}/{self.total} dispositivos · "
+                f"{self.throughput:.1f} disp/s · ETA {eta}")
@@ -1,6 +1,28 @@
-"""Services module."""
-from .excel_service import ExcelService
-from .device_service import DeviceService
-from .ssh_service import SSHService
+"""
+Services module.
+
+Los servicios se importan bajo demanda: importar el paquete no carga
+openpyxl, netmiko ni paramiko hasta que se usa el servicio que los necesita.
+"""
+from importlib import import_module
+
+_LAZY_ATTRIBUTES = {
+    'ExcelService': '.excel_service',
+    'DeviceService': '.device_service',
+    'SSHService': '.ssh_service',
+}
 
 __all__ = ['ExcelService', 'DeviceService', 'SSHService']
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,500 @@
+"""Backend SSH asíncrono basado en asyncio y asyncssh."""
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+import asyncio
+import re
+import threading
+import time
+
+try:
+    import asyncssh
+except ImportError:  # Dependencia opcional, solo necesaria para este backend
+    asyncssh = None
+
+from ..models.device import Device, parse_address
+from ..models.command_result import CommandResult
+from ..config.constants import (
+    ASYNC_MAX_SESSIONS, DEVICE_TYPE, MAX_CHANNELS_PER_JUMP_HOST,
+    SNAPSHOT_MODE, SNAPSHOT_COMMAND, SNAPSHOT_READ_TIMEOUT,
+    CHANGE_INDICATOR_COMMAND,
+)
+from .config_index import split_section_queries
+from .metrics import Metrics
+from .parse_pool import when_parsed
+from .ssh_service import SSHService
+
+
+PROMPT_PATTERN = re.compile(r"[\w.\-@/:()]+[>#]\s*$")
+
+T = TypeVar("T")
+
+
+class AsyncSSHService(SSHService):
+    """
+    Ejecuta comandos sobre miles de dispositivos en un único event loop.
+    
+    Mantiene el mismo contrato que ``SSHService``: cada dispositivo produce
+    una lista de ``CommandResult`` en el orden de sus parámetros.
+    """
+    
+    def __init__(
+        self,
+        device_type: str = DEVICE_TYPE,
+        timeout: int = 30,
+        max_sessions: int = ASYNC_MAX_SESSIONS,
+        snapshot_mode: bool = SNAPSHOT_MODE,
+    ):
+        if asyncssh is None:
+            raise ImportError(
+                "El backend 'asyncssh' requiere instalar asyncssh: "
+                "pip install asyncssh"
+            )
+        super().__init__(
+            device_type=device_type,
+            timeout=timeout,
+            snapshot_mode=snapshot_mode,
+        )
+        self.max_sessions = max(1, max_sessions)
+    
+    def execute_commands_on_device(
+        self,
+        device: Device,
+        jump_host: Optional[str] = None,
+        jump_user: Optional[str] = None,
+        jump_pass: Optional[str] = None,
+    ) -> List[CommandResult]:
+        """Versión síncrona para un único dispositivo."""
+        results = asyncio.run(
+            self.execute_devices([device], jump_host, jump_user, jump_pass)
+        )
+        return results[0]
+    
+    async def execute_devices(
+        self,
+        devices: List[Device],
+        jump_host: Optional[str] = None,
+        jump_user: Optional[str] = None,
+        jump_pass: Optional[str] = None,
+        on_device_done: Optional[Callable[[int, List[CommandResult], float], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> List[Optional[List[CommandResult]]]:
+        """
+        Ejecuta los comandos de todos los dispositivos de forma concurrente.
+        
+        Args:
+            devices: Dispositivos a procesar
+            jump_host: Host del bastion (opcional)
+            jump_user: Usuario del bastion (opcional)
+            jump_pass: Contraseña del bastion (opcional)
+            on_device_done: Callback (índice, resultados, duración) al terminar
+                cada dispositivo
+            cancel_event: Si se activa, los dispositivos que aún no han
+                empezado se omiten
+        
+        Returns:
+            Resultados por dispositivo, en el mismo orden que ``devices``
+            (None para los omitidos por cancelación)
+        """
+        session_limit = asyncio.Semaphore(self.max_sessions)
+        tunnels = _TunnelCache(self.timeout, self.metrics)
+        
+        async def run_one(idx: int, device: Device) -> Optional[List[CommandResult]]:
+            async with session_limit:
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+                device_start = time.perf_counter()
+                try:
+                    results = await self.execute_commands_on_device_async(
+                        device, jump_host, jump_user, jump_pass, tunnels=tunnels
+                    )
+                except Exception as e:
+                    # Un fallo inesperado no debe afectar al resto de dispositivos
+                    results = []
+                    self._add_error_results(
+                        results,
+                        device,
+                        device.get_parameters_list(),
+                        error_message=f"Error inesperado: {str(e)}",
+                    )
+                duration = time.perf_counter() - device_start
+                self.metrics.observe(
+                    "device",
+                    duration,
+                    device.name,
+                    jump_host,
+                    start=device_start,
+                    success=all(r.success for r in results),
+                )
+                if on_device_done is not None:
+                    on_device_done(idx, results, duration)
+                return results
+        
+        try:
+            return await asyncio.gather(
+                *(run_one(idx, device) for idx, device in enumerate(devices))
+            )
+        finally:
+            tunnels.close()
+    
+    async def execute_commands_on_device_async(
+        self,
+        device: Device,
+        jump_host: Optional[str] = None,
+        jump_user: Optional[str] = None,
+        jump_pass: Optional[str] = None,
+        tunnels: Optional["_TunnelCache"] = None,
+    ) -> List[CommandResult]:
+        """Ejecuta comandos en un dispositivo, opcionalmente a través de jump host."""
+        results: List[CommandResult] = []
+        parameters = device.get_parameters_list()
+        
+        if not parameters:
+            print(f"⚠ No hay parámetros definidos para {device.name}")
+            return results
+        
+        print(f"📡 Conectando a {device.name}...")
+        
+        own_tunnels = tunnels is None
+        if own_tunnels:
+            tunnels = _TunnelCache(self.timeout, self.metrics)
+        
+        try:
+            tunnel = None
+            channel_limit = None
+            if jump_host and jump_user and jump_pass:
+                tunnel, channel_limit = await tunnels.get(
+                    jump_host, jump_user, jump_pass
+                )
+            
+            if channel_limit is not None:
+                with self.metrics.span("channel_wait", device.name, jump_host):
+                    await channel_limit.acquire()
+                try:
+                    await self._run_session(
+                        device, parameters, results, tunnel, jump_host
+                    )
+                finally:
+                    channel_limit.release()
+            else:
+                await self._run_session(device, parameters, results, tunnel, jump_host)
+            
+            print(f"✓ Comandos completados en {device.name}")
+        
+        except asyncssh.PermissionDenied:
+            error_msg = "Fallo de autenticación"
+            print(f"✗ {error_msg} en {device.name}")
+            self._add_error_results(results, device, parameters, error_message=error_msg)
+        
+        except (asyncio.TimeoutError, TimeoutError):
+            error_msg = "Timeout de conexión"
+            print(f"✗ {error_msg} al conectar a {device.name}")
+            self._add_error_results(results, device, parameters, error_message=error_msg)
+        
+        except Exception as e:
+            error_msg = str(e) or type(e).__name__
+            print(f"✗ Error en {device.name}: {error_msg}")
+            self._add_error_results(results, device, parameters, error_message=error_msg)
+        
+        finally:
+            if own_tunnels:
+                tunnels.close()
+        
+        return results
+    
+    async def _run_session(
+        self,
+        device: Device,
+        parameters: List[str],
+        results: List[CommandResult],
+        tunnel=None,
+        jump_host: Optional[str] = None,
+    ) -> None:
+        """Abre la sesión interactiva con el dispositivo y ejecuta los comandos."""
+        connect_options = {
+            "username": device.user,
+            "password": device.password,
+            "known_hosts": None,
+        }
+        if tunnel is not None:
+            connect_options["tunnel"] = tunnel  # túnel a través del jump host
+        
+        host, port = device.address
+        # Con túnel, incluye la apertura del canal por el bastion
+        with self.metrics.span("device_auth", device.name, jump_host):
+            conn = await asyncio.wait_for(
+                asyncssh.connect(host, port=port, **connect_options),
+                timeout=self.timeout,
+            )
+        
+        async with conn:
+            with self.metrics.span("prompt_discovery", device.name, jump_host):
+                process = await conn.create_process(term_type="vt100")
+                prompt = await self._read_until_prompt(process, PROMPT_PATTERN)
+                prompt = prompt.strip().splitlines()[-1].strip()
+                prompt_pattern = re.compile(re.escape(prompt) + r"\s*$")
+                
+                process.stdin.write("terminal length 0\n")
+                await self._read_until_prompt(process, prompt_pattern)
+            print(f"✓ Conexión exitosa a {device.name}")
+            
+            indicator = await self._get_change_indicator_async(
+                process, prompt, prompt_pattern, device, jump_host
+            )
+            cached_results = self._get_cached_results(device, parameters, indicator)
+            
+            if cached_results is not None:
+                print(f"✓ Sin cambios en {device.name}: se reutilizan resultados en caché")
+                results.extend(cached_results)
+            elif self.snapshot_mode:
+                await self._run_snapshot_async(
+                    process, prompt, prompt_pattern, device, parameters, results,
+                    jump_host,
+                )
+            else:
+                flat, sections = split_section_queries(parameters)
+                if not sections:
+                    await self._run_commands_async(
+                        process, prompt, prompt_pattern, device, parameters, results,
+                        jump_host,
+                    )
+                else:
+                    # Las consultas por sección se resuelven sobre la configuración completa
+                    flat_results: List[CommandResult] = []
+                    section_results: List[CommandResult] = []
+                    if flat:
+                        await self._run_commands_async(
+                            process, prompt, prompt_pattern, device, flat, flat_results,
+                            jump_host,
+                        )
+                    await self._run_snapshot_async(
+                        process, prompt, prompt_pattern, device, sections, section_results,
+                        jump_host,
+                    )
+                    results.extend(self._merge_results(parameters, flat_results, section_results))
+            
+            if indicator and cached_results is None:
+                # Con pool de parseo, los conteos se guardan cuando terminan de parsearse
+                device_results = list(results)
+                when_parsed(
+                    device_results,
+                    lambda: self.result_cache.put(device.name, indicator, device_results),
+                )
+            
+            process.stdin.write("exit\n")
+            process.close()
+    
+    async def _run_commands_async(
+        self,
+        process,
+        prompt: str,
+        prompt_pattern: "re.Pattern",
+        device: Device,
+        parameters: List[str],
+        results: List[CommandResult],
+        jump_host: Optional[str] = None,
+    ) -> None:
+        """Ejecuta un comando filtrado por cada parámetro."""
+        for param in parameters:
+            command = f"show configuration running-config | in {param}"
+            
+            try:
+                await asyncio.sleep(self.pacer.reserve(device.name, jump_host))
+                command_start = time.perf_counter()
+                with self.metrics.span("command", device.name, jump_host, command=command):
+                    process.stdin.write(command + "\n")
+                    raw = await self._read_until_prompt(
+                        process, prompt_pattern, read_timeout=20
+                    )
+                self.pacer.record(device.name, time.perf_counter() - command_start)
+                
+                def parse() -> CommandResult:
+                    with self.metrics.span("parse", device.name, jump_host):
+                        output = self._strip_echo_and_prompt(raw, command, prompt)
+                        # Con pool de parseo, la sesión sigue con el siguiente
+                        # comando mientras se parsea
+                        return self._process_command_output(device.name, param, output)
+                
+                results.append(await self._run_blocking(parse))
+            
+            except Exception as cmd_error:
+                self.pacer.record(device.name, 0.0, success=False)
+                error_msg = f"Error ejecutando comando: {str(cmd_error)}"
+                print(f"    ✗ {device.name}: {error_msg}")
+                results.append(
+                    CommandResult(
+                        device_name=device.name,
+                        parameter=param,
+                        output_lines=[],
+                        line_count=0,
+                        success=False,
+                        error_message=error_msg,
+                    )
+                )
+    
+    async def _get_change_indicator_async(
+        self,
+        process,
+        prompt: str,
+        prompt_pattern: "re.Pattern",
+        device: Device,
+        jump_host: Optional[str] = None,
+    ) -> Optional[str]:
+        """Obtiene la marca de último cambio de configuración del dispositivo."""
+        if self.result_cache is None:
+            return None
+        
+        try:
+            await asyncio.sleep(self.pacer.reserve(device.name, jump_host))
+            with self.metrics.span(
+                "command", device.name, jump_host, command=CHANGE_INDICATOR_COMMAND
+            ):
+                process.stdin.write(CHANGE_INDICATOR_COMMAND + "\n")
+                raw = await self._read_until_prompt(process, prompt_pattern, read_timeout=20)
+        except Exception as e:
+            print(f"    ⚠ {device.name}: no se pudo obtener el indicador de cambios: {e}")
+            return None
+        
+        output = self._strip_echo_and_prompt(raw, CHANGE_INDICATOR_COMMAND, prompt)
+        return self._parse_change_indicator(output)
+    
+    async def _run_snapshot_async(
+        self,
+        process,
+        prompt: str,
+        prompt_pattern: "re.Pattern",
+        device: Device,
+        parameters: List[str],
+        results: List[CommandResult],
+        jump_host: Optional[str] = None,
+    ) -> None:
+        """Descarga la configuración una sola vez y evalúa todos los parámetros."""
+        try:
+            await asyncio.sleep(self.pacer.reserve(device.name, jump_host))
+            with self.metrics.span("command", device.name, jump_host, command=SNAPSHOT_COMMAND):
+                process.stdin.write(SNAPSHOT_COMMAND + "\n")
+                raw = await self._read_until_prompt(
+                    process, prompt_pattern, read_timeout=SNAPSHOT_READ_TIMEOUT
+                )
+        except Exception as cmd_error:
+            error_msg = f"Error ejecutando comando: {str(cmd_error)}"
+            print(f"    ✗ {device.name}: {error_msg}")
+            self._add_error_results(results, device, parameters, error_message=error_msg)
+            return
+        
+        def parse() -> List[CommandResult]:
+            with self.metrics.span("parse", device.name, jump_host):
+                output = self._strip_echo_and_prompt(raw, SNAPSHOT_COMMAND, prompt)
+                return self._process_snapshot_output(device.name, parameters, output)
+        
+        results.extend(await self._run_blocking(parse))
+    
+    @staticmethod
+    async def _run_blocking(func: Callable[[], T]) -> T:
+        """
+        Ejecuta ``func`` en un hilo sin bloquear el bucle de asyncio.
+        
+        El filtrado, la entrega al pool de parseo (que espera si su cola está
+        llena) y la escritura comprimida del snapshot tardan en proporción a
+        la salida; en el bucle retrasarían la lectura de todas las sesiones.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, func)
+    
+    async def _read_until_prompt(
+        self,
+        process,
+        prompt_pattern: "re.Pattern",
+        read_timeout: Optional[float] = None,
+    ) -> str:
+        """Lee del canal hasta que la última línea coincide con el prompt."""
+        chunks: List[str] = []
+        tail = ""
+        deadline = time.monotonic() + (read_timeout or self.timeout)
+        
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            
+            chunk = await asyncio.wait_for(process.stdout.read(65536), remaining)
+            if not chunk:
+                raise EOFError("El dispositivo cerró la sesión")
+            
+            chunks.append(chunk)
+            # Solo hace falta examinar la última línea para detectar el prompt
+            tail = (tail + chunk).rsplit("\n", 1)[-1]
+            if prompt_pattern.search(tail):
+                return "".join(chunks)
+    
+    @staticmethod
+    def _strip_echo_and_prompt(raw: str, command: str, prompt: str) -> str:
+        """Elimina el eco del comando y el prompt final de la salida."""
+        output = raw.replace("\r\n", "\n")
+        first_line, _, rest = output.partition("\n")
+        if command in first_line:
+            output = rest
+        head, sep, last_line = output.rpartition("\n")
+        if prompt in last_line:
+            output = head
+        return output
+
+
+class _TunnelCache:
+    """Conexiones asyncssh compartidas por (jump_host, jump_user)."""
+    
+    def __init__(self, timeout: int, metrics: Metrics):
+        self.timeout = timeout
+        self.metrics = metrics
+        self._tunnels: Dict[Tuple[str, str], "asyncio.Task"] = {}
+        self._limits: Dict[Tuple[str, str], asyncio.Semaphore] = {}
+    
+    async def get(
+        self,
+        jump_host: str,
+        jump_user: str,
+        jump_pass: str,
+    ) -> Tuple[object, asyncio.Semaphore]:
+        """Retorna el túnel al bastion y el semáforo que limita sus canales."""
+        key = (jump_host, jump_user)
+        task = self._tunnels.get(key)
+        
+        # Reconectar si el túnel anterior falló o se cerró
+        if task is not None and task.done():
+            if task.cancelled() or task.exception() is not None or _is_closed(task.result()):
+                task = None
+        
+        if task is None:
+            print(f"→ Conectando con jump host: {jump_host}")
+            task = asyncio.ensure_future(self._connect(jump_host, jump_user, jump_pass))
+            self._tunnels[key] = task
+            self._limits.setdefault(key, asyncio.Semaphore(MAX_CHANNELS_PER_JUMP_HOST))
+        
+        return await asyncio.shield(task), self._limits[key]
+    
+    async def _connect(self, jump_host: str, jump_user: str, jump_pass: str):
+        """Conecta y autentica con el bastion."""
+        host, port = parse_address(jump_host)
+        with self.metrics.span("bastion_handshake", jump_host=jump_host):
+            return await asyncio.wait_for(
+                asyncssh.connect(
+                    host,
+                    port=port,
+                    username=jump_user,
+                    password=jump_pass,
+                    known_hosts=None,
+                ),
+                timeout=self.timeout,
+            )
+    
+    def close(self) -> None:
+        """Cierra todos los túneles abiertos."""
+        for task in self._tunnels.values():
+            if task.done() and not task.cancelled() and task.exception() is None:
+                task.result().close()
+            elif not task.done():
+                task.cancel()
+        self._tunnels.clear()
+
+
+def _is_closed(conn) -> bool:
+    """Indica si una conexión asyncssh ya no es utilizable."""
+    is_closed = getattr(conn, "is_closed", None)
+    return bool(is_closed()) if callable(is_closed) else False
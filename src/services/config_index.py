@@ -0,0 +1,249 @@
+"""Índice jerárquico de la configuración para consultas por sección."""
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+import re
+
+from ..config.constants import SECTION_QUERY_SEPARATOR
+from .config_matcher import MultiPatternMatcher
+
+
+# Construcciones que miran fuera de la coincidencia (y podrían ver la línea vecina)
+_LOOKAROUNDS = ("(?=", "(?!", "(?<=", "(?<!")
+
+
+def parse_section_query(parameter: str) -> Optional[List[str]]:
+    """
+    Partes de una consulta por sección (``padre >> hijo``).
+    
+    Returns:
+        Los patrones de cada nivel, o None si el parámetro es plano (sin
+        separador o con algún nivel vacío, que se busca como texto)
+    """
+    parts = [part.strip() for part in parameter.split(SECTION_QUERY_SEPARATOR)]
+    if len(parts) == 1 or not all(parts):
+        return None
+    return parts
+
+
+def is_section_query(parameter: str) -> bool:
+    """Indica si un parámetro es una consulta por sección."""
+    return parse_section_query(parameter) is not None
+
+
+def split_section_queries(parameters: List[str]) -> Tuple[List[str], List[str]]:
+    """Separa los parámetros planos (``| in``) de las consultas por sección."""
+    flat = [p for p in parameters if not is_section_query(p)]
+    sections = [p for p in parameters if is_section_query(p)]
+    return flat, sections
+
+
+def match_parameters(
+    parameters: List[str],
+    relevant_lines: Iterable[str],
+    retain_lines: bool = False,
+) -> List[Tuple[int, List[str]]]:
+    """
+    Evalúa los parámetros de un dispositivo sobre su configuración completa.
+    
+    Si todos son planos se evalúan en una sola pasada sin guardar las
+    líneas (válido para la lectura en streaming); si hay alguna consulta
+    por sección se construye el índice y se resuelven todos sobre él.
+    
+    Returns:
+        (conteo, líneas conservadas) por parámetro, en el mismo orden
+    """
+    if not any(is_section_query(p) for p in parameters):
+        matcher = MultiPatternMatcher(parameters)
+        if not retain_lines:
+            return [(count, []) for count in matcher.count_matches(relevant_lines)]
+        return [(len(lines), lines) for lines in matcher.match_lines(relevant_lines)]
+    
+    index = ConfigIndex(relevant_lines)
+    results = []
+    for parameter in parameters:
+        line_ids = index.query(parameter)
+        results.append((len(line_ids), index.lines_at(line_ids) if retain_lines else []))
+    return results
+
+
+class ConfigIndex:
+    """
+    Árbol padre/hijo de la configuración, según la indentación de cada línea.
+    
+    Se construye una vez por configuración descargada y responde en memoria
+    a cualquier número de consultas, sin un comando por parámetro:
+    
+    - ``texto`` o ``regex``: líneas que lo contienen, como ``| include``.
+    - ``padre >> hijo``: líneas que contienen ``hijo`` dentro de alguna
+      sección cuya cabecera contiene ``padre`` (a cualquier profundidad).
+      Se pueden encadenar: ``router bgp >> address-family >> neighbor``.
+    
+    Las líneas se guardan en orden de la configuración y cada sección ocupa
+    un rango contiguo (la cabecera y sus descendientes), así que una
+    consulta por sección es un cruce de rangos ordenados. Las búsquedas se
+    hacen sobre el texto completo con el motor de ``re`` y cada patrón se
+    busca una sola vez por índice.
+    """
+    
+    def __init__(self, lines: Iterable[str]):
+        """
+        Construye el índice.
+        
+        Args:
+            lines: Líneas relevantes de la configuración (ya sin vacías ni
+                comentarios), en orden
+        """
+        self.lines: List[str] = []
+        # Fin (exclusivo) del rango de cada línea: la línea y sus descendientes
+        self._section_end: List[int] = []
+        open_sections: List[Tuple[int, int]] = []  # (indentación, línea)
+        
+        for line_id, line in enumerate(lines):
+            indent = len(line) - len(line.lstrip())
+            while open_sections and open_sections[-1][0] >= indent:
+                self._section_end[open_sections.pop()[1]] = line_id
+            open_sections.append((indent, line_id))
+            self.lines.append(line)
+            self._section_end.append(line_id + 1)
+        
+        for _, line_id in open_sections:
+            self._section_end[line_id] = len(self.lines)
+        
+        self._text = "\n".join(self.lines)
+        self._line_starts: List[int] = []
+        offset = 0
+        for line in self.lines:
+            self._line_starts.append(offset)
+            offset += len(line) + 1
+        self._matches: Dict[str, List[int]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.lines)
+    
+    def query(self, parameter: str) -> List[int]:
+        """Líneas (por posición) que cumplen la consulta, en orden."""
+        parts = parse_section_query(parameter)
+        if parts is None:
+            return self.search(parameter)
+        
+        line_ids = self._matches.get(parameter)
+        if line_ids is None:
+            line_ids = self.search(parts[0])
+            for part in parts[1:]:
+                line_ids = self._within_sections(line_ids, self.search(part))
+            self._matches[parameter] = line_ids
+        return line_ids
+    
+    def count(self, parameter: str) -> int:
+        """Número de líneas que cumplen la consulta."""
+        return len(self.query(parameter))
+    
+    def lines_at(self, line_ids: List[int]) -> List[str]:
+        """Texto de las líneas indicadas."""
+        return [self.lines[line_id] for line_id in line_ids]
+    
+    def children(self, line_id: int) -> List[int]:
+        """Hijos directos de una línea."""
+        children = []
+        child = line_id + 1
+        end = self._section_end[line_id]
+        while child < end:
+            children.append(child)
+            child = self._section_end[child]
+        return children
+    
+    def search(self, pattern: str) -> List[int]:
+        """Líneas que contienen el patrón (regex o, si no es válido, texto literal)."""
+        line_ids = self._matches.get(pattern)
+        if line_ids is None:
+            line_ids = self._search(MultiPatternMatcher._compile(pattern))
+            self._matches[pattern] = line_ids
+        return line_ids
+    
+    def _search(self, regex: "re.Pattern") -> List[int]:
+        """
+        Busca el patrón sobre el texto completo y traduce cada coincidencia a su línea.
+        
+        El resultado es el mismo que aplicar el patrón línea a línea (como
+        ``| include``). Una coincidencia que cruza un salto de línea, o un
+        patrón con lookarounds que podría mirar la línea vecina, se
+        confirma con el patrón sobre la línea sola.
+        """
+        if not self.lines:
+            return []
+        pattern = regex.pattern
+        if "\\A" in pattern or "\\Z" in pattern:
+            # Anclas al inicio/fin del texto: solo tienen sentido línea a línea
+            return self._search_lines(regex)
+        try:
+            text_regex = re.compile(pattern, regex.flags | re.MULTILINE)
+        except re.error:
+            return self._search_lines(regex)
+        verify_all = any(look in pattern for look in _LOOKAROUNDS)
+        
+        line_ids: List[int] = []
+        starts = self._line_starts
+        lines = self.lines
+        num_lines = len(lines)
+        text_end = len(self._text)
+        line_search = regex.search
+        line_id = 0
+        pos = 0
+        while pos <= text_end:
+            restart = None
+            for match in text_regex.finditer(self._text, pos):
+                match_start = match.start()
+                if match_start < pos:
+                    # Resto de una línea ya contada; si se adentra en la
+                    # siguiente puede haber consumido su coincidencia
+                    if match.end() > pos:
+                        restart = pos
+                        break
+                    continue
+                line_id = bisect_right(starts, match_start, line_id) - 1
+                line_end = starts[line_id + 1] - 1 if line_id + 1 < num_lines else text_end
+                if match.end() > line_end:
+                    # Cruza el salto de línea: puede haber ocultado una
+                    # coincidencia de la línea siguiente, así que se reanuda allí
+                    if line_search(lines[line_id]):
+                        line_ids.append(line_id)
+                    restart = line_end + 1
+                    break
+                if not verify_all or line_search(lines[line_id]):
+                    line_ids.append(line_id)
+                # Cada línea cuenta una vez
+                pos = line_end + 1
+            if restart is None:
+                break
+            pos = restart
+        return line_ids
+    
+    def _search_lines(self, regex: "re.Pattern") -> List[int]:
+        return [line_id for line_id, line in enumerate(self.lines) if regex.search(line)]
+    
+    def _within_sections(self, parent_ids: List[int], line_ids: List[int]) -> List[int]:
+        """Las ``line_ids`` que descienden de alguna de las ``parent_ids``."""
+        # Rangos de los descendientes, ordenados; una sección anidada en otra
+        # ya incluida no añade nada
+        ranges: List[Tuple[int, int]] = []
+        for parent_id in parent_ids:
+            start, end = parent_id + 1, self._section_end[parent_id]
+            if start >= end:
+                continue
+            if ranges and start < ranges[-1][1]:
+                if end > ranges[-1][1]:
+                    ranges[-1] = (ranges[-1][0], end)
+                continue
+            ranges.append((start, end))
+        
+        result: List[int] = []
+        range_idx = 0
+        for line_id in line_ids:
+            while range_idx < len(ranges) and ranges[range_idx][1] <= line_id:
+                range_idx += 1
+            if range_idx == len(ranges):
+                break
+            if line_id >= ranges[range_idx][0]:
+                result.append(line_id)
+        return result
+
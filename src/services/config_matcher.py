@@ -0,0 +1,78 @@
+"""Búsqueda local de varios parámetros sobre una configuración completa."""
+from typing import Iterable, List, Optional
+import re
+
+
+class MultiPatternMatcher:
+    """
+    Evalúa todos los parámetros de un dispositivo en una sola pasada.
+    
+    Cada parámetro se interpreta como la expresión regular que recibiría el
+    filtro ``| include`` del equipo. Las líneas que no coinciden con ningún
+    parámetro se descartan con una única búsqueda sobre la alternancia de
+    todos los patrones.
+    """
+    
+    def __init__(self, patterns: Iterable[str]):
+        """Compila los patrones y la alternancia usada como prefiltro."""
+        self.patterns = list(patterns)
+        self._compiled = [self._compile(pattern) for pattern in self.patterns]
+        self._combined = self._compile_combined(self._compiled)
+    
+    def match_lines(self, lines: Iterable[str]) -> List[List[str]]:
+        """
+        Retorna, para cada patrón, las líneas que lo contienen.
+        
+        Args:
+            lines: Líneas de configuración ya filtradas
+        
+        Returns:
+            Lista paralela a ``patterns`` con las líneas coincidentes
+        """
+        matches: List[List[str]] = [[] for _ in self._compiled]
+        combined_search = self._combined.search if self._combined else None
+        indexed = list(enumerate(self._compiled))
+        
+        for line in lines:
+            if combined_search is not None and combined_search(line) is None:
+                continue
+            for idx, regex in indexed:
+                if regex.search(line):
+                    matches[idx].append(line)
+        
+        return matches
+    
+    def count_matches(self, lines: Iterable[str]) -> List[int]:
+        """Retorna, para cada patrón, el número de líneas que lo contienen."""
+        counts = [0] * len(self._compiled)
+        combined_search = self._combined.search if self._combined else None
+        indexed = list(enumerate(self._compiled))
+        
+        for line in lines:
+            if combined_search is not None and combined_search(line) is None:
+                continue
+            for idx, regex in indexed:
+                if regex.search(line):
+                    counts[idx] += 1
+        
+        return counts
+    
+    @staticmethod
+    def _compile(pattern: str) -> "re.Pattern":
+        """Compila el patrón como regex o, si no es válido, como texto literal."""
+        try:
+            return re.compile(pattern)
+        except re.error:
+            return re.compile(re.escape(pattern))
+    
+    @staticmethod
+    def _compile_combined(compiled: List["re.Pattern"]) -> Optional["re.Pattern"]:
+        """Une todos los patrones en una alternancia, si es posible."""
+        # Los grupos cambiarían de número al unirlos y romperían las referencias
+        if not compiled or any(regex.groups for regex in compiled):
+            return None
+        try:
+            return re.compile("|".join(f"(?:{regex.pattern})" for regex in compiled))
+        except re.error:
+            # Los flags en línea no admiten la alternancia
+            return None
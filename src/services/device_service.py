@@ -1,20 +1,110 @@
 """Servicio para gestionar operaciones con dispositivos de red."""
-from typing import List, Optional
-from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
+import asyncio
+import queue
+import threading
+import time
 
 from ..models.device import Device
 from ..models.command_result import CommandResult
+from ..models.progress import Progress
 from ..services.ssh_service import SSHService
-from ..config.constants import DATA_DIR
+from ..services.result_cache import ResultCache
+from ..services.platform_cache import PlatformCache
+from ..services.session_profiles import SessionProfileCache
+from ..services.report_writer import create_report_writer
+from ..services.results_store import ResultsStore
+from ..services.snapshot_store import SnapshotStore
+from ..services.parse_pool import ParsePool, wait_parsed
+from ..services.run_journal import RESUME, RESUME_MODES, RunJournal, device_key
+from ..services.jump_host_pool import JumpHostError
+from ..services.reachability import CircuitBreaker, ReachabilityChecker
+from ..config.constants import (
+    MAX_WORKERS, SSH_BACKEND, RESULT_CACHE_ENABLED, REPORT_FORMAT,
+    PREFLIGHT_ENABLED, PLATFORM_AUTODETECT, FAST_CONNECT,
+    METRICS_ENABLED, METRICS_PROMETHEUS_PATH, RESULTS_STORE_ENABLED, RUN_JOURNAL_PATH,
+    SNAPSHOT_STORE_ENABLED, PARSE_PROCESSES,
+)
 
 
 class DeviceService:
     """Gestiona las operaciones relacionadas con dispositivos de red."""
     
-    def __init__(self):
-        """Inicializa el servicio de dispositivos."""
-        self.ssh_service = SSHService()
+    def __init__(
+        self,
+        max_workers: int = MAX_WORKERS,
+        backend: str = SSH_BACKEND,
+        use_cache: bool = RESULT_CACHE_ENABLED,
+        preflight: bool = PREFLIGHT_ENABLED,
+        autodetect: bool = PLATFORM_AUTODETECT,
+        fast_connect: bool = FAST_CONNECT,
+        export_metrics: bool = METRICS_ENABLED,
+        metrics_path: Path = METRICS_PROMETHEUS_PATH,
+        metrics_labels: Optional[Dict[str, str]] = None,
+        store_results: bool = RESULTS_STORE_ENABLED,
+        journal_path: Optional[Path] = RUN_JOURNAL_PATH,
+        store_snapshots: bool = SNAPSHOT_STORE_ENABLED,
+        parse_processes: int = PARSE_PROCESSES,
+    ):
+        """
+        Inicializa el servicio de dispositivos.
+        
+        Args:
+            max_workers: Dispositivos procesados en paralelo con el backend netmiko
+            backend: Backend SSH a utilizar ("netmiko" o "asyncssh")
+            use_cache: Reutilizar resultados de dispositivos sin cambios
+            preflight: Comprobar el puerto SSH antes de conectar y omitir los
+                dispositivos que han fallado recientemente
+            autodetect: Detectar el driver de Netmiko de cada dispositivo (una
+                sola vez, se guarda en caché); solo aplica al backend netmiko
+            fast_connect: Reutilizar el prompt y los comandos de preparación
+                de la sesión anterior de cada dispositivo (backend netmiko)
+            export_metrics: Exportar al terminar las métricas de latencia por
+                fase (Prometheus) y la traza de la ejecución
+            metrics_path: Fichero de Prometheus; cada shard usa el suyo
+            metrics_labels: Etiquetas añadidas a todas las series exportadas
+                (p. ej. ``{"shard": "1of4"}``)
+            store_results: Guardar los resultados en el histórico SQLite
+            journal_path: Journal donde se registra cada dispositivo al
+                terminar, para poder reanudar la ejecución; None lo desactiva
+            store_snapshots: Guardar la salida completa de cada comando,
+                deduplicada y comprimida, para auditar los conteos
+            parse_processes: Procesos que filtran y cuentan la salida fuera
+                de los workers de E/S; 0 lo hace en el propio worker
+        """
+        if backend == "asyncssh":
+            # asyncssh es opcional: solo se importa si se usa este backend
+            from .async_ssh_service import AsyncSSHService
+            self.ssh_service = AsyncSSHService()
+        elif backend == "netmiko":
+            self.ssh_service = SSHService(
+                platform_cache=PlatformCache() if autodetect else None,
+                session_profiles=SessionProfileCache() if fast_connect else None,
+            )
+        else:
+            raise ValueError(f"Backend SSH desconocido: {backend}")
+        self.backend = backend
+        self.max_workers = max(1, max_workers)
+        self.export_metrics = export_metrics
+        self.metrics_path = metrics_path
+        self.metrics_labels = metrics_labels
+        self.store_results = store_results
+        self.journal_path = journal_path
+        
+        if use_cache:
+            self.ssh_service.result_cache = ResultCache()
+        if store_snapshots:
+            self.ssh_service.snapshot_store = SnapshotStore()
+        if parse_processes > 0:
+            self.ssh_service.parse_pool = ParsePool(processes=parse_processes)
+        
+        self.reachability: Optional[ReachabilityChecker] = None
+        self.circuit_breaker: Optional[CircuitBreaker] = None
+        if preflight:
+            self.reachability = ReachabilityChecker(self.ssh_service.jump_host_pool)
+            self.circuit_breaker = CircuitBreaker()
     
     def print_devices(self, devices: List[Device]) -> None:
         """Imprime la información de los dispositivos columna por columna."""
@@ -44,12 +134,38 @@ class DeviceService:
         jump_host: Optional[str] = None,
         jump_user: Optional[str] = None,
         jump_pass: Optional[str] = None,
+        report_format: str = REPORT_FORMAT,
+        progress_callback: Optional[Callable[[Progress], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+        report_path: Optional[Path] = None,
+        resume: Optional[str] = None,
     ) -> Path:
         """
         Ejecuta la automatización sobre los dispositivos.
+        
+        Los resultados se escriben en el reporte a medida que cada
+        dispositivo termina, en ese orden; en jsonl y csv cada resultado
+        lleva la posición del dispositivo en ``devices`` (``index``).
+        
+        Args:
+            progress_callback: Se llama tras cada dispositivo con el progreso;
+                puede invocarse desde un hilo distinto al que llamó
+            cancel_event: Si se activa, no se inician más dispositivos; los
+                que están en curso terminan y el reporte se cierra con los
+                resultados parciales
+            report_path: Ruta del reporte; por defecto data/output_<timestamp>
+            resume: "resume" para no repetir los dispositivos completados en
+                el journal de la ejecución anterior, o "retry-failed" para
+                repetir además solo los que tuvieron algún error; sus
+                resultados se copian del journal al reporte
+        
+        Returns:
+            Path al reporte generado
         """
         print("\n🚀 Iniciando proceso de automatización...\n")
         
+        if resume is not None and resume not in RESUME_MODES:
+            raise ValueError(f"Modo de reanudación desconocido: {resume}")
         if not devices:
             print("⚠ No hay dispositivos para procesar\n")
             raise ValueError("No hay dispositivos registrados")
@@ -60,80 +176,471 @@ class DeviceService:
             print(f"  • {device.name} ({len(params)} parámetros)")
         print()
         
-        all_results: List[CommandResult] = []
+        expected_total = sum(len(d.get_parameters_list()) for d in devices)
+        writer = create_report_writer(
+            report_format, path=report_path, expected_total=expected_total
+        )
+        results_store = ResultsStore() if self.store_results else None
+        run_id = results_store.start_run(writer.path) if results_store is not None else None
         
-        for idx, device in enumerate(devices, 1):
-            print(f"\n[{idx}/{len(devices)}] Procesando {device.name}...")
-            results = self.ssh_service.execute_commands_on_device(
-                device,
-                jump_host=jump_host,
-                jump_user=jump_user,
-                jump_pass=jump_pass,
+        # Cada dispositivo se registra en el journal al terminar; al reanudar,
+        # los ya completados se toman del journal anterior
+        journal = RunJournal(self.journal_path) if self.journal_path is not None else None
+        carried = self._carried_results(devices, journal, resume) if journal is not None and resume else {}
+        if journal is not None:
+            journal.start(len(devices), ((devices[idx], r) for idx, r in carried.items()))
+        
+        serial_estimate = 0.0
+        write_seconds = 0.0
+        parse_wait_seconds = 0.0
+        completed = len(carried)
+        
+        # Los workers de E/S entregan cada dispositivo al writer sin esperar
+        # a su parseo; el writer, en su propio hilo, recoge los conteos del
+        # pool y escribe. Las salidas en vuelo las acota la cola del pool.
+        done_queue: "queue.Queue[Optional[Tuple[int, List[CommandResult], float]]]" = queue.Queue()
+        writer_errors: List[BaseException] = []
+        
+        def write_device(idx: int, results: List[CommandResult]) -> None:
+            # Cada dispositivo se escribe al terminar, sin esperar a los
+            # anteriores del inventario: uno lento no retiene en memoria a
+            # los que terminan después. El índice permite reordenar (merge).
+            nonlocal write_seconds
+            write_start = time.perf_counter()
+            writer.write_results(results, index=idx)
+            if results_store is not None:
+                results_store.add_results(run_id, results)
+            write_seconds += time.perf_counter() - write_start
+        
+        def on_device_done(idx: int, results: List[CommandResult], duration: float) -> None:
+            done_queue.put((idx, results, duration))
+        
+        def finish_device(idx: int, results: List[CommandResult], duration: float) -> None:
+            nonlocal completed, serial_estimate, parse_wait_seconds
+            parse_wait_seconds += wait_parsed(results)
+            if journal is not None:
+                journal.record(devices[idx], results)
+            serial_estimate += duration
+            completed += 1
+            progress = Progress(
+                completed=completed,
+                total=len(devices),
+                device_name=devices[idx].name,
+                elapsed=time.perf_counter() - start_time,
+                reused=len(carried),
             )
-            all_results.extend(results)
+            print(f"\n[{progress}] Finalizado {devices[idx].name}")
+            
+            write_device(idx, results)
+            
+            if progress_callback is not None:
+                progress_callback(progress)
+        
+        def writer_loop() -> None:
+            while True:
+                item = done_queue.get()
+                if item is None:
+                    return
+                if writer_errors:
+                    continue  # Tras un error solo se vacía la cola
+                try:
+                    finish_device(*item)
+                except BaseException as e:
+                    writer_errors.append(e)
+        
+        # Las métricas, la traza y las líneas conservadas corresponden solo a
+        # esta ejecución
+        self.ssh_service.metrics.reset()
+        self.ssh_service.reset_output_buffer()
+        if self.ssh_service.parse_pool is not None:
+            self.ssh_service.parse_pool.reset_stats()
+        start_time = time.perf_counter()
+        interrupted = True
+        writer_thread = threading.Thread(target=writer_loop, name="report-writer", daemon=True)
+        writer_thread.start()
+        
+        try:
+            for idx in sorted(carried):
+                write_device(idx, carried[idx])
+            remaining = [idx for idx in range(len(devices)) if idx not in carried]
+            
+            def on_remaining_done(pos: int, results: List[CommandResult], duration: float) -> None:
+                on_device_done(remaining[pos], results, duration)
+            
+            # Los dispositivos inalcanzables se resuelven antes de abrir sesiones
+            to_run = [
+                remaining[pos]
+                for pos in self._preflight(
+                    [devices[idx] for idx in remaining],
+                    jump_host, jump_user, jump_pass, on_remaining_done,
+                )
+            ]
+            run_devices = [devices[idx] for idx in to_run]
+            
+            def on_run_done(pos: int, results: List[CommandResult], duration: float) -> None:
+                on_device_done(to_run[pos], results, duration)
+            
+            if self.backend == "asyncssh":
+                workers = max(1, min(self.ssh_service.max_sessions, len(run_devices)))
+                print(f"⚙ Ejecutando con hasta {workers} sesiones asyncio\n")
+                asyncio.run(
+                    self.ssh_service.execute_devices(
+                        run_devices,
+                        jump_host=jump_host,
+                        jump_user=jump_user,
+                        jump_pass=jump_pass,
+                        on_device_done=on_run_done,
+                        cancel_event=cancel_event,
+                    )
+                )
+            else:
+                workers = max(1, min(self.max_workers, len(run_devices)))
+                if jump_host and jump_user and jump_pass:
+                    # Un worker sin canal libre en el bastion agotaría el
+                    # plazo de espera y fallaría sin llegar al dispositivo
+                    workers = min(workers, self.ssh_service.jump_host_pool.max_channels)
+                print(f"⚙ Ejecutando con {workers} worker(s) en paralelo\n")
+                self._run_with_threads(
+                    run_devices, jump_host, jump_user, jump_pass, workers, on_run_done,
+                    cancel_event,
+                )
+            interrupted = cancel_event is not None and cancel_event.is_set()
+        finally:
+            # El writer termina de recoger y escribir lo ya entregado
+            done_queue.put(None)
+            writer_thread.join()
+            if journal is not None:
+                journal.finish(interrupted=interrupted)
+            self.ssh_service.close()
+            if self.ssh_service.parse_pool is not None:
+                self.ssh_service.parse_pool.close()
+            if self.ssh_service.result_cache is not None:
+                self.ssh_service.result_cache.save()
+            if self.ssh_service.platform_cache is not None:
+                self.ssh_service.platform_cache.save()
+            if self.ssh_service.session_profiles is not None:
+                self.ssh_service.session_profiles.save()
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.save()
+            
+            output_file = writer.close(interrupted=interrupted)
+            print(f"\n✓ Archivo generado: {output_file}")
+            if results_store is not None:
+                results_store.finish_run(
+                    run_id,
+                    successful=writer.successful,
+                    failed=writer.failed,
+                    total_lines=writer.total_lines,
+                    interrupted=interrupted,
+                )
+                results_store.close()
+                print(f"✓ Resultados guardados en el histórico (ejecución {run_id}): {results_store.path}")
+            if self.ssh_service.snapshot_store is not None:
+                self._print_snapshot_stats(self.ssh_service.snapshot_store)
+            if self.export_metrics:
+                self._export_metrics(output_file)
         
-        output_file = self._generate_output_file(all_results)
+        if writer_errors:
+            raise writer_errors[0]
+        if interrupted:
+            print(f"\n⚠ Ejecución cancelada: {completed}/{len(devices)} dispositivos procesados")
+        elapsed = time.perf_counter() - start_time
+        self._print_timing_summary(elapsed, serial_estimate, workers)
+        if self.ssh_service.parse_pool is not None:
+            self._print_stage_utilisation(
+                elapsed, serial_estimate, workers, write_seconds, parse_wait_seconds
+            )
         
         print(f"\n{'='*70}")
-        print("✓ Proceso completado exitosamente")
+        if interrupted:
+            print("⚠ Proceso cancelado: el reporte contiene resultados parciales")
+        else:
+            print("✓ Proceso completado exitosamente")
         print(f"📄 Resultados guardados en: {output_file}")
         print(f"{'='*70}\n")
         
         return output_file
     
-    def _generate_output_file(self, results: List[CommandResult]) -> Path:
+    def _carried_results(
+        self,
+        devices: List[Device],
+        journal: RunJournal,
+        resume: str,
+    ) -> Dict[int, List[CommandResult]]:
         """
-        Genera el archivo de resultados con el conteo de líneas.
+        Resultados del journal anterior que se reutilizan al reanudar.
         
-        Args:
-            results: Lista de resultados de comandos
-            
         Returns:
-            Path al archivo generado
+            Resultados por índice de dispositivo; con "retry-failed" solo
+            los de dispositivos sin ningún error
         """
-        # Generar timestamp legible
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"output_{timestamp}.txt"
-        output_path = DATA_DIR / filename
-        
-        # Asegurar que existe el directorio
-        DATA_DIR.mkdir(exist_ok=True)
-        
-        # Escribir resultados
-        with open(output_path, 'w', encoding='utf-8') as f:
-            # Encabezado
-            f.write("="*70 + "\n")
-            f.write(f"{'NETWORK AUTOMATION RESULTS':^70}\n")
-            f.write("="*70 + "\n")
-            f.write(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Total de comandos ejecutados: {len(results)}\n")
-            f.write("="*70 + "\n\n")
-            
-            # Resultados exitosos
-            successful_results = [r for r in results if r.success]
-            if successful_results:
-                f.write("✓ RESULTADOS EXITOSOS:\n")
-                f.write("-"*70 + "\n")
-                for result in successful_results:
-                    f.write(f"  • Count for {result.parameter} in {result.device_name}: {result.line_count}\n")
-                f.write("\n")
+        previous = journal.load()
+        carried: Dict[int, List[CommandResult]] = {}
+        for idx, device in enumerate(devices):
+            results = previous.get(device_key(device))
+            if results is None:
+                continue
+            if resume == RESUME or all(r.success for r in results):
+                carried[idx] = results
+        
+        if resume == RESUME:
+            print(f"↻ Reanudando: {len(carried)} de {len(devices)} dispositivos ya completados")
+        else:
+            print(
+                f"↻ Reintentando fallidos: se reutilizan {len(carried)} de {len(devices)} "
+                f"dispositivos sin errores"
+            )
+        return carried
+    
+    def _preflight(
+        self,
+        devices: List[Device],
+        jump_host: Optional[str],
+        jump_user: Optional[str],
+        jump_pass: Optional[str],
+        on_device_done: Callable[[int, List[CommandResult], float], None],
+    ) -> List[int]:
+        """
+        Descarta los dispositivos con el circuito abierto o sin puerto SSH.
+        
+        Los descartados se notifican con resultados de error a través de
+        ``on_device_done``.
+        
+        Returns:
+            Índices de los dispositivos que deben procesarse
+        """
+        if self.reachability is None:
+            return list(range(len(devices)))
+        
+        preflight_start = time.perf_counter()
+        to_run: List[int] = []
+        to_probe: List[int] = []
+        skipped = 0
+        
+        for idx, device in enumerate(devices):
+            if not device.get_parameters_list():
+                to_run.append(idx)
+            elif self.circuit_breaker.allow(device.name):
+                to_probe.append(idx)
+            else:
+                retry_in = self.circuit_breaker.retry_in(device.name)
+                self._skip_device(
+                    idx, device, on_device_done,
+                    f"Omitido: falló recientemente (reintento en {retry_in / 60:.0f} min)",
+                )
+                skipped += 1
+        
+        try:
+            errors = self.reachability.probe_all(
+                [devices[idx] for idx in to_probe], jump_host, jump_user, jump_pass
+            )
+        except JumpHostError as e:
+            # El fallo es del bastion: no dice nada de cada dispositivo, así
+            # que no se toca su circuito y no se intenta ninguno
+            print(f"✗ Pre-flight abortado: {e}\n")
+            for idx in to_probe:
+                self._skip_device(idx, devices[idx], on_device_done, str(e))
+            return sorted(to_run)
+        unreachable = 0
+        for idx, error in zip(to_probe, errors):
+            device = devices[idx]
+            if error is None:
+                self.circuit_breaker.record_success(device.name)
+                to_run.append(idx)
+            else:
+                self.circuit_breaker.record_failure(device.name, error)
+                self._skip_device(
+                    idx, device, on_device_done, f"Inalcanzable (TCP/{device.address[1]}): {error}"
+                )
+                unreachable += 1
+        
+        print(
+            f"🔎 Pre-flight en {time.perf_counter() - preflight_start:.1f}s: "
+            f"{len(to_run)} alcanzables, {unreachable} inalcanzables, "
+            f"{skipped} omitidos por fallos recientes\n"
+        )
+        return sorted(to_run)
+    
+    def _skip_device(
+        self,
+        idx: int,
+        device: Device,
+        on_device_done: Callable[[int, List[CommandResult], float], None],
+        error_message: str,
+    ) -> None:
+        """Registra un dispositivo no procesado con un error por parámetro."""
+        print(f"✗ {device.name}: {error_message}")
+        results: List[CommandResult] = []
+        self.ssh_service._add_error_results(
+            results,
+            device,
+            device.get_parameters_list(),
+            error_message=error_message,
+        )
+        on_device_done(idx, results, 0.0)
+    
+    def _run_with_threads(
+        self,
+        devices: List[Device],
+        jump_host: Optional[str],
+        jump_user: Optional[str],
+        jump_pass: Optional[str],
+        workers: int,
+        on_device_done: Callable[[int, List[CommandResult], float], None],
+        cancel_event: Optional[threading.Event] = None,
+    ) -> None:
+        """
+        Procesa los dispositivos en un pool de hilos de tamaño acotado.
+        
+        Solo hay ``workers`` dispositivos en vuelo: el siguiente se envía al
+        pool cuando termina uno, y deja de enviarse si se cancela.
+        """
+        remaining = iter(enumerate(devices))
+        in_flight: Dict[Future, int] = {}
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            def submit_next() -> None:
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                item = next(remaining, None)
+                if item is not None:
+                    idx, device = item
+                    future = executor.submit(
+                        self._process_device,
+                        device,
+                        jump_host,
+                        jump_user,
+                        jump_pass,
+                    )
+                    in_flight[future] = idx
             
-            # Errores
-            failed_results = [r for r in results if not r.success]
-            if failed_results:
-                f.write("✗ ERRORES:\n")
-                f.write("-"*70 + "\n")
-                for result in failed_results:
-                    f.write(f"  • {result.device_name} ({result.parameter}): {result.error_message}\n")
-                f.write("\n")
+            for _ in range(workers):
+                submit_next()
             
-            # Resumen
-            f.write("="*70 + "\n")
-            f.write("RESUMEN:\n")
-            f.write(f"  • Comandos exitosos: {len(successful_results)}\n")
-            f.write(f"  • Comandos fallidos: {len(failed_results)}\n")
-            f.write(f"  • Total de líneas encontradas: {sum(r.line_count for r in successful_results)}\n")
-            f.write("="*70 + "\n")
-        
-        print(f"\n✓ Archivo generado: {output_path}")
-        return output_path
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx = in_flight.pop(future)
+                    device = devices[idx]
+                    try:
+                        results, duration = future.result()
+                    except Exception as e:
+                        # Un fallo inesperado no debe afectar al resto de dispositivos
+                        error_msg = f"Error inesperado: {str(e)}"
+                        print(f"✗ {error_msg} en {device.name}")
+                        results, duration = [], 0.0
+                        self.ssh_service._add_error_results(
+                            results,
+                            device,
+                            device.get_parameters_list(),
+                            error_message=error_msg,
+                        )
+                    on_device_done(idx, results, duration)
+                    submit_next()
+    
+    def _process_device(
+        self,
+        device: Device,
+        jump_host: Optional[str],
+        jump_user: Optional[str],
+        jump_pass: Optional[str],
+    ) -> Tuple[List[CommandResult], float]:
+        """Ejecuta los comandos de un dispositivo y mide su duración."""
+        device_start = time.perf_counter()
+        results = self.ssh_service.execute_commands_on_device(
+            device,
+            jump_host=jump_host,
+            jump_user=jump_user,
+            jump_pass=jump_pass,
+        )
+        return results, time.perf_counter() - device_start
+    
+    def _print_timing_summary(
+        self,
+        elapsed: float,
+        serial_estimate: float,
+        workers: int,
+    ) -> None:
+        """Imprime el tiempo real frente al tiempo estimado en serie."""
+        speedup = serial_estimate / elapsed if elapsed > 0 else 1.0
+        print(f"\n⏱ Tiempo total: {elapsed:.1f}s con {workers} worker(s)")
+        print(f"⏱ Tiempo estimado en serie: {serial_estimate:.1f}s")
+        print(f"⏱ Speedup: {speedup:.2f}x")
+        
+        phase_lines = self.ssh_service.metrics.phase_summary()
+        if phase_lines:
+            print("⏱ Latencia por fase:")
+            for line in phase_lines:
+                print(f"  {line}")
+    
+    def _print_stage_utilisation(
+        self,
+        elapsed: float,
+        device_seconds: float,
+        workers: int,
+        write_seconds: float,
+        parse_wait_seconds: float,
+    ) -> None:
+        """
+        Imprime la ocupación de cada etapa: E/S, parseo y escritura.
+        
+        La etapa cerca del 100% es el cuello de botella: más workers si es
+        la E/S, más procesos de parseo si es el parseo. Un bloqueo por cola
+        llena indica que el parseo frena a la E/S.
+        """
+        pool = self.ssh_service.parse_pool
+        stats = pool.stats()
+        # El tiempo que un worker espera a que haya hueco en la cola no es trabajo de E/S
+        io_seconds = max(0.0, device_seconds - stats["blocked_seconds"])
+        
+        def utilisation(busy: float, capacity: int) -> str:
+            return f"{100 * busy / (elapsed * capacity):5.1f}%" if elapsed > 0 else "    -"
+        
+        queue_ms = 1000 * stats["queue_seconds"] / stats["jobs"] if stats["jobs"] else 0.0
+        print("⚙ Utilización por etapa:")
+        print(f"  E/S        {utilisation(io_seconds, workers)}  ({workers} workers)")
+        print(
+            f"  Parseo     {utilisation(stats['parse_seconds'], pool.processes)}  "
+            f"({pool.processes} procesos, {stats['jobs']} salidas; "
+            f"{stats['inline_jobs']} pequeñas en el worker de E/S)"
+        )
+        print(
+            f"  Escritura  {utilisation(write_seconds, 1)}  "
+            f"(+{parse_wait_seconds:.1f}s esperando al parseo)"
+        )
+        print(
+            f"  Cola de parseo: espera media {queue_ms:.1f} ms, "
+            f"máx. {stats['max_in_flight']}/{pool.queue_size} en vuelo, "
+            f"E/S bloqueada {stats['blocked_seconds']:.1f}s por cola llena"
+        )
+    
+    def _export_metrics(self, report_file: Path) -> None:
+        """Escribe el textfile de Prometheus y la traza junto al reporte."""
+        metrics = self.ssh_service.metrics
+        try:
+            prometheus_file = metrics.write_prometheus(self.metrics_path, self.metrics_labels)
+            print(f"✓ Métricas exportadas: {prometheus_file}")
+            if metrics.trace:
+                trace_file = metrics.write_trace(report_file.with_suffix(".trace.json"))
+                print(f"✓ Traza de la ejecución: {trace_file}")
+                if metrics.dropped_events:
+                    print(
+                        f"⚠ Traza incompleta: {metrics.dropped_events} eventos descartados "
+                        f"(máximo {metrics.max_events})"
+                    )
+        except OSError as e:
+            print(f"⚠ No se pudieron exportar las métricas: {e}")
+    
+    @staticmethod
+    def _print_snapshot_stats(store: SnapshotStore) -> None:
+        """Resume lo que el almacén de snapshots escribió en esta ejecución."""
+        stats = store.stats()
+        if not stats["snapshots"]:
+            return
+        chunks = stats["chunks_written"] + stats["chunks_reused"]
+        print(
+            f"✓ Salidas guardadas en {store.root}: {stats['snapshots']} "
+            f"({stats['new_snapshots']} nuevas), {stats['chunks_written']}/{chunks} chunks "
+            f"escritos, {stats['bytes_in'] / 1024:.1f} KB de salida → "
+            f"{stats['bytes_written'] / 1024:.1f} KB en disco"
+        )
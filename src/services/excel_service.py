@@ -1,21 +1,20 @@
 """Servicio para gestionar operaciones con Excel."""
-import pandas as pd
 from pathlib import Path
-from typing import List
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from typing import Iterator, List, Optional
 
-from ..config.constants import EXCEL_PATH, EXCEL_COLUMNS, DATA_DIR
+from ..config.constants import EXCEL_PATH, EXCEL_COLUMNS, EXCEL_SHEET_NAME, DATA_DIR
 from ..models.device import Device
+from .inventory_loader import InventoryLoader
 
 
 class ExcelService:
     """Gestiona todas las operaciones relacionadas con Excel."""
     
-    def __init__(self, excel_path: Path = EXCEL_PATH):
-        """Inicializa el servicio con la ruta del archivo Excel."""
+    def __init__(self, excel_path: Path = EXCEL_PATH, loader: Optional[InventoryLoader] = None):
+        """Inicializa el servicio con la ruta del archivo Excel (o CSV/JSONL)."""
         self.excel_path = excel_path
         self.data_dir = DATA_DIR
+        self.loader = loader or InventoryLoader()
         
         # Asegurar que existe el directorio data
         self.data_dir.mkdir(exist_ok=True)
@@ -26,9 +25,13 @@ class ExcelService:
     
     def create(self) -> None:
         """Crea un nuevo archivo Excel con formato bonito."""
+        # openpyxl se importa aquí para no retrasar el arranque de la GUI
+        from openpyxl import Workbook
+        from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+        
         wb = Workbook()
         ws = wb.active
-        ws.title = "Devices"
+        ws.title = EXCEL_SHEET_NAME
         
         # Estilo del encabezado
         header_fill = PatternFill(start_color="4472C4", 
@@ -72,7 +75,8 @@ class ExcelService:
         print(f"✓ Excel creado exitosamente en: {self.excel_path}")
     
     def delete(self) -> None:
-        """Elimina el archivo Excel si existe."""
+        """Elimina el archivo Excel si existe, junto con su copia en la caché del inventario."""
+        self.loader.forget(self.excel_path)
         if self.exists():
             self.excel_path.unlink()
             print(f"✓ Excel eliminado: {self.excel_path}")
@@ -81,25 +85,16 @@ class ExcelService:
     
     def read_devices(self) -> List[Device]:
         """Lee los dispositivos del Excel y los retorna como objetos Device."""
+        return list(self.iter_devices())
+    
+    def iter_devices(self) -> Iterator[Device]:
+        """Genera los dispositivos fila a fila, sin cargar el libro completo."""
         if not self.exists():
             raise FileNotFoundError(
                 f"El archivo Excel no existe: {self.excel_path}"
             )
         
-        # Leer Excel
-        df = pd.read_excel(self.excel_path, sheet_name='Devices')
-        
-        # Convertir a lista de objetos Device
-        devices = []
-        for _, row in df.iterrows():
-            # Saltar filas vacías
-            if pd.isna(row['Name']) or row['Name'] == '':
-                continue
-            
-            device = Device.from_dict(row.to_dict())
-            devices.append(device)
-        
-        return devices
+        return self.loader.iter_devices(self.excel_path)
     
     def open_file(self) -> None:
         """Abre el archivo Excel con la aplicación predeterminada."""
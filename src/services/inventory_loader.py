@@ -0,0 +1,233 @@
+"""Lectura en streaming del inventario de dispositivos."""
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import csv
+import hashlib
+import json
+
+from ..config.constants import (
+    EXCEL_COLUMNS, EXCEL_SHEET_NAME, INVENTORY_CACHE_ENABLED, INVENTORY_CACHE_PATH,
+)
+from ..models.device import Device
+from .state_file import locked, read_json, write_atomic
+
+
+Row = Tuple[str, str, str, str]
+
+EXCEL_SUFFIXES = {".xlsx", ".xlsm"}
+CSV_SUFFIXES = {".csv"}
+JSONL_SUFFIXES = {".jsonl", ".ndjson"}
+
+
+def _cell_to_str(value) -> str:
+    """Normaliza el valor de una celda: vacío → "", 1234.0 → "1234"."""
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if value != value:  # NaN
+            return ""
+        if value.is_integer():
+            return str(int(value))
+    return str(value)
+
+
+def shard_of(device_name: str, shard_count: int) -> int:
+    """
+    Shard (base 1) al que pertenece un dispositivo.
+    
+    Usa un hash estable del nombre, por lo que el reparto no depende del
+    orden del inventario ni cambia entre procesos o máquinas.
+    """
+    digest = hashlib.sha1(device_name.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count + 1
+
+
+def shard_devices(devices: Iterable[Device], shard: int, shard_count: int) -> Iterator[Device]:
+    """Filtra los dispositivos que corresponden al shard ``shard`` de ``shard_count``."""
+    if not 1 <= shard <= shard_count:
+        raise ValueError(f"Shard inválido: {shard}/{shard_count}")
+    return (d for d in devices if shard_of(d.name, shard_count) == shard)
+
+
+class InventoryLoader:
+    """
+    Construye objetos Device a partir de un inventario, fila a fila.
+    
+    Admite Excel (openpyxl en modo solo lectura), CSV y JSONL con las
+    columnas Name, User, Password y Parameter. La forma ya parseada del
+    inventario se guarda en una caché indexada por ruta, fecha de
+    modificación y tamaño, de modo que las ejecuciones siguientes sobre
+    el mismo fichero no vuelven a parsearlo. La caché contiene las mismas
+    credenciales que el inventario: se escribe solo legible por el
+    usuario y ``forget`` la borra junto con el inventario.
+    """
+    
+    def __init__(
+        self,
+        cache_path: Path = INVENTORY_CACHE_PATH,
+        use_cache: bool = INVENTORY_CACHE_ENABLED,
+    ):
+        """Inicializa el lector."""
+        self.cache_path = cache_path
+        self.use_cache = use_cache
+    
+    def load(self, path: Path) -> List[Device]:
+        """Lee todo el inventario y lo retorna como lista."""
+        return list(self.iter_devices(path))
+    
+    def iter_devices(self, path: Path) -> Iterator[Device]:
+        """
+        Genera los dispositivos del inventario en el orden del fichero.
+        
+        Las filas sin nombre se omiten. La caché solo se actualiza si el
+        generador se consume por completo.
+        """
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"El inventario no existe: {path}")
+        
+        signature = self._signature(path)
+        if self.use_cache:
+            rows = self._load_cached(path, signature)
+            if rows is not None:
+                for row in rows:
+                    yield Device(*row)
+                return
+        
+        parsed: List[Row] = []
+        for row in self._iter_rows(path):
+            if not row[0].strip():
+                continue
+            if self.use_cache:
+                parsed.append(row)
+            yield Device(*row)
+        
+        if self.use_cache:
+            self._save_cached(path, signature, parsed)
+    
+    def _iter_rows(self, path: Path) -> Iterator[Row]:
+        """Selecciona el parser según la extensión del fichero."""
+        suffix = path.suffix.lower()
+        if suffix in EXCEL_SUFFIXES:
+            return self._iter_excel_rows(path)
+        if suffix in CSV_SUFFIXES:
+            return self._iter_csv_rows(path)
+        if suffix in JSONL_SUFFIXES:
+            return self._iter_jsonl_rows(path)
+        raise ValueError(
+            f"Formato de inventario no soportado: {path.suffix} "
+            f"(usa .xlsx, .csv o .jsonl)"
+        )
+    
+    @staticmethod
+    def _column_indexes(header) -> List[Optional[int]]:
+        """Posición de cada columna de EXCEL_COLUMNS en el encabezado."""
+        names = [_cell_to_str(h).strip() for h in header]
+        if EXCEL_COLUMNS[0] not in names:
+            raise ValueError(f"El inventario no tiene la columna '{EXCEL_COLUMNS[0]}'")
+        return [names.index(col) if col in names else None for col in EXCEL_COLUMNS]
+    
+    def _iter_excel_rows(self, path: Path) -> Iterator[Row]:
+        """Recorre la hoja Devices sin cargar el libro completo en memoria."""
+        from openpyxl import load_workbook
+        
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            ws = wb[EXCEL_SHEET_NAME]
+            rows = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            indexes = self._column_indexes(header)
+            for values in rows:
+                yield tuple(
+                    _cell_to_str(values[i]) if i is not None and i < len(values) else ""
+                    for i in indexes
+                )
+        finally:
+            wb.close()
+    
+    def _iter_csv_rows(self, path: Path) -> Iterator[Row]:
+        """Recorre un inventario CSV con encabezado."""
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            indexes = self._column_indexes(header)
+            for values in reader:
+                yield tuple(
+                    values[i] if i is not None and i < len(values) else ""
+                    for i in indexes
+                )
+    
+    def _iter_jsonl_rows(self, path: Path) -> Iterator[Row]:
+        """Recorre un inventario JSONL (un objeto por dispositivo)."""
+        with open(path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path.name}:{line_number}: JSON inválido ({e})")
+                yield tuple(_cell_to_str(record.get(col)) for col in EXCEL_COLUMNS)
+    
+    @staticmethod
+    def _signature(path: Path) -> Dict[str, int]:
+        """Fecha de modificación y tamaño del fichero."""
+        stat = path.stat()
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    
+    def _read_cache(self) -> dict:
+        """Carga el fichero de caché, ignorándolo si está corrupto."""
+        try:
+            return read_json(self.cache_path)
+        except (OSError, ValueError) as e:
+            print(f"⚠ No se pudo leer la caché del inventario: {e}")
+            return {}
+    
+    def _load_cached(self, path: Path, signature: Dict[str, int]) -> Optional[List[list]]:
+        """Retorna las filas cacheadas si el fichero no ha cambiado."""
+        entry = self._read_cache().get(str(path.resolve()))
+        if entry is None or entry.get("signature") != signature:
+            return None
+        return entry.get("rows")
+    
+    def forget(self, path: Path) -> None:
+        """
+        Elimina de la caché las filas de un inventario (p. ej. al borrarlo).
+        
+        Se aplica aunque la caché esté desactivada, por si quedó un fichero
+        de una ejecución anterior; si no queda ningún inventario se borra
+        el fichero.
+        """
+        with locked(self.cache_path):
+            data = self._read_cache()
+            if data.pop(str(Path(path).resolve()), None) is None:
+                return
+            if data:
+                self._write_cache(data)
+                return
+            try:
+                self.cache_path.unlink()
+            except OSError as e:
+                print(f"⚠ No se pudo borrar la caché del inventario: {e}")
+    
+    def _save_cached(self, path: Path, signature: Dict[str, int], rows: List[Row]) -> None:
+        """Guarda las filas parseadas del inventario (sin pisar las de otros procesos)."""
+        with locked(self.cache_path):
+            data = self._read_cache()
+            data[str(path.resolve())] = {"signature": signature, "rows": rows}
+            self._write_cache(data)
+    
+    def _write_cache(self, data: dict) -> None:
+        """Escribe la caché de forma atómica, legible solo por el usuario."""
+        try:
+            write_atomic(
+                self.cache_path,
+                json.dumps(data, ensure_ascii=False, separators=(",", ":")),
+                mode=0o600,
+            )
+        except OSError as e:
+            print(f"⚠ No se pudo guardar la caché del inventario: {e}")
@@ -0,0 +1,258 @@
+"""Pool de conexiones SSH al jump host compartidas entre dispositivos."""
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+import hashlib
+import hmac
+import os
+import threading
+
+import paramiko
+
+from ..config.constants import MAX_CHANNELS_PER_JUMP_HOST, JUMP_HOST_KEEPALIVE
+from ..models.device import parse_address
+from .metrics import Metrics
+
+
+# (jump_host, jump_user, HMAC de la contraseña del jump host)
+JumpHostKey = Tuple[str, str, bytes]
+
+
+class JumpHostError(Exception):
+    """Fallo al conectar o autenticar con el jump host (no con el dispositivo)."""
+
+
+class ChannelLimitError(JumpHostError):
+    """El bastion no tuvo un canal libre dentro del plazo."""
+
+
+class JumpHostPool:
+    """
+    Mantiene un único transporte autenticado por (jump_host, jump_user).
+    
+    Cada dispositivo abre su propio canal ``direct-tcpip`` sobre ese
+    transporte en lugar de repetir el handshake SSH contra el bastion. El
+    transporte solo se reutiliza con la misma contraseña con la que se
+    autenticó: la clave incluye un HMAC de la contraseña (con un secreto
+    aleatorio por proceso), de modo que una contraseña distinta vuelve a
+    autenticarse. El límite de canales es por bastion y usuario.
+    """
+    
+    def __init__(
+        self,
+        timeout: int = 30,
+        max_channels: int = MAX_CHANNELS_PER_JUMP_HOST,
+        metrics: Optional[Metrics] = None,
+    ):
+        """Inicializa el pool vacío; las conexiones se crean bajo demanda."""
+        self.timeout = timeout
+        self.max_channels = max(1, max_channels)
+        self.metrics = metrics or Metrics()
+        self._secret = os.urandom(32)
+        self._lock = threading.Lock()
+        self._clients: Dict[JumpHostKey, paramiko.SSHClient] = {}
+        self._connect_locks: Dict[JumpHostKey, threading.Lock] = {}
+        self._semaphores: Dict[Tuple[str, str], threading.BoundedSemaphore] = {}
+        self._channel_keys: Dict[int, JumpHostKey] = {}
+    
+    def open_channel(
+        self,
+        jump_host: str,
+        jump_user: str,
+        jump_pass: str,
+        dest_addr: Tuple[str, int],
+        timeout: Optional[float] = None,
+    ) -> paramiko.Channel:
+        """
+        Abre un canal direct-tcpip hacia ``dest_addr`` a través del bastion.
+        
+        Si el bastion ya tiene ``max_channels`` canales abiertos espera a
+        que se libere uno, como mucho ``timeout`` segundos. El canal debe
+        liberarse con ``release_channel``.
+        
+        Args:
+            timeout: Plazo para conseguir un canal libre y para abrirlo; por
+                defecto el del pool
+        
+        Raises:
+            ChannelLimitError: Si no se libera ningún canal dentro del plazo
+        """
+        key = self._key(jump_host, jump_user, jump_pass)
+        semaphore = self._get_semaphore(key)
+        wait = timeout or self.timeout
+        with self.metrics.span("channel_wait", dest_addr[0], jump_host):
+            acquired = semaphore.acquire(timeout=wait)
+        if not acquired:
+            raise ChannelLimitError(
+                f"Jump host {jump_host}: sin canales libres en {wait:g}s "
+                f"({self.max_channels} en uso)"
+            )
+        
+        try:
+            with self.metrics.span("channel_open", dest_addr[0], jump_host):
+                channel = self._open_channel(key, jump_pass, dest_addr, timeout)
+        except Exception:
+            semaphore.release()
+            raise
+        
+        with self._lock:
+            self._channel_keys[id(channel)] = key
+        return channel
+    
+    def connect(self, jump_host: str, jump_user: str, jump_pass: str) -> None:
+        """
+        Conecta con el bastion si aún no hay un transporte activo.
+        
+        Raises:
+            JumpHostError: Si no se puede conectar o autenticar
+        """
+        self._get_transport(self._key(jump_host, jump_user, jump_pass), jump_pass)
+    
+    def release_channel(self, channel: paramiko.Channel) -> None:
+        """Cierra el canal y libera su hueco en el bastion."""
+        with self._lock:
+            key = self._channel_keys.pop(id(channel), None)
+        
+        try:
+            channel.close()
+        except Exception:
+            pass
+        
+        if key is not None:
+            self._get_semaphore(key).release()
+    
+    @contextmanager
+    def channel(
+        self,
+        jump_host: str,
+        jump_user: str,
+        jump_pass: str,
+        dest_addr: Tuple[str, int],
+    ) -> Iterator[paramiko.Channel]:
+        """Context manager que abre y libera un canal automáticamente."""
+        channel = self.open_channel(jump_host, jump_user, jump_pass, dest_addr)
+        try:
+            yield channel
+        finally:
+            self.release_channel(channel)
+    
+    def close_all(self) -> None:
+        """Cierra todas las conexiones abiertas contra los bastion."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        
+        for client in clients:
+            try:
+                client.close()
+            except Exception:
+                pass
+    
+    def _open_channel(
+        self,
+        key: JumpHostKey,
+        jump_pass: str,
+        dest_addr: Tuple[str, int],
+        timeout: Optional[float] = None,
+    ) -> paramiko.Channel:
+        """Abre el canal reconectando una vez si el transporte ha caído."""
+        timeout = timeout if timeout is not None else self.timeout
+        transport = self._get_transport(key, jump_pass)
+        try:
+            return transport.open_channel(
+                "direct-tcpip",
+                dest_addr,
+                ("127.0.0.1", 0),
+                timeout=timeout,
+            )
+        except (paramiko.SSHException, EOFError, OSError):
+            # Si el transporte sigue vivo el fallo es del destino, no del bastion
+            if transport.is_active():
+                raise
+        
+        transport = self._get_transport(key, jump_pass, failed=transport)
+        return transport.open_channel(
+            "direct-tcpip",
+            dest_addr,
+            ("127.0.0.1", 0),
+            timeout=timeout,
+        )
+    
+    def _get_transport(
+        self,
+        key: JumpHostKey,
+        jump_pass: str,
+        failed: Optional[paramiko.Transport] = None,
+    ) -> paramiko.Transport:
+        """
+        Retorna un transporte activo, conectando solo si es necesario.
+        
+        Args:
+            failed: Transporte con el que el llamador acaba de fallar. Solo se
+                reemplaza si sigue siendo el actual: si otro hilo ya reconectó,
+                se reutiliza su transporte en lugar de cerrarlo
+        """
+        with self._get_connect_lock(key):
+            client = self._clients.get(key)
+            transport = client.get_transport() if client is not None else None
+            
+            if transport is not None and transport.is_active() and transport is not failed:
+                return transport
+            
+            if failed is not None:
+                print(f"↻ Reconectando con jump host {key[0]}...")
+            
+            if client is not None:
+                try:
+                    client.close()
+                except Exception:
+                    pass
+            
+            try:
+                with self.metrics.span("bastion_handshake", jump_host=key[0]):
+                    client = self._connect(key, jump_pass)
+            except Exception as e:
+                raise JumpHostError(f"Jump host {key[0]}: {str(e) or type(e).__name__}") from e
+            with self._lock:
+                self._clients[key] = client
+            return client.get_transport()
+    
+    def _connect(self, key: JumpHostKey, jump_pass: str) -> paramiko.SSHClient:
+        """Establece y autentica una nueva conexión con el bastion."""
+        jump_host, jump_user, _ = key
+        print(f"→ Conectando con jump host: {jump_host}")
+        
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        host, port = parse_address(jump_host)
+        client.connect(
+            host,
+            port=port,
+            username=jump_user,
+            password=jump_pass,
+            timeout=self.timeout,
+        )
+        
+        transport = client.get_transport()
+        if JUMP_HOST_KEEPALIVE:
+            transport.set_keepalive(JUMP_HOST_KEEPALIVE)
+        return client
+    
+    def _key(self, jump_host: str, jump_user: str, jump_pass: str) -> JumpHostKey:
+        """Clave del transporte: bastion, usuario y HMAC de la contraseña."""
+        digest = hmac.new(self._secret, (jump_pass or "").encode("utf-8"), hashlib.sha256).digest()
+        return (jump_host, jump_user, digest)
+    
+    def _get_semaphore(self, key: JumpHostKey) -> threading.BoundedSemaphore:
+        """Retorna el semáforo que limita los canales simultáneos del bastion."""
+        bastion = key[:2]
+        with self._lock:
+            if bastion not in self._semaphores:
+                self._semaphores[bastion] = threading.BoundedSemaphore(self.max_channels)
+            return self._semaphores[bastion]
+    
+    def _get_connect_lock(self, key: JumpHostKey) -> threading.Lock:
+        """Retorna el lock que serializa la conexión con un bastion."""
+        with self._lock:
+            if key not in self._connect_locks:
+                self._connect_locks[key] = threading.Lock()
+            return self._connect_locks[key]
@@ -0,0 +1,335 @@
+"""Métricas de latencia por fase de la conexión y exportación de resultados."""
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import asyncio
+import json
+import os
+import threading
+import time
+
+from ..config.constants import METRICS_BUCKETS, METRICS_TRACE, METRICS_TRACE_MAX_EVENTS
+from .state_file import write_atomic
+
+
+class Histogram:
+    """Histograma de duraciones con buckets fijos (límites superiores, en segundos)."""
+    
+    __slots__ = ("buckets", "counts", "total", "count", "max")
+    
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # el último es +Inf
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+    
+    def observe(self, value: float) -> None:
+        """Registra una duración."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+    
+    def quantile(self, q: float) -> float:
+        """
+        Estima el cuantil ``q`` como el límite superior de su bucket.
+        
+        Para valores por encima del último bucket retorna el máximo observado.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        accumulated = 0
+        for bound, count in zip(self.buckets, self.counts):
+            accumulated += count
+            if accumulated >= rank:
+                return min(bound, self.max)
+        return self.max
+    
+    def cumulative(self) -> List[int]:
+        """Conteos acumulados por bucket, como los exporta Prometheus."""
+        result = []
+        accumulated = 0
+        for count in self.counts:
+            accumulated += count
+            result.append(accumulated)
+        return result
+
+
+class Metrics:
+    """
+    Mide cuánto tarda cada fase de la ejecución.
+    
+    Fases registradas:
+        preflight          prueba TCP del puerto SSH antes de conectar
+        bastion_handshake  conexión y autenticación con el jump host
+        channel_wait       espera de un hueco en el límite de canales del bastion
+        channel_open       apertura del canal direct-tcpip hacia el dispositivo
+        detect             detección de la plataforma (solo la primera vez)
+        device_auth        handshake SSH y autenticación con el dispositivo
+        prompt_discovery   preparación de la sesión y detección del prompt
+        command            ejecución de cada comando
+        parse              filtrado y conteo de la salida
+        device             procesamiento completo de un dispositivo
+    
+    Cada medida alimenta un histograma por fase, otro por (bastion, fase)
+    y otro por (dispositivo, fase). Si ``trace`` está activo, además se
+    guarda un evento por medida para exportar la traza de la ejecución,
+    hasta ``max_events``; los siguientes solo alimentan los histogramas
+    y se cuentan en ``dropped_events``.
+    """
+    
+    def __init__(
+        self,
+        buckets: Sequence[float] = METRICS_BUCKETS,
+        trace: bool = METRICS_TRACE,
+        max_events: int = METRICS_TRACE_MAX_EVENTS,
+    ):
+        """Inicializa los histogramas vacíos."""
+        self.buckets = tuple(sorted(buckets))
+        self.trace = trace
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self) -> None:
+        """Descarta todas las medidas y la traza (al empezar una ejecución)."""
+        with self._lock:
+            self._origin = time.perf_counter()
+            self._by_phase: Dict[str, Histogram] = {}
+            self._by_bastion: Dict[Tuple[str, str], Histogram] = {}
+            self._by_device: Dict[Tuple[str, str], Histogram] = {}
+            self._events: List[dict] = []
+            self._lanes: Dict[int, str] = {}
+            self.dropped_events = 0
+    
+    @contextmanager
+    def span(
+        self,
+        phase: str,
+        device: Optional[str] = None,
+        jump_host: Optional[str] = None,
+        **args,
+    ) -> Iterator[None]:
+        """
+        Mide la duración del bloque como una fase.
+        
+        Funciona también dentro de corrutinas: mide el tiempo real del
+        bloque, incluidas las esperas.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            args["error"] = type(e).__name__
+            raise
+        finally:
+            self.observe(
+                phase, time.perf_counter() - start, device, jump_host, start=start, **args
+            )
+    
+    def observe(
+        self,
+        phase: str,
+        seconds: float,
+        device: Optional[str] = None,
+        jump_host: Optional[str] = None,
+        start: Optional[float] = None,
+        **args,
+    ) -> None:
+        """
+        Registra una duración ya medida.
+        
+        Args:
+            phase: Nombre de la fase
+            seconds: Duración en segundos
+            device: Dispositivo al que corresponde, si aplica
+            jump_host: Bastion usado, si aplica
+            start: Instante de inicio (``time.perf_counter``) para la traza
+            **args: Datos adicionales del evento de traza
+        """
+        lane = self._current_lane() if self.trace and start is not None else None
+        
+        with self._lock:
+            self._histogram(self._by_phase, phase).observe(seconds)
+            if jump_host:
+                self._histogram(self._by_bastion, (jump_host, phase)).observe(seconds)
+            if device:
+                self._histogram(self._by_device, (device, phase)).observe(seconds)
+            
+            if lane is not None and len(self._events) >= self.max_events:
+                self.dropped_events += 1
+            elif lane is not None:
+                lane_id, lane_name = lane
+                self._lanes.setdefault(lane_id, lane_name)
+                if device:
+                    args["device"] = device
+                if jump_host:
+                    args["jump_host"] = jump_host
+                self._events.append({
+                    "name": device if phase == "device" and device else phase,
+                    "cat": phase,
+                    "ph": "X",
+                    "ts": round((start - self._origin) * 1e6, 1),
+                    "dur": round(seconds * 1e6, 1),
+                    "pid": os.getpid(),
+                    "tid": lane_id,
+                    "args": args,
+                })
+    
+    def histogram(
+        self,
+        phase: str,
+        device: Optional[str] = None,
+        jump_host: Optional[str] = None,
+    ) -> Optional[Histogram]:
+        """Histograma de una fase, opcionalmente de un dispositivo o bastion."""
+        with self._lock:
+            if device:
+                return self._by_device.get((device, phase))
+            if jump_host:
+                return self._by_bastion.get((jump_host, phase))
+            return self._by_phase.get(phase)
+    
+    def samples(self, phase: str) -> List[float]:
+        """Duraciones exactas registradas de una fase (requiere ``trace``)."""
+        with self._lock:
+            return [event["dur"] / 1e6 for event in self._events if event["cat"] == phase]
+    
+    def phase_summary(self) -> List[str]:
+        """Líneas de resumen por fase: número de medidas, media, p50 y p99."""
+        with self._lock:
+            histograms = list(self._by_phase.items())
+        return [
+            f"{phase:<17} n={h.count:<6} media={h.total / h.count:.3f}s "
+            f"p50≈{h.quantile(0.5):.3f}s p99≈{h.quantile(0.99):.3f}s"
+            for phase, h in histograms
+            if h.count
+        ]
+    
+    def write_prometheus(self, path: Path, labels: Optional[Dict[str, str]] = None) -> Path:
+        """
+        Exporta los histogramas a un fichero para el textfile collector.
+        
+        El fichero se reemplaza de forma atómica, como espera el textfile
+        collector de node_exporter.
+        """
+        write_atomic(Path(path), self.render_prometheus(labels))
+        return path
+    
+    def render_prometheus(self, labels: Optional[Dict[str, str]] = None) -> str:
+        """
+        Histogramas en formato de texto de Prometheus.
+        
+        Por fase y por bastion se exportan histogramas completos; por
+        dispositivo solo suma y número de medidas (summary), para que el
+        número de series no crezca con buckets × dispositivos.
+        
+        Args:
+            labels: Etiquetas añadidas a todas las series (p. ej. el shard,
+                para que los ficheros de varios procesos no colisionen)
+        """
+        labels = dict(labels or {})
+        with self._lock:
+            by_phase = sorted(self._by_phase.items())
+            by_bastion = sorted(self._by_bastion.items())
+            by_device = sorted(self._by_device.items())
+        
+        lines: List[str] = []
+        self._append_histograms(
+            lines,
+            "netauto_phase_duration_seconds",
+            "Duración de cada fase de la ejecución",
+            [({**labels, "phase": phase}, h) for phase, h in by_phase],
+        )
+        self._append_histograms(
+            lines,
+            "netauto_bastion_phase_duration_seconds",
+            "Duración de cada fase por jump host",
+            [({**labels, "jump_host": host, "phase": phase}, h) for (host, phase), h in by_bastion],
+        )
+        
+        name = "netauto_device_phase_duration_seconds"
+        lines.append(f"# HELP {name} Duración de cada fase por dispositivo")
+        lines.append(f"# TYPE {name} summary")
+        for (device, phase), h in by_device:
+            series = _format_labels({**labels, "device": device, "phase": phase})
+            lines.append(f"{name}_sum{series} {h.total:.6f}")
+            lines.append(f"{name}_count{series} {h.count}")
+        
+        lines.append("# HELP netauto_last_run_timestamp_seconds Fin de la última ejecución")
+        lines.append("# TYPE netauto_last_run_timestamp_seconds gauge")
+        run_labels = _format_labels(labels) if labels else ""
+        lines.append(f"netauto_last_run_timestamp_seconds{run_labels} {time.time():.3f}")
+        
+        return "\n".join(lines) + "\n"
+    
+    def write_trace(self, path: Path) -> Path:
+        """
+        Exporta la traza en formato Trace Event (chrome://tracing, Perfetto).
+        
+        Cada hilo o tarea asyncio aparece como una fila; dentro de ella,
+        el span de cada dispositivo contiene los de sus fases y comandos.
+        """
+        with self._lock:
+            events = list(self._events)
+            lanes = dict(self._lanes)
+        
+        pid = os.getpid()
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": lane_id, "args": {"name": name}}
+            for lane_id, name in lanes.items()
+        ]
+        write_atomic(
+            Path(path),
+            json.dumps({"traceEvents": metadata + events, "displayTimeUnit": "ms"}),
+        )
+        return path
+    
+    def _histogram(self, histograms: dict, key) -> Histogram:
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = Histogram(self.buckets)
+        return histogram
+    
+    def _append_histograms(
+        self,
+        lines: List[str],
+        name: str,
+        help_text: str,
+        series: List[Tuple[Dict[str, str], Histogram]],
+    ) -> None:
+        """Agrega un histograma de Prometheus con todas sus series."""
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, h in series:
+            bounds = [f"{b:g}" for b in h.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, h.cumulative()):
+                lines.append(f"{name}_bucket{_format_labels({**labels, 'le': bound})} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {h.total:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {h.count}")
+    
+    def _current_lane(self) -> Tuple[int, str]:
+        """Fila de la traza: la tarea asyncio en curso o, si no hay, el hilo."""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is not None:
+            return id(task), task.get_name()
+        thread = threading.current_thread()
+        return thread.ident, thread.name
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Formatea las etiquetas de una serie de Prometheus."""
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape_label(value: str) -> str:
+    """Escapa barras invertidas, comillas y saltos de línea."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
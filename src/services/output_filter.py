@@ -0,0 +1,121 @@
+"""Filtrado y conteo de líneas relevantes en la salida de los comandos."""
+from typing import Iterable, Iterator, List, Tuple
+import re
+
+from ..config.constants import SKIP_PATTERNS
+
+
+# Líneas vacías o solo con espacios (precedidas por un salto de línea)
+_BLANK_LINE = re.compile(r"\n[^\S\n]*(?=\n|$)")
+
+
+class OutputFilter:
+    """
+    Cuenta las líneas de configuración descartando vacías y comentarios.
+    
+    Los patrones a descartar se comparan sin distinguir mayúsculas. La
+    salida se pasa a minúsculas una sola vez y, si no hace falta conservar
+    las líneas, el conteo se hace con búsquedas en C sin dividir el texto.
+    """
+    
+    def __init__(self, skip_patterns: Iterable[str] = SKIP_PATTERNS):
+        """Prepara los patrones a descartar en minúsculas."""
+        self.skip_patterns: Tuple[str, ...] = tuple(p.lower() for p in skip_patterns)
+    
+    def count(self, output: str) -> int:
+        """Retorna el número de líneas relevantes de la salida."""
+        if not output:
+            return 0
+        
+        text = output.lower()
+        total_lines = text.count("\n") + 1
+        
+        blank_lines = sum(1 for _ in _BLANK_LINE.finditer(text))
+        first_end = text.find("\n")
+        first_line = text if first_end == -1 else text[:first_end]
+        if not first_line.strip():
+            blank_lines += 1
+        
+        # Inicio de cada línea que contiene algún patrón (sin contar dos veces)
+        skipped_starts = set()
+        find = text.find
+        rfind = text.rfind
+        for pattern in self.skip_patterns:
+            pos = find(pattern)
+            while pos != -1:
+                skipped_starts.add(rfind("\n", 0, pos))
+                line_end = find("\n", pos)
+                if line_end == -1:
+                    break
+                pos = find(pattern, line_end)
+        
+        return total_lines - blank_lines - len(skipped_starts)
+    
+    def filter(self, output: str, retain_lines: bool = False) -> Tuple[int, List[str]]:
+        """
+        Filtra la salida de un comando.
+        
+        Args:
+            output: Salida completa del comando
+            retain_lines: Conservar las líneas relevantes además del conteo
+        
+        Returns:
+            Tupla (número de líneas relevantes, líneas conservadas)
+        """
+        if not retain_lines:
+            return self.count(output), []
+        
+        lines = list(self.iter_lines(output))
+        return len(lines), lines
+    
+    def filter_lines(
+        self,
+        lines: Iterable[str],
+        retain_lines: bool = False,
+    ) -> Tuple[int, List[str]]:
+        """
+        Filtra líneas que llegan de una en una (lectura en streaming).
+        
+        Equivale a ``filter`` sobre el texto unido, pero sin necesitarlo:
+        si no se conservan las líneas, solo se guarda el conteo.
+        """
+        relevant = self.iter_relevant(lines)
+        if retain_lines:
+            kept = list(relevant)
+            return len(kept), kept
+        return sum(1 for _ in relevant), []
+    
+    def iter_relevant(self, lines: Iterable[str]) -> Iterator[str]:
+        """Genera las líneas relevantes de un iterable de líneas."""
+        accepts = self.accepts
+        for line in lines:
+            if accepts(line):
+                yield line
+    
+    def iter_lines(self, output: str) -> Iterator[str]:
+        """Genera las líneas relevantes sin construir listas intermedias."""
+        accepts = self.accepts
+        start = 0
+        end = output.find("\n")
+        
+        while end != -1:
+            line = output[start:end]
+            if accepts(line):
+                yield line
+            start = end + 1
+            end = output.find("\n", start)
+        
+        line = output[start:]
+        if accepts(line):
+            yield line
+    
+    def accepts(self, line: str) -> bool:
+        """Indica si una línea es relevante (no vacía ni descartada)."""
+        if not line or line.isspace():
+            return False
+        
+        line_lower = line.lower()
+        for pattern in self.skip_patterns:
+            if pattern in line_lower:
+                return False
+        return True
@@ -0,0 +1,132 @@
+"""Control de ritmo de comandos por dispositivo, por jump host y global."""
+from typing import Dict, Optional
+import threading
+import time
+
+from ..config.constants import (
+    GLOBAL_COMMAND_RATE, JUMP_HOST_COMMAND_RATE,
+    DEVICE_COMMAND_RATE, DEVICE_COMMAND_RATE_MIN, DEVICE_COMMAND_RATE_MAX,
+    SLOW_COMMAND_LATENCY,
+)
+
+
+class TokenBucket:
+    """
+    Token bucket con reservas: cada comando consume un token.
+    
+    Si no quedan tokens, el saldo pasa a negativo y ``reserve`` retorna
+    cuánto debe esperar el llamante para respetar el ritmo configurado.
+    """
+    
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """Inicializa el bucket lleno con ``rate`` tokens por segundo."""
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        """Consume un token y retorna los segundos de espera necesarios."""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+    
+    def set_rate(self, rate: float) -> None:
+        """Cambia el ritmo conservando los tokens acumulados."""
+        with self._lock:
+            self._refill()
+            self.rate = rate
+    
+    def _refill(self) -> None:
+        """Añade los tokens generados desde la última consulta."""
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+
+class CommandPacer:
+    """
+    Planifica el envío de comandos con límites globales, por bastion y por equipo.
+    
+    El ritmo de cada dispositivo se adapta a su latencia observada: los
+    equipos rápidos aceleran hasta ``DEVICE_COMMAND_RATE_MAX`` y los lentos
+    o con errores se frenan hasta ``DEVICE_COMMAND_RATE_MIN``.
+    """
+    
+    def __init__(
+        self,
+        global_rate: float = GLOBAL_COMMAND_RATE,
+        jump_host_rate: float = JUMP_HOST_COMMAND_RATE,
+        device_rate: float = DEVICE_COMMAND_RATE,
+        device_rate_min: float = DEVICE_COMMAND_RATE_MIN,
+        device_rate_max: float = DEVICE_COMMAND_RATE_MAX,
+        slow_latency: float = SLOW_COMMAND_LATENCY,
+    ):
+        """Inicializa los límites; los buckets por equipo se crean bajo demanda."""
+        self.global_bucket = TokenBucket(global_rate)
+        self.jump_host_rate = jump_host_rate
+        self.device_rate = device_rate
+        self.device_rate_min = device_rate_min
+        self.device_rate_max = device_rate_max
+        self.slow_latency = slow_latency
+        self._lock = threading.Lock()
+        self._jump_buckets: Dict[str, TokenBucket] = {}
+        self._device_buckets: Dict[str, TokenBucket] = {}
+    
+    def reserve(self, device_name: str, jump_host: Optional[str] = None) -> float:
+        """
+        Reserva el envío de un comando sin bloquear.
+        
+        Returns:
+            Segundos que hay que esperar antes de enviar el comando
+        """
+        waits = [
+            self._device_bucket(device_name).reserve(),
+            self.global_bucket.reserve(),
+        ]
+        if jump_host:
+            waits.append(self._jump_bucket(jump_host).reserve())
+        return max(waits)
+    
+    def acquire(self, device_name: str, jump_host: Optional[str] = None) -> float:
+        """Bloquea hasta que se puede enviar un comando; retorna la espera."""
+        wait = self.reserve(device_name, jump_host)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    def record(self, device_name: str, latency: float, success: bool = True) -> None:
+        """Ajusta el ritmo del dispositivo según la latencia y el resultado."""
+        bucket = self._device_bucket(device_name)
+        
+        if not success:
+            rate = bucket.rate * 0.5
+        elif latency > self.slow_latency:
+            rate = bucket.rate * 0.7
+        else:
+            rate = bucket.rate * 1.5
+        
+        bucket.set_rate(min(self.device_rate_max, max(self.device_rate_min, rate)))
+    
+    def _device_bucket(self, device_name: str) -> TokenBucket:
+        """Retorna el bucket del dispositivo, creándolo si no existe."""
+        with self._lock:
+            bucket = self._device_buckets.get(device_name)
+            if bucket is None:
+                # Burst de 1: el primer comando sale inmediatamente
+                bucket = TokenBucket(self.device_rate, burst=1.0)
+                self._device_buckets[device_name] = bucket
+            return bucket
+    
+    def _jump_bucket(self, jump_host: str) -> TokenBucket:
+        """Retorna el bucket del jump host, creándolo si no existe."""
+        with self._lock:
+            bucket = self._jump_buckets.get(jump_host)
+            if bucket is None:
+                bucket = TokenBucket(self.jump_host_rate)
+                self._jump_buckets[jump_host] = bucket
+            return bucket
@@ -0,0 +1,246 @@
+"""Pool de procesos para filtrar y contar la salida de los comandos fuera del GIL."""
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor, wait
+from typing import Callable, List, Optional, Tuple
+import threading
+import time
+
+from ..models.command_result import CommandResult
+from ..config.constants import PARSE_PROCESSES, PARSE_QUEUE_SIZE, PARSE_POOL_MIN_BYTES
+from .config_index import match_parameters
+from .output_filter import OutputFilter
+
+
+# (conteo, líneas conservadas) por comando o parámetro
+ParsedOutput = List[Tuple[int, List[str]]]
+
+# Filtro de cada proceso del pool, creado en su primer trabajo
+_worker_filter: Optional[OutputFilter] = None
+
+
+def _parse_in_worker(
+    kind: str,
+    parameters: List[str],
+    output: str,
+    retain_lines: bool,
+    submitted_at: float,
+) -> Tuple[ParsedOutput, float, float]:
+    """
+    Trabajo ejecutado en un proceso del pool.
+    
+    Returns:
+        (resultado, segundos en cola, segundos de CPU de parseo)
+    """
+    global _worker_filter
+    started_at = time.time()
+    if _worker_filter is None:
+        _worker_filter = OutputFilter()
+    start = time.perf_counter()
+    parsed = _parse(_worker_filter, kind, parameters, output, retain_lines)
+    return parsed, max(0.0, started_at - submitted_at), time.perf_counter() - start
+
+
+def _parse(
+    output_filter: OutputFilter,
+    kind: str,
+    parameters: List[str],
+    output: str,
+    retain_lines: bool,
+) -> ParsedOutput:
+    """Filtra una salida: un comando (``command``) o la configuración completa (``snapshot``)."""
+    if kind == "command":
+        return [output_filter.filter(output, retain_lines=retain_lines)]
+    
+    return match_parameters(parameters, output_filter.iter_lines(output), retain_lines)
+
+
+class ParsePool:
+    """
+    Etapa de parseo entre los workers de E/S y el writer del reporte.
+    
+    Los workers de E/S descargan la salida, la entregan al pool y siguen
+    con el siguiente comando o dispositivo sin esperar el resultado:
+    ``submit`` retorna un ``Future`` que recoge el writer. El backend
+    asyncssh entrega desde un hilo auxiliar, para que la espera por la cola
+    no detenga su bucle. El filtrado y el conteo se hacen en otros
+    procesos, así que una configuración grande no bloquea al resto de
+    workers con el GIL. Como mucho ``queue_size`` salidas esperan o se
+    parsean a la vez: si el parseo no da abasto, los workers de E/S se
+    bloquean al entregar la siguiente (backpressure) en vez de acumular
+    salidas en memoria.
+    
+    Las salidas pequeñas se parsean en el propio worker de E/S: enviarlas
+    a otro proceso cuesta más que filtrarlas.
+    
+    El pool lleva la cuenta del tiempo de cada etapa para ver cuál está
+    saturada (``stats``); ``reset_stats`` la reinicia en cada ejecución.
+    """
+    
+    def __init__(
+        self,
+        processes: int = PARSE_PROCESSES,
+        queue_size: int = PARSE_QUEUE_SIZE,
+        min_bytes: int = PARSE_POOL_MIN_BYTES,
+    ):
+        """Prepara el pool; los procesos se arrancan con el primer trabajo."""
+        self.processes = max(1, processes)
+        self.queue_size = max(1, queue_size)
+        self.min_bytes = min_bytes
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(self.queue_size)
+        self._lock = threading.Lock()
+        self._inline_filter = OutputFilter()
+        self._in_flight = 0
+        self._stats = self._empty_stats()
+    
+    @staticmethod
+    def _empty_stats() -> dict:
+        return {
+            "jobs": 0,  # Salidas parseadas en el pool
+            "inline_jobs": 0,  # Salidas pequeñas parseadas en el worker de E/S
+            "parse_seconds": 0.0,  # CPU de parseo en el pool
+            "queue_seconds": 0.0,  # Espera en cola hasta llegar a un proceso
+            "blocked_seconds": 0.0,  # Workers de E/S bloqueados por la cola llena
+            "max_in_flight": 0,
+        }
+    
+    def submit(
+        self,
+        kind: str,
+        parameters: List[str],
+        output: str,
+        retain_lines: bool = False,
+    ) -> "Future[ParsedOutput]":
+        """
+        Entrega una salida al pool sin esperar su parseo.
+        
+        Bloquea solo mientras la cola está llena.
+        
+        Args:
+            kind: "command" (salida de ``| in``, un resultado) o "snapshot"
+                (configuración completa, un resultado por parámetro)
+        
+        Returns:
+            Future con el (conteo, líneas) de cada comando o parámetro
+        """
+        if len(output) < self.min_bytes:
+            return self._run_inline(kind, parameters, output, retain_lines)
+        
+        self._acquire_slot()
+        return self._submit(kind, parameters, output, retain_lines)
+    
+    def stats(self) -> dict:
+        """Contadores acumulados de la etapa de parseo."""
+        with self._lock:
+            return dict(self._stats)
+    
+    def reset_stats(self) -> None:
+        """Reinicia los contadores (al empezar cada ejecución)."""
+        with self._lock:
+            self._stats = self._empty_stats()
+            self._stats["max_in_flight"] = self._in_flight
+    
+    def close(self) -> None:
+        """Termina los procesos del pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    def _run_inline(self, kind: str, parameters: List[str], output: str, retain_lines: bool) -> Future:
+        self._add("inline_jobs", 1)
+        future: Future = Future()
+        try:
+            future.set_result(_parse(self._inline_filter, kind, parameters, output, retain_lines))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    
+    def _acquire_slot(self) -> None:
+        """Reserva un hueco en la cola; bloquea mientras esté llena."""
+        if self._slots.acquire(blocking=False):
+            return
+        blocked_start = time.perf_counter()
+        self._slots.acquire()
+        self._add("blocked_seconds", time.perf_counter() - blocked_start)
+    
+    def _submit(self, kind: str, parameters: List[str], output: str, retain_lines: bool) -> Future:
+        """Envía un trabajo al pool con el hueco de la cola ya reservado."""
+        try:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.processes)
+                executor = self._executor
+                self._in_flight += 1
+                self._stats["max_in_flight"] = max(self._stats["max_in_flight"], self._in_flight)
+        except BaseException:
+            self._slots.release()
+            raise
+        try:
+            job = executor.submit(_parse_in_worker, kind, parameters, output, retain_lines, time.time())
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+            raise
+        
+        # El resultado se publica en otro Future cuando el hueco ya está liberado
+        parsed: Future = Future()
+        job.add_done_callback(lambda done: self._on_done(done, parsed))
+        return parsed
+    
+    def _on_done(self, job: Future, parsed: Future) -> None:
+        error = job.exception() if not job.cancelled() else CancelledError()
+        with self._lock:
+            self._in_flight -= 1
+            if error is None:
+                _, queue_seconds, parse_seconds = job.result()
+                self._stats["jobs"] += 1
+                self._stats["queue_seconds"] += queue_seconds
+                self._stats["parse_seconds"] += parse_seconds
+        self._slots.release()
+        if error is None:
+            parsed.set_result(job.result()[0])
+        else:
+            parsed.set_exception(error)
+    
+    def _add(self, key: str, value: float) -> None:
+        with self._lock:
+            self._stats[key] += value
+
+
+def wait_parsed(results: List[CommandResult]) -> float:
+    """
+    Espera a que terminen los parseos pendientes de ``results``.
+    
+    Returns:
+        Segundos esperados
+    """
+    pending = {r.parsing for r in results if r.parsing is not None}
+    if not pending:
+        return 0.0
+    start = time.perf_counter()
+    wait(pending)
+    for result in results:
+        result.parsing = None
+    return time.perf_counter() - start
+
+
+def when_parsed(results: List[CommandResult], callback: Callable[[], None]) -> None:
+    """Llama a ``callback`` cuando terminen los parseos pendientes de ``results``."""
+    pending = {r.parsing for r in results if r.parsing is not None}
+    if not pending:
+        callback()
+        return
+    
+    remaining = [len(pending)]
+    lock = threading.Lock()
+    
+    def on_done(_: Future) -> None:
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            callback()
+    
+    for future in pending:
+        future.add_done_callback(on_done)
@@ -0,0 +1,97 @@
+"""Caché persistente del tipo de dispositivo (driver de Netmiko) detectado."""
+from pathlib import Path
+from typing import Dict, Optional, Set
+import json
+import threading
+import time
+
+from ..config.constants import PLATFORM_CACHE_PATH
+from .state_file import locked, merge_devices, write_atomic
+
+
+class PlatformCache:
+    """
+    Recuerda el driver de Netmiko de cada dispositivo entre ejecuciones.
+    
+    La detección automática cuesta una conexión extra y varios comandos,
+    así que se hace una sola vez por dispositivo; las conexiones siguientes
+    usan directamente el driver guardado. La entrada se invalida cuando el
+    driver deja de funcionar (fallo de autenticación o de prompt) para que
+    la siguiente conexión vuelva a detectarlo.
+    """
+    
+    def __init__(self, path: Path = PLATFORM_CACHE_PATH):
+        """Inicializa la caché y carga las entradas guardadas en disco."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        self._dirty = False
+        self._touched: Set[str] = set()  # Dispositivos cambiados desde la carga
+        self.load()
+    
+    def get(self, device_name: str) -> Optional[str]:
+        """Retorna el driver guardado del dispositivo, o None si no se conoce."""
+        with self._lock:
+            entry = self._entries.get(device_name)
+        return entry["device_type"] if entry is not None else None
+    
+    def put(self, device_name: str, device_type: str, detected: bool = True) -> None:
+        """
+        Guarda el driver de un dispositivo.
+        
+        Args:
+            device_name: Nombre del dispositivo
+            device_type: Driver de Netmiko
+            detected: False si es el driver por defecto porque la detección
+                no identificó la plataforma
+        """
+        with self._lock:
+            self._touched.add(device_name)
+            self._entries[device_name] = {
+                "device_type": device_type,
+                "detected": detected,
+                "detected_at": time.time(),
+            }
+            self._dirty = True
+    
+    def invalidate(self, device_name: str) -> None:
+        """Elimina la entrada de un dispositivo para forzar una nueva detección."""
+        with self._lock:
+            if self._entries.pop(device_name, None) is not None:
+                self._touched.add(device_name)
+                self._dirty = True
+    
+    def load(self) -> None:
+        """Carga la caché desde disco, ignorando ficheros corruptos."""
+        if not self.path.exists():
+            return
+        
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠ No se pudo leer la caché de plataformas: {e}")
+            return
+        
+        with self._lock:
+            self._entries = dict(data.get("devices", {}))
+    
+    def save(self) -> None:
+        """
+        Guarda la caché en disco de forma atómica si ha cambiado.
+        
+        Otros procesos (p. ej. otros shards) pueden haber guardado sus
+        dispositivos mientras tanto: se combina con el fichero y solo se
+        sobrescriben los dispositivos que cambiaron en este.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = dict(self._entries)
+            touched = set(self._touched)
+            self._dirty = False
+            self._touched.clear()
+        
+        with locked(self.path):
+            merged = merge_devices(self.path, entries, touched)
+            write_atomic(self.path, json.dumps({"devices": merged}))
@@ -0,0 +1,254 @@
+"""Servicio residente que atiende consultas con sesiones SSH ya abiertas."""
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+import hmac
+import ipaddress
+import json
+import time
+
+from ..models.device import Device
+from ..models.command_result import CommandResult
+from ..config.constants import (
+    DAEMON_HOST, DAEMON_PORT, MAX_WORKERS, SESSION_POOL_MAX_SESSIONS,
+    PLATFORM_AUTODETECT, FAST_CONNECT,
+)
+from .jump_host_pool import JumpHostPool
+from .metrics import Metrics
+from .platform_cache import PlatformCache
+from .session_profiles import SessionProfileCache
+from .session_pool import SessionPool
+from .ssh_service import SSHService
+
+
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+
+class QueryDaemon:
+    """
+    Ejecuta consultas sobre un pool de sesiones que sobrevive entre ellas.
+    
+    La primera consulta a un dispositivo paga la conexión, la autenticación
+    y la preparación de la sesión; las siguientes reutilizan la sesión y
+    solo pagan el tiempo de los comandos.
+    """
+    
+    def __init__(
+        self,
+        max_workers: int = MAX_WORKERS,
+        max_sessions: int = SESSION_POOL_MAX_SESSIONS,
+        ssh_service: Optional[SSHService] = None,
+    ):
+        """Inicializa el servicio SSH con su pool de sesiones."""
+        if ssh_service is None:
+            # Cada sesión conserva su canal por el bastion: el límite de
+            # canales admite todas las sesiones del pool más las que se
+            # abren mientras todas están en uso (una por worker)
+            # Sin traza ni líneas conservadas: en un servicio residente
+            # crecerían sin límite, y la API solo devuelve los conteos
+            metrics = Metrics(trace=False)
+            ssh_service = SSHService(
+                jump_host_pool=JumpHostPool(
+                    max_channels=max_sessions + max(1, max_workers), metrics=metrics
+                ),
+                platform_cache=PlatformCache() if PLATFORM_AUTODETECT else None,
+                session_profiles=SessionProfileCache() if FAST_CONNECT else None,
+                metrics=metrics,
+                retain_output_lines=False,
+            )
+        if ssh_service.session_pool is None:
+            ssh_service.session_pool = SessionPool(
+                connect=ssh_service.open_connection,
+                close=ssh_service.close_connection,
+                max_sessions=max_sessions,
+            )
+        self.ssh_service = ssh_service
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="query"
+        )
+        self.started_at = time.time()
+        self.queries = 0
+    
+    def query(
+        self,
+        devices: List[Device],
+        jump_host: Optional[str] = None,
+        jump_user: Optional[str] = None,
+        jump_pass: Optional[str] = None,
+    ) -> List[CommandResult]:
+        """Ejecuta los comandos de los dispositivos y retorna sus resultados en orden."""
+        # Cada consulta guarda sus líneas en un buffer propio, que se libera
+        # con sus resultados
+        self.ssh_service.reset_output_buffer()
+        futures = [
+            self.executor.submit(
+                self.ssh_service.execute_commands_on_device,
+                device,
+                jump_host=jump_host,
+                jump_user=jump_user,
+                jump_pass=jump_pass,
+            )
+            for device in devices
+        ]
+        self.queries += 1
+        return [result for future in futures for result in future.result()]
+    
+    def stats(self) -> dict:
+        """Estado del servicio y del pool de sesiones."""
+        return {
+            "uptime": round(time.time() - self.started_at, 1),
+            "queries": self.queries,
+            **self.ssh_service.session_pool.stats(),
+        }
+    
+    def close(self) -> None:
+        """Cierra las sesiones abiertas y el pool de hilos."""
+        self.executor.shutdown(wait=True)
+        self.ssh_service.close()
+        if self.ssh_service.platform_cache is not None:
+            self.ssh_service.platform_cache.save()
+        if self.ssh_service.session_profiles is not None:
+            self.ssh_service.session_profiles.save()
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """
+    API HTTP local del servicio.
+    
+    GET  /health  → estado del servicio y del pool de sesiones
+    GET  /metrics → latencia por fase en formato de texto de Prometheus
+    POST /query   → {"devices": [{"name", "user", "password", "parameter"}],
+                     "jump_host", "jump_user", "jump_pass"}
+                  ← {"results": [...], "elapsed": segundos}
+    """
+    
+    server: "QueryHTTPServer"
+    
+    def do_GET(self) -> None:
+        if not self._authorized():
+            return
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", **self.server.query_daemon.stats()})
+        elif self.path == "/metrics":
+            data = self.server.query_daemon.ssh_service.metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self._send_json(404, {"error": "Ruta no encontrada"})
+    
+    def do_POST(self) -> None:
+        if not self._authorized():
+            return
+        if self.path != "/query":
+            self._send_json(404, {"error": "Ruta no encontrada"})
+            return
+        
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length > MAX_REQUEST_BYTES:
+                raise ValueError("Petición demasiado grande")
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            devices = [
+                Device(
+                    name=str(d["name"]),
+                    user=str(d.get("user", "")),
+                    password=str(d.get("password", "")),
+                    parameter=str(d.get("parameter", "")),
+                )
+                for d in payload.get("devices", [])
+            ]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self._send_json(400, {"error": f"Petición inválida: {e}"})
+            return
+        
+        start = time.perf_counter()
+        results = self.server.query_daemon.query(
+            devices,
+            jump_host=payload.get("jump_host") or None,
+            jump_user=payload.get("jump_user") or None,
+            jump_pass=payload.get("jump_pass") or None,
+        )
+        self._send_json(200, {
+            "results": [r.to_dict() for r in results],
+            "elapsed": round(time.perf_counter() - start, 3),
+        })
+    
+    def _authorized(self) -> bool:
+        """Comprueba el token, si el servicio se arrancó con uno."""
+        token = self.server.token
+        if token and not hmac.compare_digest(self.headers.get("X-Auth-Token", ""), token):
+            self._send_json(401, {"error": "Token inválido"})
+            return False
+        return True
+    
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format: str, *args) -> None:
+        print(f"→ {self.address_string()} {format % args}")
+
+
+class QueryHTTPServer(ThreadingHTTPServer):
+    """Servidor HTTP con acceso al servicio de consultas."""
+    
+    daemon_threads = True
+    
+    def __init__(
+        self,
+        daemon: QueryDaemon,
+        host: str = DAEMON_HOST,
+        port: int = DAEMON_PORT,
+        token: Optional[str] = None,
+    ):
+        super().__init__((host, port), QueryRequestHandler)
+        self.query_daemon = daemon
+        self.token = token
+
+
+def is_loopback(host: str) -> bool:
+    """Indica si la dirección de escucha solo es accesible desde el propio equipo."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def serve(
+    host: str = DAEMON_HOST,
+    port: int = DAEMON_PORT,
+    max_workers: int = MAX_WORKERS,
+    token: Optional[str] = None,
+) -> None:
+    """
+    Arranca el servicio y atiende peticiones hasta Ctrl+C.
+    
+    Raises:
+        ValueError: Si escucha fuera de loopback sin token
+    """
+    if not token and not is_loopback(host):
+        raise ValueError(
+            f"El servicio escucha en {host} y las consultas incluyen credenciales: "
+            "define un token (DAEMON_TOKEN) o escucha en 127.0.0.1"
+        )
+    daemon = QueryDaemon(max_workers=max_workers)
+    server = QueryHTTPServer(daemon, host, port, token)
+    print(f"✓ Servicio escuchando en http://{host}:{server.server_port}")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⚠ Deteniendo servicio...")
+    finally:
+        server.server_close()
+        daemon.close()
+        print("✓ Sesiones cerradas")
@@ -0,0 +1,225 @@
+"""Comprobación previa de alcanzabilidad y circuit breaker por dispositivo."""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+import json
+import socket
+import threading
+import time
+
+from ..models.device import Device
+from ..config.constants import (
+    PREFLIGHT_TIMEOUT, PREFLIGHT_WORKERS,
+    CIRCUIT_BREAKER_PATH, CIRCUIT_BREAKER_BASE_DELAY, CIRCUIT_BREAKER_MAX_DELAY,
+)
+from .jump_host_pool import ChannelLimitError, JumpHostError, JumpHostPool
+from .state_file import locked, merge_devices, write_atomic
+
+
+class CircuitBreaker:
+    """
+    Recuerda entre ejecuciones qué dispositivos han fallado recientemente.
+    
+    Tras cada fallo el circuito del dispositivo se abre durante un tiempo
+    que se duplica con cada fallo consecutivo (desde ``base_delay`` hasta
+    ``max_delay``). Mientras está abierto el dispositivo se omite; cuando
+    vence, el siguiente intento actúa de prueba (half-open): si tiene
+    éxito el circuito se cierra y, si falla, se vuelve a abrir con el doble
+    de espera.
+    """
+    
+    def __init__(
+        self,
+        path: Path = CIRCUIT_BREAKER_PATH,
+        base_delay: float = CIRCUIT_BREAKER_BASE_DELAY,
+        max_delay: float = CIRCUIT_BREAKER_MAX_DELAY,
+    ):
+        """Inicializa el circuit breaker y carga su estado desde disco."""
+        self.path = path
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        self._dirty = False
+        self._touched: Set[str] = set()  # Dispositivos cambiados desde la carga
+        self.load()
+    
+    def state(self, device_name: str) -> str:
+        """Estado del circuito: "closed", "open" o "half-open"."""
+        with self._lock:
+            entry = self._entries.get(device_name)
+        if entry is None:
+            return "closed"
+        return "open" if time.time() < entry["open_until"] else "half-open"
+    
+    def allow(self, device_name: str) -> bool:
+        """Indica si se debe intentar conectar con el dispositivo."""
+        return self.state(device_name) != "open"
+    
+    def retry_in(self, device_name: str) -> float:
+        """Segundos que faltan para el próximo intento (0 si está permitido)."""
+        with self._lock:
+            entry = self._entries.get(device_name)
+        if entry is None:
+            return 0.0
+        return max(0.0, entry["open_until"] - time.time())
+    
+    def record_success(self, device_name: str) -> None:
+        """Cierra el circuito del dispositivo."""
+        with self._lock:
+            if self._entries.pop(device_name, None) is not None:
+                self._touched.add(device_name)
+                self._dirty = True
+    
+    def record_failure(self, device_name: str, error: str = "") -> None:
+        """Abre (o reabre con más espera) el circuito del dispositivo."""
+        with self._lock:
+            entry = self._entries.get(device_name, {"failures": 0})
+            failures = entry["failures"] + 1
+            delay = min(self.base_delay * 2 ** (failures - 1), self.max_delay)
+            self._touched.add(device_name)
+            self._entries[device_name] = {
+                "failures": failures,
+                "open_until": time.time() + delay,
+                "last_error": error,
+            }
+            self._dirty = True
+    
+    def load(self) -> None:
+        """Carga el estado desde disco, ignorando ficheros corruptos."""
+        if not self.path.exists():
+            return
+        
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠ No se pudo leer el estado del circuit breaker: {e}")
+            return
+        
+        with self._lock:
+            self._entries = dict(data.get("devices", {}))
+    
+    def save(self) -> None:
+        """
+        Guarda el estado en disco de forma atómica si ha cambiado.
+        
+        Otros procesos (p. ej. otros shards) pueden haber guardado sus
+        dispositivos mientras tanto: se combina con el fichero y solo se
+        sobrescriben los dispositivos que cambiaron en este.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = dict(self._entries)
+            touched = set(self._touched)
+            self._dirty = False
+            self._touched.clear()
+        
+        with locked(self.path):
+            merged = merge_devices(self.path, entries, touched)
+            write_atomic(self.path, json.dumps({"devices": merged}))
+
+
+class ReachabilityChecker:
+    """
+    Comprueba en paralelo que el puerto SSH de cada dispositivo responde.
+    
+    Sin jump host abre una conexión TCP directa; con jump host abre (y
+    cierra) un canal direct-tcpip por el transporte compartido del
+    bastion. Cada prueba tiene un plazo corto, de modo que un equipo
+    apagado cuesta segundos en lugar del timeout completo de Netmiko.
+    """
+    
+    def __init__(
+        self,
+        jump_host_pool: Optional[JumpHostPool] = None,
+        timeout: float = PREFLIGHT_TIMEOUT,
+        max_workers: int = PREFLIGHT_WORKERS,
+    ):
+        """Inicializa el comprobador."""
+        self.jump_host_pool = jump_host_pool or JumpHostPool()
+        self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+    
+    def probe_all(
+        self,
+        devices: List[Device],
+        jump_host: Optional[str] = None,
+        jump_user: Optional[str] = None,
+        jump_pass: Optional[str] = None,
+    ) -> List[Optional[str]]:
+        """
+        Prueba todos los dispositivos.
+        
+        Con jump host, primero se conecta una sola vez con el bastion: si
+        falla, no se prueba ningún dispositivo.
+        
+        Returns:
+            Por cada dispositivo, None si es alcanzable o el motivo del fallo
+        
+        Raises:
+            JumpHostError: Si no se puede conectar o autenticar con el bastion
+        """
+        if not devices:
+            return []
+        workers = min(self.max_workers, len(devices))
+        if jump_host and jump_user and jump_pass:
+            self.jump_host_pool.connect(jump_host, jump_user, jump_pass)
+            # Más pruebas que canales solo harían esperar un canal libre,
+            # y esa espera consumiría el plazo de cada prueba
+            workers = min(workers, self.jump_host_pool.max_channels)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="preflight") as executor:
+            return list(executor.map(
+                lambda device: self.probe(device, jump_host, jump_user, jump_pass),
+                devices,
+            ))
+    
+    def probe(
+        self,
+        device: Device,
+        jump_host: Optional[str] = None,
+        jump_user: Optional[str] = None,
+        jump_pass: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Retorna None si el puerto SSH responde, o el motivo del fallo.
+        
+        Si el bastion no tiene un canal libre a tiempo, el dispositivo no se
+        ha podido probar: retorna None y se intenta conectar igualmente.
+        
+        Raises:
+            JumpHostError: Si el fallo es del bastion y no del dispositivo
+        """
+        dest_addr = device.address
+        metrics = self.jump_host_pool.metrics
+        try:
+            with metrics.span("preflight", device.name, jump_host):
+                self._probe(dest_addr, jump_host, jump_user, jump_pass)
+        except ChannelLimitError as e:
+            print(f"⚠ {device.name}: pre-flight sin comprobar ({e})")
+            return None
+        except JumpHostError:
+            raise
+        except socket.timeout:
+            return f"sin respuesta en {self.timeout:g}s"
+        except Exception as e:
+            return str(e) or type(e).__name__
+        return None
+    
+    def _probe(
+        self,
+        dest_addr: Tuple[str, int],
+        jump_host: Optional[str],
+        jump_user: Optional[str],
+        jump_pass: Optional[str],
+    ) -> None:
+        """Abre y cierra una conexión con el puerto SSH; lanza excepción si falla."""
+        if jump_host and jump_user and jump_pass:
+            channel = self.jump_host_pool.open_channel(
+                jump_host, jump_user, jump_pass, dest_addr, timeout=self.timeout
+            )
+            self.jump_host_pool.release_channel(channel)
+        else:
+            with socket.create_connection(dest_addr, timeout=self.timeout):
+                pass
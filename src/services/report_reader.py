@@ -0,0 +1,164 @@
+"""Lectura de reportes generados, para combinar ejecuciones por shards."""
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import csv
+import json
+
+from ..models.command_result import CommandResult
+from .report_writer import ReportWriter
+
+
+MERGE_BATCH_SIZE = 1000  # Resultados escritos por cada volcado del reporte combinado
+
+
+class ReportReader:
+    """
+    Lee los resultados de un reporte txt, jsonl o csv.
+    
+    Tras recorrer ``iter_results``, ``interrupted`` indica si el reporte
+    se cerró con resultados parciales.
+    """
+    
+    def __init__(self, path: Path):
+        """Inicializa el lector; el formato se deduce de la extensión."""
+        self.path = Path(path)
+        self.interrupted = False
+        
+        suffix = self.path.suffix.lower().lstrip(".")
+        parsers = {
+            "txt": self._iter_txt,
+            "jsonl": self._iter_jsonl,
+            "csv": self._iter_csv,
+        }
+        if suffix not in parsers:
+            raise ValueError(f"Formato de reporte no soportado: {self.path.name}")
+        self._parser = parsers[suffix]
+    
+    def iter_results(self) -> Iterator[CommandResult]:
+        """Genera los resultados en el orden en que aparecen en el fichero."""
+        return self._parser()
+    
+    def _iter_jsonl(self) -> Iterator[CommandResult]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get("type") == "summary":
+                    self.interrupted = self.interrupted or bool(record.get("interrupted"))
+                elif record.get("type") == "result":
+                    yield CommandResult(
+                        device_name=record["device"],
+                        parameter=record["parameter"],
+                        output_lines=None,
+                        line_count=int(record["line_count"]),
+                        success=bool(record["success"]),
+                        error_message=record.get("error_message", ""),
+                        snapshot_id=record.get("snapshot_id"),
+                    )
+    
+    def _iter_csv(self) -> Iterator[CommandResult]:
+        with open(self.path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                yield CommandResult(
+                    device_name=row["device"],
+                    parameter=row["parameter"],
+                    output_lines=None,
+                    line_count=int(row["line_count"] or 0),
+                    success=row["success"] == "True",
+                    error_message=row["error_message"],
+                )
+    
+    def _iter_txt(self) -> Iterator[CommandResult]:
+        section = None
+        with open(self.path, "r", encoding="utf-8") as f:
+            for raw_line in f:
+                line = raw_line.rstrip("\n")
+                if line.startswith("✓ RESULTADOS EXITOSOS"):
+                    section = "success"
+                elif line.startswith("✗ ERRORES"):
+                    section = "errors"
+                elif line.startswith("RESUMEN"):
+                    section = "summary"
+                elif not line.startswith("  • "):
+                    continue
+                elif section == "success":
+                    yield self._parse_txt_success(line[4:])
+                elif section == "errors":
+                    yield self._parse_txt_error(line[4:])
+                elif section == "summary" and line.startswith("  • Ejecución interrumpida"):
+                    self.interrupted = True
+    
+    def _parse_txt_success(self, text: str) -> CommandResult:
+        """Parsea ``Count for <parámetro> in <dispositivo>: <conteo>``."""
+        head, _, count = text.rpartition(": ")
+        parameter, _, device_name = head[len("Count for "):].rpartition(" in ")
+        return CommandResult(
+            device_name=device_name,
+            parameter=parameter,
+            output_lines=None,
+            line_count=int(count),
+            success=True,
+        )
+    
+    def _parse_txt_error(self, text: str) -> CommandResult:
+        """Parsea ``<dispositivo> (<parámetro>): <error>``."""
+        device_name, _, rest = text.partition(" (")
+        parameter, _, error_message = rest.partition("): ")
+        return CommandResult(
+            device_name=device_name,
+            parameter=parameter,
+            output_lines=None,
+            line_count=0,
+            success=False,
+            error_message=error_message,
+        )
+
+
+def merge_reports(
+    paths: Sequence[Path],
+    writer: ReportWriter,
+    device_order: Optional[List[str]] = None,
+) -> Path:
+    """
+    Combina varios reportes (por ejemplo, uno por shard) en ``writer``.
+    
+    Args:
+        paths: Reportes a combinar, en cualquier formato soportado
+        writer: Writer abierto del reporte combinado; se cierra al terminar
+        device_order: Nombres de dispositivo en el orden del inventario; si
+            se indica, el reporte combinado sigue ese orden
+    
+    Returns:
+        Path al reporte combinado
+    """
+    interrupted = False
+    try:
+        if device_order is None:
+            for path in paths:
+                reader = ReportReader(path)
+                batch: List[CommandResult] = []
+                for result in reader.iter_results():
+                    batch.append(result)
+                    if len(batch) >= MERGE_BATCH_SIZE:
+                        writer.write_results(batch)
+                        batch = []
+                writer.write_results(batch)
+                interrupted = interrupted or reader.interrupted
+        else:
+            # Los dispositivos que no están en el inventario van al final
+            position: Dict[str, int] = {name: i for i, name in enumerate(device_order)}
+            collected: List[Tuple[int, int, CommandResult]] = []
+            for path in paths:
+                reader = ReportReader(path)
+                for result in reader.iter_results():
+                    rank = position.get(result.device_name, len(position))
+                    collected.append((rank, len(collected), result))
+                interrupted = interrupted or reader.interrupted
+            collected.sort(key=lambda item: item[:2])
+            writer.write_results([result for _, _, result in collected])
+    except BaseException:
+        writer.close(interrupted=True)
+        raise
+    
+    return writer.close(interrupted=interrupted)
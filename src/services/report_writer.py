@@ -0,0 +1,265 @@
+"""Escritura incremental de reportes de resultados."""
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple, Type
+import csv
+import json
+import sys
+
+from ..models.command_result import CommandResult
+from ..config.constants import DATA_DIR
+
+
+class ReportWriter:
+    """
+    Escribe los resultados de cada dispositivo a medida que terminan.
+    
+    Mantiene los totales del resumen sin conservar los resultados en
+    memoria, y vuelca el fichero tras cada dispositivo para que una
+    interrupción no pierda lo ya procesado. Los formatos jsonl y csv
+    escriben los dispositivos en el orden en que terminan y guardan en
+    cada resultado su posición en el inventario (``index``).
+    """
+    
+    extension = ""
+    newline: Optional[str] = None
+    
+    def __init__(self, path: Path, expected_total: Optional[int] = None):
+        """
+        Abre el fichero de salida.
+        
+        Args:
+            path: Ruta del reporte
+            expected_total: Número de comandos previstos (para el resumen)
+        """
+        self.path = path
+        self.expected_total = expected_total
+        self.successful = 0
+        self.failed = 0
+        self.total_lines = 0
+        self.closed = False
+        
+        self.path.parent.mkdir(exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8", newline=self.newline)
+        self._write_header()
+        self._file.flush()
+    
+    def write_results(self, results: List[CommandResult], index: Optional[int] = None) -> None:
+        """
+        Escribe los resultados de un dispositivo y actualiza los totales.
+        
+        Args:
+            results: Resultados del dispositivo
+            index: Posición del dispositivo en el inventario, si se conoce
+        """
+        for result in results:
+            if result.success:
+                self.successful += 1
+                self.total_lines += result.line_count
+            else:
+                self.failed += 1
+            self._write_result(result, index)
+        self._file.flush()
+    
+    def close(self, interrupted: bool = False) -> Path:
+        """Escribe el resumen final y cierra el fichero."""
+        if not self.closed:
+            self._write_footer(interrupted)
+            self._file.close()
+            self.closed = True
+        return self.path
+    
+    def __enter__(self) -> "ReportWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(interrupted=exc_type is not None)
+    
+    @property
+    def total(self) -> int:
+        """Número de comandos escritos hasta el momento."""
+        return self.successful + self.failed
+    
+    def _write_header(self) -> None:
+        """Escribe el encabezado del reporte (opcional según el formato)."""
+    
+    def _write_result(self, result: CommandResult, index: Optional[int]) -> None:
+        """Escribe un resultado individual."""
+        raise NotImplementedError
+    
+    def _write_footer(self, interrupted: bool) -> None:
+        """Escribe el resumen final (opcional según el formato)."""
+
+
+class TextReportWriter(ReportWriter):
+    """
+    Reporte de texto legible con secciones de éxitos, errores y resumen.
+    
+    Las líneas de cada dispositivo se guardan en ficheros auxiliares a
+    medida que termina, y al cerrar se vuelcan ordenadas por su posición
+    en el inventario: el reporte no depende del orden de finalización. En
+    memoria solo se guarda dónde empieza y acaba cada dispositivo.
+    """
+    
+    extension = "txt"
+    
+    def __init__(self, path: Path, expected_total: Optional[int] = None):
+        self._spool_paths = {
+            "ok": path.with_name(path.name + ".ok"),
+            "errors": path.with_name(path.name + ".errors"),
+        }
+        self._spools: Dict[str, BinaryIO] = {}
+        # (posición en el inventario, orden de llegada, inicio, fin) por dispositivo
+        self._chunks: Dict[str, List[Tuple[int, int, int, int]]] = {"ok": [], "errors": []}
+        super().__init__(path, expected_total)
+    
+    def write_results(self, results: List[CommandResult], index: Optional[int] = None) -> None:
+        starts = {name: self._spool(name).tell() for name in self._chunks}
+        super().write_results(results, index)
+        # Sin posición conocida, el dispositivo va al final
+        position = index if index is not None else sys.maxsize
+        for name, chunks in self._chunks.items():
+            spool = self._spools[name]
+            end = spool.tell()
+            if end > starts[name]:
+                chunks.append((position, len(chunks), starts[name], end))
+                spool.flush()
+    
+    def _spool(self, name: str) -> BinaryIO:
+        """Fichero auxiliar de la sección ``name``, creado bajo demanda."""
+        if name not in self._spools:
+            self._spools[name] = open(self._spool_paths[name], "wb+")
+        return self._spools[name]
+    
+    def _write_header(self) -> None:
+        f = self._file
+        f.write("="*70 + "\n")
+        f.write(f"{'NETWORK AUTOMATION RESULTS':^70}\n")
+        f.write("="*70 + "\n")
+        f.write(f"Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write("="*70 + "\n\n")
+    
+    def _write_result(self, result: CommandResult, index: Optional[int]) -> None:
+        if result.success:
+            line = f"  • Count for {result.parameter} in {result.device_name}: {result.line_count}\n"
+            self._spools["ok"].write(line.encode("utf-8"))
+        else:
+            line = f"  • {result.device_name} ({result.parameter}): {result.error_message}\n"
+            self._spools["errors"].write(line.encode("utf-8"))
+    
+    def _write_section(self, name: str, title: str) -> None:
+        """Vuelca los dispositivos de una sección en el orden del inventario."""
+        spool = self._spools.get(name)
+        if spool is None:
+            return
+        f = self._file
+        if self._chunks[name]:
+            f.write(title + "\n")
+            f.write("-"*70 + "\n")
+            for _, _, start, end in sorted(self._chunks[name]):
+                spool.seek(start)
+                f.write(spool.read(end - start).decode("utf-8"))
+            f.write("\n")
+        spool.close()
+        self._spool_paths[name].unlink()
+    
+    def _write_footer(self, interrupted: bool) -> None:
+        self._write_section("ok", "✓ RESULTADOS EXITOSOS:")
+        self._write_section("errors", "✗ ERRORES:")
+        
+        # Resumen
+        f = self._file
+        f.write("="*70 + "\n")
+        f.write("RESUMEN:\n")
+        if interrupted:
+            f.write("  • Ejecución interrumpida: resultados parciales\n")
+        executed = f"  • Total de comandos ejecutados: {self.total}"
+        if self.expected_total is not None and self.total != self.expected_total:
+            executed += f" de {self.expected_total} previstos"
+        f.write(executed + "\n")
+        f.write(f"  • Comandos exitosos: {self.successful}\n")
+        f.write(f"  • Comandos fallidos: {self.failed}\n")
+        f.write(f"  • Total de líneas encontradas: {self.total_lines}\n")
+        f.write("="*70 + "\n")
+
+
+class JsonlReportWriter(ReportWriter):
+    """Un objeto JSON por resultado y un registro final de resumen."""
+    
+    extension = "jsonl"
+    
+    def _write_result(self, result: CommandResult, index: Optional[int]) -> None:
+        record = {"type": "result", **result.to_dict()}
+        if index is not None:
+            record["index"] = index
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+    
+    def _write_footer(self, interrupted: bool) -> None:
+        summary = {
+            "type": "summary",
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "successful": self.successful,
+            "failed": self.failed,
+            "total_lines": self.total_lines,
+            "interrupted": interrupted,
+        }
+        self._file.write(json.dumps(summary) + "\n")
+
+
+class CsvReportWriter(ReportWriter):
+    """Una fila por resultado, apta para hojas de cálculo."""
+    
+    extension = "csv"
+    newline = ""  # El módulo csv gestiona los saltos de línea
+    FIELDS = ["device", "parameter", "line_count", "success", "error_message", "index"]
+    
+    def _write_header(self) -> None:
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.FIELDS)
+    
+    def _write_result(self, result: CommandResult, index: Optional[int]) -> None:
+        self._writer.writerow([
+            result.device_name,
+            result.parameter,
+            result.line_count,
+            result.success,
+            result.error_message,
+            "" if index is None else index,
+        ])
+
+
+REPORT_WRITERS: Dict[str, Type[ReportWriter]] = {
+    "txt": TextReportWriter,
+    "jsonl": JsonlReportWriter,
+    "csv": CsvReportWriter,
+}
+
+
+def create_report_writer(
+    report_format: str = "txt",
+    path: Optional[Path] = None,
+    expected_total: Optional[int] = None,
+) -> ReportWriter:
+    """
+    Crea el writer del formato indicado.
+    
+    Args:
+        report_format: "txt", "jsonl" o "csv"
+        path: Ruta del reporte; por defecto data/output_<timestamp>.<formato>
+        expected_total: Número de comandos previstos
+    
+    Returns:
+        Writer abierto y listo para recibir resultados
+    """
+    writer_class = REPORT_WRITERS.get(report_format)
+    if writer_class is None:
+        raise ValueError(
+            f"Formato de reporte desconocido: {report_format} "
+            f"(disponibles: {', '.join(REPORT_WRITERS)})"
+        )
+    
+    if path is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = DATA_DIR / f"output_{timestamp}.{writer_class.extension}"
+    
+    return writer_class(path, expected_total=expected_total)
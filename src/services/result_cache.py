@@ -0,0 +1,162 @@
+"""Caché persistente de resultados por dispositivo y parámetro."""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+import json
+import threading
+import time
+
+from ..models.command_result import CommandResult
+from ..config.constants import (
+    RESULT_CACHE_PATH, RESULT_CACHE_TTL, RESULT_CACHE_MAX_DEVICES,
+)
+from .state_file import locked, merge_devices, write_atomic
+
+
+class ResultCache:
+    """
+    Reutiliza los conteos de dispositivos cuya configuración no ha cambiado.
+    
+    Cada entrada guarda el indicador de cambio del dispositivo (por ejemplo,
+    la marca "Last configuration change") y el conteo de cada parámetro.
+    Las entradas caducan tras ``ttl`` segundos y, al superar
+    ``max_devices``, se descartan las usadas hace más tiempo.
+    """
+    
+    def __init__(
+        self,
+        path: Path = RESULT_CACHE_PATH,
+        ttl: float = RESULT_CACHE_TTL,
+        max_devices: int = RESULT_CACHE_MAX_DEVICES,
+    ):
+        """Inicializa la caché y carga las entradas guardadas en disco."""
+        self.path = path
+        self.ttl = ttl
+        self.max_devices = max(1, max_devices)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._dirty = False
+        self._touched: Set[str] = set()  # Dispositivos cambiados desde la carga
+        self.load()
+    
+    def get(
+        self,
+        device_name: str,
+        indicator: str,
+        parameters: List[str],
+    ) -> Optional[List[CommandResult]]:
+        """
+        Retorna los resultados cacheados si la configuración no ha cambiado.
+        
+        Returns:
+            Resultados en el orden de ``parameters``, o None si falta alguno,
+            el indicador es distinto o la entrada ha caducado
+        """
+        with self._lock:
+            entry = self._entries.get(device_name)
+            if entry is None:
+                return None
+            
+            if time.time() - entry["stored_at"] > self.ttl:
+                del self._entries[device_name]
+                self._touched.add(device_name)
+                self._dirty = True
+                return None
+            
+            counts: Dict[str, int] = entry["counts"]
+            if entry["indicator"] != indicator or any(p not in counts for p in parameters):
+                return None
+            snapshots: Dict[str, str] = entry.get("snapshots", {})
+            
+            self._entries.move_to_end(device_name)
+        
+        return [
+            CommandResult(
+                device_name=device_name,
+                parameter=param,
+                output_lines=[],
+                line_count=counts[param],
+                success=True,
+                snapshot_id=snapshots.get(param),
+            )
+            for param in parameters
+        ]
+    
+    def put(self, device_name: str, indicator: str, results: List[CommandResult]) -> None:
+        """Guarda los conteos correctos de un dispositivo para su indicador."""
+        counts = {r.parameter: r.line_count for r in results if r.success}
+        if not counts:
+            return
+        # La salida guardada sigue siendo válida mientras no cambie la configuración
+        snapshots = {r.parameter: r.snapshot_id for r in results if r.success and r.snapshot_id}
+        
+        with self._lock:
+            entry = self._entries.get(device_name)
+            if entry is not None and entry["indicator"] == indicator:
+                # Misma configuración: se conservan los parámetros ya conocidos
+                entry["counts"].update(counts)
+                entry.setdefault("snapshots", {}).update(snapshots)
+            else:
+                entry = {"indicator": indicator, "counts": counts, "snapshots": snapshots}
+            entry["stored_at"] = time.time()
+            
+            self._entries[device_name] = entry
+            self._entries.move_to_end(device_name)
+            self._touched.add(device_name)
+            while len(self._entries) > self.max_devices:
+                evicted, _ = self._entries.popitem(last=False)
+                self._touched.add(evicted)
+            self._dirty = True
+    
+    def invalidate(self, device_name: str) -> None:
+        """Elimina la entrada de un dispositivo."""
+        with self._lock:
+            if self._entries.pop(device_name, None) is not None:
+                self._touched.add(device_name)
+                self._dirty = True
+    
+    def load(self) -> None:
+        """Carga la caché desde disco, ignorando ficheros corruptos."""
+        if not self.path.exists():
+            return
+        
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠ No se pudo leer la caché de resultados: {e}")
+            return
+        
+        now = time.time()
+        with self._lock:
+            self._entries = OrderedDict(
+                (name, entry)
+                for name, entry in data.get("devices", {}).items()
+                if now - entry.get("stored_at", 0) <= self.ttl
+            )
+    
+    def save(self) -> None:
+        """
+        Guarda la caché en disco de forma atómica si ha cambiado.
+        
+        Otros procesos (p. ej. otros shards) pueden haber guardado sus
+        dispositivos mientras tanto: se combina con el fichero, solo se
+        sobrescriben los dispositivos que cambiaron en este y el límite de
+        ``max_devices`` se aplica sobre el resultado.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = dict(self._entries)
+            touched = set(self._touched)
+            self._dirty = False
+            self._touched.clear()
+        
+        with locked(self.path):
+            merged = merge_devices(self.path, entries, touched)
+            now = time.time()
+            fresh = sorted(
+                (item for item in merged.items() if now - item[1].get("stored_at", 0) <= self.ttl),
+                key=lambda item: item[1].get("stored_at", 0),
+            )
+            write_atomic(self.path, json.dumps({"devices": dict(fresh[-self.max_devices:])}))
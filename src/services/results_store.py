@@ -0,0 +1,359 @@
+"""Histórico de resultados en SQLite, indexado por ejecución, dispositivo y parámetro."""
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import sqlite3
+import threading
+import time
+
+from ..models.command_result import CommandResult
+from ..config.constants import RESULTS_DB_PATH, RESULTS_STORE_BATCH_SIZE
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    report_path TEXT,
+    interrupted INTEGER NOT NULL DEFAULT 0,
+    successful INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    total_lines INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS devices (
+    device_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS parameters (
+    parameter_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL,
+    device_id INTEGER NOT NULL,
+    parameter_id INTEGER NOT NULL,
+    line_count INTEGER NOT NULL,
+    success INTEGER NOT NULL,
+    error_message TEXT,
+    snapshot_id TEXT,
+    PRIMARY KEY (run_id, device_id, parameter_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_by_series ON results (device_id, parameter_id, run_id);
+"""
+
+RUN_COLUMNS = (
+    "run_id", "started_at", "finished_at", "report_path", "interrupted",
+    "successful", "failed", "total_lines",
+)
+
+
+class ResultsStore:
+    """
+    Guarda los resultados de cada ejecución en una base de datos SQLite.
+    
+    Los resultados se acumulan en memoria y se insertan por lotes, cada
+    lote en una sola transacción. Los nombres de dispositivo y parámetro
+    se guardan una vez en sus tablas y los resultados solo llevan sus
+    identificadores, así que la base crece poco aunque acumule millones
+    de filas. La clave primaria (ejecución, dispositivo, parámetro) sirve
+    para leer y comparar ejecuciones, y el índice (dispositivo, parámetro,
+    ejecución) para la evolución de una serie.
+    
+    Con WAL, las consultas no bloquean a una ejecución en curso y varios
+    procesos (shards) pueden escribir en la misma base.
+    """
+    
+    def __init__(
+        self,
+        path: Path = RESULTS_DB_PATH,
+        batch_size: int = RESULTS_STORE_BATCH_SIZE,
+    ):
+        """Abre (o crea) la base de datos."""
+        self.path = Path(path)
+        self.batch_size = max(1, batch_size)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Las transacciones se abren explícitamente en cada lote
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self._device_ids: Dict[str, int] = {}
+        self._parameter_ids: Dict[str, int] = {}
+    
+    def start_run(self, report_path: Optional[Path] = None) -> int:
+        """Registra una nueva ejecución y retorna su identificador."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (started_at, report_path) VALUES (?, ?)",
+                (time.time(), str(report_path) if report_path is not None else None),
+            )
+            return cursor.lastrowid
+    
+    def add_results(self, run_id: int, results: Iterable[CommandResult]) -> None:
+        """Añade resultados de una ejecución; se escriben al completar un lote."""
+        with self._lock:
+            self._pending.extend(
+                (
+                    run_id,
+                    result.device_name,
+                    result.parameter,
+                    result.line_count,
+                    int(result.success),
+                    result.error_message or None,
+                    result.snapshot_id,
+                )
+                for result in results
+            )
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+    
+    def finish_run(
+        self,
+        run_id: int,
+        successful: int,
+        failed: int,
+        total_lines: int,
+        interrupted: bool = False,
+    ) -> None:
+        """Escribe los resultados pendientes y el resumen de la ejecución."""
+        with self._lock:
+            self._flush()
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ?, interrupted = ?, successful = ?, "
+                "failed = ?, total_lines = ? WHERE run_id = ?",
+                (time.time(), int(interrupted), successful, failed, total_lines, run_id),
+            )
+    
+    def flush(self) -> None:
+        """Escribe los resultados pendientes."""
+        with self._lock:
+            self._flush()
+    
+    def close(self) -> None:
+        """Escribe los resultados pendientes y cierra la base de datos."""
+        with self._lock:
+            self._flush()
+            self._conn.close()
+    
+    def runs(self, limit: int = 20) -> List[dict]:
+        """Últimas ejecuciones, de la más reciente a la más antigua."""
+        rows = self._fetch(
+            "SELECT run_id, started_at, finished_at, report_path, interrupted, "
+            "successful, failed, total_lines FROM runs ORDER BY run_id DESC LIMIT ?",
+            (limit,),
+        )
+        return [dict(zip(RUN_COLUMNS, row)) for row in rows]
+    
+    def latest_run_ids(self, count: int = 2) -> List[int]:
+        """Identificadores de las últimas ejecuciones terminadas, en orden cronológico."""
+        rows = self._fetch(
+            "SELECT run_id FROM runs WHERE finished_at IS NOT NULL "
+            "ORDER BY run_id DESC LIMIT ?",
+            (count,),
+        )
+        return [run_id for (run_id,) in reversed(rows)]
+    
+    def run_results(self, run_id: int) -> List[CommandResult]:
+        """Resultados de una ejecución."""
+        rows = self._fetch(
+            "SELECT d.name, p.name, r.line_count, r.success, r.error_message, r.snapshot_id "
+            "FROM results r "
+            "JOIN devices d ON d.device_id = r.device_id "
+            "JOIN parameters p ON p.parameter_id = r.parameter_id "
+            "WHERE r.run_id = ?",
+            (run_id,),
+        )
+        return [
+            CommandResult(
+                device_name=device,
+                parameter=parameter,
+                output_lines=None,
+                line_count=line_count,
+                success=bool(success),
+                error_message=error_message or "",
+                snapshot_id=snapshot_id,
+            )
+            for device, parameter, line_count, success, error_message, snapshot_id in rows
+        ]
+    
+    def history(
+        self,
+        device: str,
+        parameter: Optional[str] = None,
+        limit: int = 90,
+    ) -> List[dict]:
+        """
+        Evolución de los resultados de un dispositivo en las últimas ejecuciones.
+        
+        Args:
+            device: Nombre del dispositivo
+            parameter: Parámetro concreto; None para todos los del dispositivo
+            limit: Número máximo de ejecuciones
+        
+        Returns:
+            Un diccionario por (ejecución, parámetro), en orden cronológico
+        """
+        device_rows = self._fetch("SELECT device_id FROM devices WHERE name = ?", (device,))
+        if not device_rows:
+            return []
+        device_id = device_rows[0][0]
+        
+        series = "{t}.device_id = ?"
+        series_args = [device_id]
+        if parameter is not None:
+            parameter_rows = self._fetch(
+                "SELECT parameter_id FROM parameters WHERE name = ?", (parameter,)
+            )
+            if not parameter_rows:
+                return []
+            series += " AND {t}.parameter_id = ?"
+            series_args.append(parameter_rows[0][0])
+        
+        # Las últimas ejecuciones de la serie salen del índice (dispositivo, parámetro, ejecución)
+        query = (
+            "SELECT r.run_id, runs.started_at, p.name, r.line_count, r.success, r.error_message, "
+            "       r.snapshot_id "
+            "FROM results r "
+            "JOIN runs ON runs.run_id = r.run_id "
+            "JOIN parameters p ON p.parameter_id = r.parameter_id "
+            f"WHERE {series.format(t='r')} AND r.run_id IN ("
+            f"    SELECT DISTINCT s.run_id FROM results s WHERE {series.format(t='s')} "
+            "    ORDER BY s.run_id DESC LIMIT ?"
+            ") "
+            "ORDER BY r.run_id, p.name"
+        )
+        args = series_args + series_args + [limit]
+        
+        return [
+            {
+                "run_id": run_id,
+                "started_at": started_at,
+                "parameter": parameter_name,
+                "line_count": line_count,
+                "success": bool(success),
+                "error_message": error_message or "",
+                "snapshot_id": snapshot_id,
+            }
+            for run_id, started_at, parameter_name, line_count, success, error_message, snapshot_id
+            in self._fetch(query, args)
+        ]
+    
+    def diff(self, old_run: int, new_run: int) -> List[dict]:
+        """
+        Diferencias entre dos ejecuciones.
+        
+        Returns:
+            Un diccionario por (dispositivo, parámetro) cuyo conteo o estado
+            ha cambiado. ``old`` o ``new`` es None si el par no aparece en
+            esa ejecución; si no, es el conteo (o None si el comando falló,
+            con el error en ``old_error``/``new_error``).
+        """
+        rows = self._fetch(
+            "SELECT d.name, p.name, a.line_count, a.success, a.error_message, "
+            "       b.line_count, b.success, b.error_message "
+            "FROM results a "
+            "LEFT JOIN results b ON b.run_id = ? AND b.device_id = a.device_id "
+            "    AND b.parameter_id = a.parameter_id "
+            "JOIN devices d ON d.device_id = a.device_id "
+            "JOIN parameters p ON p.parameter_id = a.parameter_id "
+            "WHERE a.run_id = ? AND (b.run_id IS NULL OR a.line_count != b.line_count "
+            "    OR a.success != b.success) "
+            "UNION ALL "
+            "SELECT d.name, p.name, NULL, NULL, NULL, b.line_count, b.success, b.error_message "
+            "FROM results b "
+            "JOIN devices d ON d.device_id = b.device_id "
+            "JOIN parameters p ON p.parameter_id = b.parameter_id "
+            "WHERE b.run_id = ? AND NOT EXISTS ("
+            "    SELECT 1 FROM results a WHERE a.run_id = ? "
+            "    AND a.device_id = b.device_id AND a.parameter_id = b.parameter_id"
+            ") "
+            "ORDER BY 1, 2",
+            (new_run, old_run, new_run, old_run),
+        )
+        changes = []
+        for device, parameter, old_count, old_ok, old_error, new_count, new_ok, new_error in rows:
+            changes.append({
+                "device": device,
+                "parameter": parameter,
+                "old": old_count if old_ok else None,
+                "new": new_count if new_ok else None,
+                "old_error": old_error or "",
+                "new_error": new_error or "",
+                "status": _change_status(old_ok, new_ok),
+            })
+        return changes
+    
+    def _migrate(self) -> None:
+        """Actualiza bases creadas por versiones anteriores."""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(results)")}
+        if "snapshot_id" not in columns:
+            self._conn.execute("ALTER TABLE results ADD COLUMN snapshot_id TEXT")
+    
+    def _fetch(self, query: str, args=()) -> List[tuple]:
+        """Ejecuta una consulta y retorna todas sus filas."""
+        with self._lock:
+            return self._conn.execute(query, args).fetchall()
+    
+    def _flush(self) -> None:
+        """Inserta los resultados pendientes en una transacción (con el lock tomado)."""
+        if not self._pending:
+            return
+        
+        pending, self._pending = self._pending, []
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results "
+                "(run_id, device_id, parameter_id, line_count, success, error_message, snapshot_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_id,
+                        self._name_id("devices", "device_id", self._device_ids, device),
+                        self._name_id("parameters", "parameter_id", self._parameter_ids, parameter),
+                        line_count,
+                        success,
+                        error_message,
+                        snapshot_id,
+                    )
+                    for (
+                        run_id, device, parameter, line_count, success, error_message, snapshot_id
+                    ) in pending
+                ],
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            # Los identificadores asignados en la transacción ya no existen
+            self._device_ids.clear()
+            self._parameter_ids.clear()
+            raise
+    
+    def _name_id(self, table: str, id_column: str, ids: Dict[str, int], name: str) -> int:
+        """Identificador de un nombre en su tabla, creándolo si no existe."""
+        name_id = ids.get(name)
+        if name_id is None:
+            self._conn.execute(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", (name,))
+            (name_id,) = self._conn.execute(
+                f"SELECT {id_column} FROM {table} WHERE name = ?", (name,)
+            ).fetchone()
+            ids[name] = name_id
+        return name_id
+
+
+def _change_status(old_ok: Optional[int], new_ok: Optional[int]) -> str:
+    """Tipo de cambio entre dos resultados de la misma serie."""
+    if old_ok is None:
+        return "nuevo"
+    if new_ok is None:
+        return "eliminado"
+    if old_ok and not new_ok:
+        return "fallo"
+    if new_ok and not old_ok:
+        return "recuperado"
+    return "cambio"
@@ -0,0 +1,156 @@
+"""Journal de la ejecución en curso para poder reanudarla tras una interrupción."""
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import os
+import threading
+import time
+
+from ..models.command_result import CommandResult
+from ..models.device import Device
+from ..config.constants import RUN_JOURNAL_PATH
+
+
+# Modos de reanudación
+RESUME = "resume"  # Omite los dispositivos ya completados
+RETRY_FAILED = "retry-failed"  # Omite también los completados sin errores; repite los fallidos
+RESUME_MODES = (RESUME, RETRY_FAILED)
+
+DeviceKey = Tuple[str, Tuple[str, ...]]
+
+
+def device_key(device: Device) -> DeviceKey:
+    """Identifica una fila del inventario: nombre y parámetros."""
+    return device.name, tuple(device.get_parameters_list())
+
+
+class RunJournal:
+    """
+    Registra en disco cada dispositivo en cuanto termina.
+    
+    El journal es un fichero JSONL: una línea de cabecera, una línea por
+    dispositivo completado con sus resultados y una línea final cuando la
+    ejecución termina. Cada línea se escribe y se sincroniza con ``fsync``
+    antes de continuar, así que si el proceso muere (o se cierra la GUI)
+    el journal conserva todos los dispositivos ya completados. Una línea
+    final incompleta se ignora al leerlo.
+    """
+    
+    def __init__(self, path: Path = RUN_JOURNAL_PATH):
+        """Prepara el journal; no se abre hasta ``start``."""
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = None
+    
+    def load(self) -> Dict[DeviceKey, List[CommandResult]]:
+        """Resultados de los dispositivos completados en el journal existente."""
+        completed: Dict[DeviceKey, List[CommandResult]] = {}
+        for record in self._read_records():
+            if record.get("type") != "device":
+                continue
+            key = (record["device"], tuple(record["parameters"]))
+            completed[key] = [
+                CommandResult(
+                    device_name=r["device"],
+                    parameter=r["parameter"],
+                    output_lines=None,
+                    line_count=r["line_count"],
+                    success=r["success"],
+                    error_message=r["error_message"],
+                    snapshot_id=r.get("snapshot_id"),
+                )
+                for r in record["results"]
+            ]
+        return completed
+    
+    def status(self) -> Optional[dict]:
+        """
+        Estado del journal existente, o None si no hay.
+        
+        Returns:
+            Diccionario con ``completed`` (dispositivos), ``failed``
+            (dispositivos con algún error) y ``finished`` (False si la
+            ejecución se interrumpió o el proceso murió)
+        """
+        if not self.path.exists():
+            return None
+        completed = failed = 0
+        finished = False
+        for record in self._read_records():
+            if record.get("type") == "device":
+                completed += 1
+                if not all(r["success"] for r in record["results"]):
+                    failed += 1
+            elif record.get("type") == "finished":
+                finished = not record.get("interrupted", False)
+        return {"completed": completed, "failed": failed, "finished": finished}
+    
+    def start(
+        self,
+        total: int,
+        carried: Iterable[Tuple[Device, List[CommandResult]]] = (),
+    ) -> None:
+        """
+        Empieza un journal nuevo, reemplazando el anterior.
+        
+        Args:
+            total: Número de dispositivos de la ejecución
+            carried: Dispositivos reutilizados del journal anterior; se
+                copian al nuevo para no perderlos si esta ejecución también
+                se interrumpe
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"type": "run", "started_at": time.time(), "total": total}) + "\n")
+            for device, results in carried:
+                f.write(self._device_line(device, results))
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path.replace(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+    
+    def record(self, device: Device, results: List[CommandResult]) -> None:
+        """Añade un dispositivo completado y lo sincroniza en disco."""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(self._device_line(device, results))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+    
+    def finish(self, interrupted: bool = False) -> None:
+        """Marca el final de la ejecución y cierra el journal."""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(
+                json.dumps({"type": "finished", "at": time.time(), "interrupted": interrupted}) + "\n"
+            )
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+    
+    @staticmethod
+    def _device_line(device: Device, results: List[CommandResult]) -> str:
+        record = {
+            "type": "device",
+            "device": device.name,
+            "parameters": device.get_parameters_list(),
+            "results": [result.to_dict() for result in results],
+        }
+        return json.dumps(record, ensure_ascii=False) + "\n"
+    
+    def _read_records(self) -> Iterable[dict]:
+        """Registros del journal; la última línea puede estar a medio escribir."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # Escritura cortada por la interrupción
+                        continue
+        except FileNotFoundError:
+            return
@@ -0,0 +1,264 @@
+"""Pool de sesiones SSH autenticadas que se reutilizan entre consultas."""
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import hashlib
+import hmac
+import os
+import threading
+import time
+
+from ..models.device import Device
+from ..config.constants import (
+    SESSION_POOL_MAX_SESSIONS, SESSION_IDLE_TIMEOUT, SESSION_KEEPALIVE,
+)
+
+
+SessionKey = Tuple[str, str, str, str, bytes]
+ConnectFunc = Callable[[Device, Optional[str], Optional[str], Optional[str]], Tuple[Any, Any]]
+CloseFunc = Callable[[Any, Any], None]
+
+
+class PooledSession:
+    """Sesión del pool: la conexión Netmiko y, si la hay, su canal por el bastion."""
+    
+    __slots__ = ("key", "connection", "channel", "last_used", "in_use", "broken")
+    
+    def __init__(self, key: SessionKey):
+        self.key = key
+        self.connection = None
+        self.channel = None
+        self.last_used = time.monotonic()
+        self.in_use = True
+        self.broken = False
+    
+    def is_alive(self) -> bool:
+        """Comprueba localmente que el transporte SSH sigue activo."""
+        try:
+            transport = self.connection.remote_conn.get_transport()
+            return transport is not None and transport.is_active()
+        except Exception:
+            return False
+
+
+class SessionPool:
+    """
+    Mantiene sesiones de dispositivo abiertas entre consultas.
+    
+    Las sesiones se indexan por (dispositivo, usuario, jump host, usuario
+    del jump host, credenciales) y cada una la usa un solo hilo a la vez:
+    una sesión ya autenticada solo se presta a quien envía las mismas
+    contraseñas. Las contraseñas no se guardan; la clave lleva un HMAC
+    de ambas con un secreto aleatorio del pool. Antes de abrir una sesión
+    que haría superar ``max_sessions`` se cierran las inactivas usadas
+    hace más tiempo (liberando su canal por el bastion); un
+    hilo de mantenimiento cierra las que llevan más de ``idle_timeout``
+    segundos sin usarse o cuyo transporte ha caído.
+    """
+    
+    def __init__(
+        self,
+        connect: ConnectFunc,
+        close: CloseFunc,
+        max_sessions: int = SESSION_POOL_MAX_SESSIONS,
+        idle_timeout: float = SESSION_IDLE_TIMEOUT,
+        keepalive: int = SESSION_KEEPALIVE,
+    ):
+        """
+        Inicializa el pool vacío.
+        
+        Args:
+            connect: Abre una sesión y retorna (conexión, canal)
+            close: Cierra una sesión abierta con ``connect``
+            max_sessions: Sesiones abiertas como máximo
+            idle_timeout: Segundos de inactividad antes de cerrar una sesión
+            keepalive: Segundos entre keepalives SSH (0 = desactivado)
+        """
+        self._connect = connect
+        self._close = close
+        self.max_sessions = max(1, max_sessions)
+        self.idle_timeout = idle_timeout
+        self.keepalive = keepalive
+        
+        self._secret = os.urandom(32)
+        self._sessions: "OrderedDict[SessionKey, PooledSession]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    @contextmanager
+    def session(
+        self,
+        device: Device,
+        jump_host: Optional[str] = None,
+        jump_user: Optional[str] = None,
+        jump_pass: Optional[str] = None,
+    ) -> Iterator[PooledSession]:
+        """
+        Presta una sesión con el dispositivo, abriéndola si no existe.
+        
+        Si el bloque lanza una excepción o marca ``session.broken``, la
+        sesión se cierra en lugar de devolverse al pool.
+        """
+        session = self._acquire(device, jump_host, jump_user, jump_pass)
+        try:
+            yield session
+        except BaseException:
+            session.broken = True
+            raise
+        finally:
+            self._release(session)
+    
+    def close_all(self) -> None:
+        """Cierra todas las sesiones y detiene el mantenimiento."""
+        self._stop.set()
+        with self._cond:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            self._cond.notify_all()
+        for session in sessions:
+            self._close_session(session)
+    
+    def stats(self) -> Dict[str, int]:
+        """Contadores del pool."""
+        with self._cond:
+            return {
+                "sessions": len(self._sessions),
+                "in_use": sum(1 for s in self._sessions.values() if s.in_use),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+    
+    def _acquire(
+        self,
+        device: Device,
+        jump_host: Optional[str],
+        jump_user: Optional[str],
+        jump_pass: Optional[str],
+    ) -> PooledSession:
+        """Retorna una sesión libre para el dispositivo, esperando si está ocupada."""
+        key = (
+            device.name, device.user, jump_host or "", jump_user or "",
+            self._credentials_digest(device.password, jump_pass),
+        )
+        stale = None
+        
+        with self._cond:
+            while True:
+                session = self._sessions.get(key)
+                if session is None:
+                    break
+                if not session.in_use:
+                    if session.is_alive():
+                        session.in_use = True
+                        self._sessions.move_to_end(key)
+                        self.hits += 1
+                        return session
+                    stale = self._sessions.pop(key)
+                    break
+                self._cond.wait()
+            
+            # Se reserva la clave para que otro hilo no abra una segunda sesión
+            session = PooledSession(key)
+            self._sessions[key] = session
+            self.misses += 1
+        
+        if stale is not None:
+            self._close_session(stale)
+        # Antes de conectar: las sesiones inactivas que sobran liberan su
+        # canal por el bastion para la nueva
+        self._evict_over_capacity()
+        
+        try:
+            session.connection, session.channel = self._connect(
+                device, jump_host, jump_user, jump_pass
+            )
+        except BaseException:
+            with self._cond:
+                self._sessions.pop(key, None)
+                self._cond.notify_all()
+            raise
+        
+        if self.keepalive:
+            try:
+                session.connection.remote_conn.get_transport().set_keepalive(self.keepalive)
+            except Exception:
+                pass
+        
+        self._start_reaper()
+        return session
+    
+    def _credentials_digest(self, password: str, jump_pass: Optional[str]) -> bytes:
+        """HMAC de las contraseñas del dispositivo y del jump host."""
+        message = b"\0".join([(password or "").encode("utf-8"), (jump_pass or "").encode("utf-8")])
+        return hmac.new(self._secret, message, hashlib.sha256).digest()
+    
+    def _release(self, session: PooledSession) -> None:
+        """Devuelve la sesión al pool, o la cierra si quedó inservible."""
+        with self._cond:
+            session.in_use = False
+            session.last_used = time.monotonic()
+            discard = session.broken or self._stop.is_set()
+            if discard and self._sessions.get(session.key) is session:
+                del self._sessions[session.key]
+            self._cond.notify_all()
+        
+        if discard:
+            self._close_session(session)
+        else:
+            # Con todas las sesiones en uso el pool pudo superar el máximo
+            self._evict_over_capacity()
+    
+    def _evict_over_capacity(self) -> None:
+        """Cierra las sesiones inactivas más antiguas si se supera el máximo."""
+        evicted: List[PooledSession] = []
+        with self._cond:
+            excess = len(self._sessions) - self.max_sessions
+            for key, session in list(self._sessions.items()):
+                if excess <= 0:
+                    break
+                if not session.in_use:
+                    evicted.append(self._sessions.pop(key))
+                    excess -= 1
+            self.evictions += len(evicted)
+        
+        for session in evicted:
+            self._close_session(session)
+    
+    def _start_reaper(self) -> None:
+        """Arranca el hilo de mantenimiento la primera vez que se abre una sesión."""
+        with self._cond:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(
+                target=self._reap_loop, name="session-pool-reaper", daemon=True
+            )
+        self._reaper.start()
+    
+    def _reap_loop(self) -> None:
+        """Cierra periódicamente las sesiones caducadas o caídas."""
+        interval = max(1.0, min(self.idle_timeout, self.keepalive or self.idle_timeout) / 2)
+        while not self._stop.wait(interval):
+            now = time.monotonic()
+            expired: List[PooledSession] = []
+            with self._cond:
+                for key, session in list(self._sessions.items()):
+                    if session.in_use:
+                        continue
+                    if now - session.last_used > self.idle_timeout or not session.is_alive():
+                        expired.append(self._sessions.pop(key))
+            for session in expired:
+                self._close_session(session)
+    
+    def _close_session(self, session: PooledSession) -> None:
+        """Cierra la conexión de una sesión ignorando errores."""
+        if session.connection is None:
+            return
+        try:
+            self._close(session.connection, session.channel)
+        except Exception:
+            pass
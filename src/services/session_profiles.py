@@ -0,0 +1,181 @@
+"""Perfiles de preparación de sesión para conectar sin descubrir el prompt."""
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+import json
+import re
+import threading
+import time
+
+from ..config.constants import SESSION_PROFILE_CACHE_PATH, SESSION_PROFILE_TIMEOUT
+from .state_file import locked, merge_devices, write_atomic
+
+
+# Última línea con aspecto de prompt ("hostname#", "hostname>")
+_ANY_PROMPT = re.compile(r"\S+[>#]")
+
+
+class SessionProfileCache:
+    """
+    Recuerda el prompt y los comandos de preparación de cada dispositivo.
+    
+    La preparación completa de Netmiko descubre el prompt y ajusta el
+    terminal con varias lecturas temporizadas. Tras la primera sesión
+    correcta se guarda lo que hizo (prompt y comandos enviados) y las
+    conexiones siguientes lo repiten en un solo envío. Si el prompt ya no
+    coincide, la entrada se invalida y se vuelve a la preparación completa.
+    """
+    
+    def __init__(self, path: Path = SESSION_PROFILE_CACHE_PATH):
+        """Inicializa la caché y carga los perfiles guardados en disco."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        self._dirty = False
+        self._touched: Set[str] = set()  # Dispositivos cambiados desde la carga
+        self.load()
+    
+    def get(self, device_name: str, device_type: str) -> Optional[dict]:
+        """Retorna el perfil del dispositivo si se grabó con el mismo driver."""
+        with self._lock:
+            entry = self._entries.get(device_name)
+        if entry is None or entry["device_type"] != device_type:
+            return None
+        return entry
+    
+    def put(
+        self,
+        device_name: str,
+        device_type: str,
+        base_prompt: str,
+        commands: List[str],
+    ) -> None:
+        """Guarda el perfil de un dispositivo."""
+        with self._lock:
+            self._touched.add(device_name)
+            self._entries[device_name] = {
+                "device_type": device_type,
+                "base_prompt": base_prompt,
+                "commands": list(commands),
+                "recorded_at": time.time(),
+            }
+            self._dirty = True
+    
+    def invalidate(self, device_name: str) -> None:
+        """Elimina el perfil de un dispositivo para forzar la preparación completa."""
+        with self._lock:
+            if self._entries.pop(device_name, None) is not None:
+                self._touched.add(device_name)
+                self._dirty = True
+    
+    def record(self, device_name: str, device_type: str, connection) -> None:
+        """
+        Ejecuta la preparación completa de Netmiko y guarda el perfil resultante.
+        
+        Los comandos se obtienen de lo que Netmiko escribe en el canal
+        durante la preparación, así que sirve para cualquier driver.
+        """
+        written: List[str] = []
+        write_channel = connection.write_channel
+        
+        def recording_write(out_data: str) -> None:
+            written.append(out_data)
+            write_channel(out_data)
+        
+        connection.write_channel = recording_write
+        try:
+            connection._try_session_preparation()
+        finally:
+            del connection.write_channel
+        
+        commands = [
+            line.strip()
+            for data in written
+            for line in data.splitlines()
+            if line.strip()
+        ]
+        self.put(device_name, device_type, connection.base_prompt, commands)
+    
+    def load(self) -> None:
+        """Carga la caché desde disco, ignorando ficheros corruptos."""
+        if not self.path.exists():
+            return
+        
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠ No se pudo leer la caché de perfiles de sesión: {e}")
+            return
+        
+        with self._lock:
+            self._entries = dict(data.get("devices", {}))
+    
+    def save(self) -> None:
+        """
+        Guarda la caché en disco de forma atómica si ha cambiado.
+        
+        Otros procesos (p. ej. otros shards) pueden haber guardado sus
+        dispositivos mientras tanto: se combina con el fichero y solo se
+        sobrescriben los dispositivos que cambiaron en este.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = dict(self._entries)
+            touched = set(self._touched)
+            self._dirty = False
+            self._touched.clear()
+        
+        with locked(self.path):
+            merged = merge_devices(self.path, entries, touched)
+            write_atomic(self.path, json.dumps({"devices": merged}))
+
+
+def fast_session_preparation(
+    connection,
+    profile: dict,
+    timeout: float = SESSION_PROFILE_TIMEOUT,
+) -> bool:
+    """
+    Prepara la sesión con un perfil guardado, en un único envío.
+    
+    Envía todos los comandos del perfil seguidos de un retorno de carro y
+    espera a que, tras el eco del último comando, el dispositivo muestre
+    dos veces el prompt guardado. Si mientras tanto el dispositivo queda
+    esperando con otro prompt, o no responde en ``timeout`` segundos, el
+    perfil no sirve.
+    
+    Returns:
+        True si la sesión quedó preparada; False si hay que hacer la
+        preparación completa
+    """
+    base_prompt = profile["base_prompt"]
+    commands = profile["commands"]
+    prompt = re.compile(re.escape(base_prompt) + r"[^\s>#]*[>#]")
+    
+    connection.write_channel(
+        "".join(connection.normalize_cmd(command) for command in commands) + connection.RETURN
+    )
+    
+    deadline = time.monotonic() + timeout
+    output = ""
+    while time.monotonic() < deadline:
+        chunk = connection.read_channel()
+        output += chunk
+        tail = output[output.rfind("\n") + 1:].strip()
+        
+        if prompt.fullmatch(tail):
+            # Prompts que siguen al eco del último comando: el de su salida
+            # y el del retorno de carro final
+            start = output.rfind(commands[-1]) if commands else 0
+            if start >= 0 and len(prompt.findall(output, start)) >= (2 if commands else 1):
+                connection.base_prompt = base_prompt
+                return True
+        elif not chunk and _ANY_PROMPT.fullmatch(tail):
+            # El dispositivo espera con un prompt distinto (hostname cambiado)
+            return False
+        
+        if not chunk:
+            time.sleep(0.01)
+    
+    return False
@@ -0,0 +1,264 @@
+"""Almacén direccionado por contenido de la salida de los comandos."""
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+import hashlib
+import json
+import os
+import threading
+import zlib
+
+from ..config.constants import (
+    SNAPSHOT_STORE_DIR, SNAPSHOT_CHUNK_MIN_LINES, SNAPSHOT_CHUNK_AVG_LINES,
+    SNAPSHOT_CHUNK_MAX_LINES, SNAPSHOT_COMPRESS_LEVEL,
+)
+
+
+class SnapshotStore:
+    """
+    Guarda la salida de cada comando troceada, deduplicada y comprimida.
+    
+    La salida se divide en chunks de líneas completas con cortes definidos
+    por el contenido: se corta tras una línea cuyo hash cumple una
+    condición, así que una línea añadida o borrada solo cambia el chunk
+    que la contiene y el resto de chunks se repite igual entre ejecuciones
+    y entre equipos con configuraciones parecidas. Cada chunk se guarda
+    una sola vez, comprimido con zlib, con su SHA-256 como nombre.
+    
+    Cada salida se describe con un manifiesto (la lista de sus chunks)
+    identificado por el SHA-256 de la salida completa. Una salida idéntica
+    a otra ya guardada no escribe nada, de modo que el espacio y la
+    escritura en disco crecen con los cambios, no con el número de
+    equipos × ejecuciones.
+    
+    Estructura en disco::
+        
+        <root>/chunks/ab/abcdef...     chunk comprimido
+        <root>/manifests/12/1234...    manifiesto comprimido (JSON)
+    """
+    
+    def __init__(
+        self,
+        root: Path = SNAPSHOT_STORE_DIR,
+        min_lines: int = SNAPSHOT_CHUNK_MIN_LINES,
+        avg_lines: int = SNAPSHOT_CHUNK_AVG_LINES,
+        max_lines: int = SNAPSHOT_CHUNK_MAX_LINES,
+        compress_level: int = SNAPSHOT_COMPRESS_LEVEL,
+    ):
+        """Prepara el almacén (los directorios se crean al escribir)."""
+        self.root = Path(root)
+        self.min_lines = max(1, min_lines)
+        self.avg_lines = max(1, avg_lines)
+        self.max_lines = max(self.min_lines, max_lines)
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+        # Chunks que ya se sabe que existen, para no consultar el disco cada vez
+        self._known_chunks: set = set()
+        self._stats = {
+            "snapshots": 0,
+            "new_snapshots": 0,
+            "chunks_written": 0,
+            "chunks_reused": 0,
+            "bytes_in": 0,
+            "bytes_written": 0,
+        }
+    
+    def writer(self) -> "SnapshotWriter":
+        """Retorna un writer para guardar una salida línea a línea."""
+        return SnapshotWriter(self)
+    
+    def put(self, output: str) -> Optional[str]:
+        """Guarda una salida completa y retorna su identificador (None si falla)."""
+        writer = self.writer()
+        writer.add_lines(output.split("\n") if output else [])
+        return writer.close()
+    
+    def get(self, snapshot_id: str) -> str:
+        """Salida guardada con ``snapshot_id``."""
+        return "\n".join(self.iter_lines(snapshot_id))
+    
+    def iter_lines(self, snapshot_id: str) -> Iterator[str]:
+        """
+        Genera las líneas de una salida guardada, chunk a chunk.
+        
+        Raises:
+            KeyError: Si el identificador no existe en el almacén
+        """
+        manifest = self._read_manifest(snapshot_id)
+        for chunk_id in manifest["chunks"]:
+            data = zlib.decompress(self._object_path("chunks", chunk_id).read_bytes())
+            # Cada línea del chunk termina en salto de línea
+            yield from data.decode("utf-8").split("\n")[:-1]
+    
+    def resolve(self, prefix: str) -> str:
+        """
+        Identificador completo a partir de un prefijo (como en git).
+        
+        Raises:
+            KeyError: Si ninguna salida, o más de una, empieza por el prefijo
+        """
+        prefix = prefix.lower()
+        if len(prefix) < 4:
+            raise KeyError("El identificador debe tener al menos 4 caracteres")
+        matches = [
+            path.name
+            for path in (self.root / "manifests" / prefix[:2]).glob(f"{prefix}*")
+            if not path.name.endswith(".tmp")
+        ]
+        if not matches:
+            raise KeyError(f"Snapshot no encontrado: {prefix}")
+        if len(matches) > 1:
+            raise KeyError(f"Prefijo ambiguo: {prefix} ({len(matches)} snapshots)")
+        return matches[0]
+    
+    def exists(self, snapshot_id: str) -> bool:
+        """Indica si la salida está guardada."""
+        return self._object_path("manifests", snapshot_id).exists()
+    
+    def stats(self) -> dict:
+        """Contadores de escritura desde que se creó el almacén."""
+        with self._lock:
+            return dict(self._stats)
+    
+    def _store_chunk(self, data: bytes) -> str:
+        """Guarda un chunk si no existe y retorna su hash."""
+        chunk_id = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            known = chunk_id in self._known_chunks
+        path = self._object_path("chunks", chunk_id)
+        written = 0
+        if not known and not path.exists():
+            written = self._write_object(path, zlib.compress(data, self.compress_level))
+        
+        with self._lock:
+            self._known_chunks.add(chunk_id)
+            self._stats["bytes_in"] += len(data)
+            if written:
+                self._stats["chunks_written"] += 1
+                self._stats["bytes_written"] += written
+            else:
+                self._stats["chunks_reused"] += 1
+        return chunk_id
+    
+    def _store_manifest(self, snapshot_id: str, chunks: List[str], lines: int, size: int) -> None:
+        """Guarda el manifiesto de una salida si no existe."""
+        path = self._object_path("manifests", snapshot_id)
+        written = 0
+        if not path.exists():
+            manifest = json.dumps({"chunks": chunks, "lines": lines, "bytes": size})
+            written = self._write_object(
+                path, zlib.compress(manifest.encode("utf-8"), self.compress_level)
+            )
+        
+        with self._lock:
+            self._stats["snapshots"] += 1
+            if written:
+                self._stats["new_snapshots"] += 1
+                self._stats["bytes_written"] += written
+    
+    def _read_manifest(self, snapshot_id: str) -> dict:
+        path = self._object_path("manifests", snapshot_id)
+        try:
+            return json.loads(zlib.decompress(path.read_bytes()))
+        except FileNotFoundError:
+            raise KeyError(f"Snapshot no encontrado: {snapshot_id}") from None
+    
+    def _object_path(self, kind: str, object_id: str) -> Path:
+        return self.root / kind / object_id[:2] / object_id
+    
+    @staticmethod
+    def _write_object(path: Path, data: bytes) -> int:
+        """Escribe un objeto de forma atómica; retorna los bytes escritos."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Nombre temporal único: varios hilos pueden escribir el mismo objeto
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return len(data)
+
+
+class SnapshotWriter:
+    """
+    Trocea una salida a medida que llegan sus líneas.
+    
+    Solo mantiene en memoria el chunk en curso, así que puede alimentarse
+    desde la lectura en streaming sin acumular la salida completa.
+    """
+    
+    def __init__(self, store: SnapshotStore):
+        self.store = store
+        self._hash = hashlib.sha256()
+        self._chunk: List[bytes] = []
+        self._chunks: List[str] = []
+        self._lines = 0
+        self._size = 0
+        self._first = True
+        self._failed = False
+        self._previous_hash = 0
+        self.snapshot_id: Optional[str] = None
+    
+    def add(self, line: str) -> None:
+        """Añade una línea (sin salto de línea final)."""
+        if self._failed:
+            return
+        data = line.encode("utf-8") + b"\n"
+        # El identificador es el hash de las líneas unidas por saltos de línea
+        self._hash.update(data[:-1] if self._first else b"\n" + data[:-1])
+        self._first = False
+        self._chunk.append(data)
+        self._lines += 1
+        self._size += len(data)
+        
+        # El punto de corte depende de esta línea y de la anterior: las líneas
+        # que se repiten (" shutdown", " exit"...) no cortan siempre igual
+        line_hash = zlib.crc32(data, self._previous_hash)
+        self._previous_hash = zlib.crc32(data)
+        chunk_lines = len(self._chunk)
+        if chunk_lines >= self.store.max_lines or (
+            chunk_lines >= self.store.min_lines
+            and line_hash % self.store.avg_lines == 0
+        ):
+            self._cut()
+    
+    def add_lines(self, lines: Iterable[str]) -> None:
+        """Añade varias líneas."""
+        for line in lines:
+            self.add(line)
+    
+    def tee(self, lines: Iterable[str]) -> Iterator[str]:
+        """Guarda las líneas mientras las deja pasar a quien las consume."""
+        for line in lines:
+            self.add(line)
+            yield line
+    
+    def close(self) -> Optional[str]:
+        """
+        Guarda el último chunk y el manifiesto; retorna el identificador.
+        
+        Un error de disco no interrumpe el comando: se avisa y se retorna
+        None, de modo que el resultado queda sin salida asociada.
+        """
+        if self.snapshot_id is None and not self._failed:
+            self._cut()
+            if self._failed:
+                return None
+            snapshot_id = self._hash.hexdigest()
+            try:
+                self.store._store_manifest(snapshot_id, self._chunks, self._lines, self._size)
+            except OSError as e:
+                self._fail(e)
+                return None
+            self.snapshot_id = snapshot_id
+        return self.snapshot_id
+    
+    def _cut(self) -> None:
+        if self._chunk:
+            try:
+                self._chunks.append(self.store._store_chunk(b"".join(self._chunk)))
+            except OSError as e:
+                self._fail(e)
+            self._chunk = []
+    
+    def _fail(self, error: OSError) -> None:
+        self._failed = True
+        print(f"    ⚠ No se pudo guardar la salida en el almacén de snapshots: {error}")
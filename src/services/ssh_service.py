@@ -1,11 +1,38 @@
 """Servicio para gestionar conexiones SSH y ejecución de comandos."""
-from typing import List, Optional
-from netmiko import ConnectHandler, NetmikoTimeoutException, NetmikoAuthenticationException
-import paramiko
+from concurrent.futures import Future
+from typing import Any, Iterable, List, Optional, Tuple
+from netmiko import (
+    ConnectHandler, SSHDetect, NetmikoTimeoutException, NetmikoAuthenticationException,
+    ReadTimeout,
+)
 import time
 
 from ..models.device import Device
 from ..models.command_result import CommandResult
+from ..models.output_buffer import OutputBuffer
+from ..config.constants import (
+    SNAPSHOT_MODE, SNAPSHOT_COMMAND, SNAPSHOT_READ_TIMEOUT,
+    CHANGE_INDICATOR_COMMAND, CHANGE_INDICATOR_MARKER,
+    RETAIN_OUTPUT_LINES, OUTPUT_BUFFER_COMPRESS, DEVICE_TYPE, STREAMING_OUTPUT,
+)
+from .config_index import is_section_query, match_parameters, split_section_queries
+from .jump_host_pool import JumpHostPool
+from .metrics import Metrics
+from .output_filter import OutputFilter
+from .pacing import CommandPacer
+from .parse_pool import ParsedOutput, ParsePool, when_parsed
+from .platform_cache import PlatformCache
+from .result_cache import ResultCache
+from .session_pool import SessionPool
+from .session_profiles import SessionProfileCache, fast_session_preparation
+from .snapshot_store import SnapshotStore
+from .stream_reader import StreamingCommandReader
+
+
+# Errores que indican que el driver guardado no corresponde al dispositivo:
+# autenticación rechazada o prompt no reconocido (Netmiko lanza ValueError
+# cuando no encuentra el prompt al preparar la sesión)
+PLATFORM_ERRORS = (NetmikoAuthenticationException, ReadTimeout, ValueError)
 
 
 class SSHService:
@@ -19,9 +46,66 @@ class SSHService:
         "huawei": "huawei",
     }
     
-    def __init__(self, device_type: str = "cisco_ios", timeout: int = 30):
-        self.device_type = device_type
+    def __init__(
+        self,
+        device_type: str = DEVICE_TYPE,
+        timeout: int = 30,
+        jump_host_pool: Optional[JumpHostPool] = None,
+        snapshot_mode: bool = SNAPSHOT_MODE,
+        pacer: Optional[CommandPacer] = None,
+        result_cache: Optional[ResultCache] = None,
+        retain_output_lines: bool = RETAIN_OUTPUT_LINES,
+        session_pool: Optional[SessionPool] = None,
+        platform_cache: Optional[PlatformCache] = None,
+        metrics: Optional[Metrics] = None,
+        streaming_output: bool = STREAMING_OUTPUT,
+        session_profiles: Optional[SessionProfileCache] = None,
+        snapshot_store: Optional[SnapshotStore] = None,
+        parse_pool: Optional[ParsePool] = None,
+    ):
+        # Se aceptan también los alias de DEVICE_TYPE_MAP ("arista", "juniper"...)
+        self.device_type = self.DEVICE_TYPE_MAP.get(device_type, device_type)
         self.timeout = timeout
+        self.metrics = metrics or Metrics()
+        self.jump_host_pool = jump_host_pool or JumpHostPool(timeout=timeout, metrics=self.metrics)
+        self.snapshot_mode = snapshot_mode
+        self.pacer = pacer or CommandPacer()
+        self.result_cache = result_cache
+        # Con caché de plataformas, el driver se detecta una vez por dispositivo
+        self.platform_cache = platform_cache
+        # Con perfiles de sesión, las conexiones siguientes omiten el descubrimiento del prompt
+        self.session_profiles = session_profiles
+        # Con pool, las sesiones quedan abiertas entre consultas (modo servicio)
+        self.session_pool = session_pool
+        self.retain_output_lines = retain_output_lines
+        # En streaming, la salida se filtra y cuenta según llega del canal
+        self.streaming_output = streaming_output
+        self.output_filter = OutputFilter()
+        # Con almacén de snapshots, cada resultado referencia la salida completa
+        self.snapshot_store = snapshot_store
+        # Con pool de parseo, la salida completa se filtra en otro proceso
+        # (sustituye al streaming, que filtra en el hilo de E/S)
+        self.parse_pool = parse_pool
+        # Las líneas conservadas se comparten y comprimen en un único buffer
+        self.output_buffer = (
+            OutputBuffer(compress=OUTPUT_BUFFER_COMPRESS) if retain_output_lines else None
+        )
+    
+    def reset_output_buffer(self) -> None:
+        """
+        Empieza un buffer de líneas nuevo para los siguientes resultados.
+        
+        Los resultados anteriores conservan una referencia a su buffer, que
+        se libera con ellos en lugar de acumularse entre ejecuciones.
+        """
+        if self.output_buffer is not None:
+            self.output_buffer = OutputBuffer(compress=OUTPUT_BUFFER_COMPRESS)
+    
+    def close(self) -> None:
+        """Cierra las sesiones del pool y las conexiones con los jump hosts."""
+        if self.session_pool is not None:
+            self.session_pool.close_all()
+        self.jump_host_pool.close_all()
     
     def execute_commands_on_device(
         self,
@@ -32,6 +116,10 @@ class SSHService:
     ) -> List[CommandResult]:
         """
         Ejecuta comandos en un dispositivo, opcionalmente a través de jump host.
+        
+        Con pool de parseo, la función vuelve en cuanto termina la E/S: los
+        resultados cuyo ``parsing`` no es None se completan más tarde
+        (``parse_pool.wait_parsed`` espera a que terminen).
         """
         results: List[CommandResult] = []
         parameters = device.get_parameters_list()
@@ -44,85 +132,27 @@ class SSHService:
         print(f"📡 Conectando a {device.name}...")
         print(f"{'='*70}")
         
-        jump_client = None
-        channel = None
-        
+        device_start = time.perf_counter()
         try:
-            # Si hay jump host configurado (host + user + pass), usamos túnel Paramiko
-            if jump_host and jump_user and jump_pass:
-                print(f"→ Usando jump host: {jump_host}")
-                
-                jump_client = paramiko.SSHClient()
-                jump_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                jump_client.connect(
-                    jump_host,
-                    username=jump_user,
-                    password=jump_pass,
-                    timeout=self.timeout,
-                )
-                
-                transport = jump_client.get_transport()
-                dest_addr = (device.name, 22)
-                local_addr = ("127.0.0.1", 0)
-                channel = transport.open_channel(
-                    "direct-tcpip", dest_addr, local_addr
-                )
-                
-                device_config = {
-                    "device_type": self.device_type,
-                    "host": device.name,
-                    "username": device.user,
-                    "password": device.password,
-                    "timeout": self.timeout,
-                    "sock": channel,  # túnel a través del jump host
-                }
+            if self.session_pool is not None:
+                with self.session_pool.session(
+                    device, jump_host, jump_user, jump_pass
+                ) as session:
+                    self._run_on_connection(
+                        session.connection, device, parameters, results, jump_host
+                    )
+                    # Tras un error la sesión puede quedar en un estado inconsistente
+                    session.broken = any(not r.success for r in results)
             else:
-                # Conexión directa con Netmiko
-                device_config = {
-                    "device_type": self.device_type,
-                    "host": device.name,
-                    "username": device.user,
-                    "password": device.password,
-                    "timeout": self.timeout,
-                }
-            
-            with ConnectHandler(**device_config) as ssh_connection:
-                print(f"✓ Conexión exitosa a {device.name}")
-                
-                for param in parameters:
-                    command = f"show configuration running-config | in {param}"
-                    print(f"\n  → Ejecutando: {command}")
-                    
-                    try:
-                        output = ssh_connection.send_command(
-                            command,
-                            expect_string=r"#",
-                            read_timeout=20,
-                        )
-                        
-                        result = self._process_command_output(
-                            device.name,
-                            param,
-                            output,
-                        )
-                        results.append(result)
-                        
-                        print(f"    ✓ Líneas encontradas: {result.line_count}")
-                        time.sleep(0.5)
-                    
-                    except Exception as cmd_error:
-                        error_msg = f"Error ejecutando comando: {str(cmd_error)}"
-                        print(f"    ✗ {error_msg}")
-                        results.append(
-                            CommandResult(
-                                device_name=device.name,
-                                parameter=param,
-                                output_lines=[],
-                                line_count=0,
-                                success=False,
-                                error_message=error_msg,
-                            )
-                        )
+                ssh_connection, channel = self.open_connection(
+                    device, jump_host, jump_user, jump_pass
+                )
+                try:
+                    self._run_on_connection(
+                        ssh_connection, device, parameters, results, jump_host
+                    )
+                finally:
+                    self.close_connection(ssh_connection, channel)
             
             print(f"\n✓ Comandos completados en {device.name}")
         
@@ -141,16 +171,422 @@ class SSHService:
             print(f"✗ Error en {device.name}: {error_msg}")
             self._add_error_results(results, device, parameters, error_message=error_msg)
         
-        finally:
+        self.metrics.observe(
+            "device",
+            time.perf_counter() - device_start,
+            device.name,
+            jump_host,
+            start=device_start,
+            success=all(r.success for r in results),
+        )
+        return results
+    
+    def open_connection(
+        self,
+        device: Device,
+        jump_host: Optional[str] = None,
+        jump_user: Optional[str] = None,
+        jump_pass: Optional[str] = None,
+    ) -> Tuple[Any, Any]:
+        """
+        Abre y autentica una sesión Netmiko con el dispositivo.
+        
+        Returns:
+            (conexión, canal por el jump host o None); se cierran con
+            ``close_connection``
+        """
+        device_type = self._get_device_type(device, jump_host, jump_user, jump_pass)
+        host, port = device.address
+        channel = None
+        
+        # Si hay jump host configurado (host + user + pass), usamos un canal
+        # del transporte compartido con el bastion
+        if jump_host and jump_user and jump_pass:
+            print(f"→ Usando jump host: {jump_host}")
+            
+            channel = self.jump_host_pool.open_channel(
+                jump_host,
+                jump_user,
+                jump_pass,
+                device.address,
+            )
+            
+            device_config = {
+                "device_type": device_type,
+                "host": host,
+                "port": port,
+                "username": device.user,
+                "password": device.password,
+                "timeout": self.timeout,
+                "sock": channel,  # túnel a través del jump host
+            }
+        else:
+            # Conexión directa con Netmiko
+            device_config = {
+                "device_type": device_type,
+                "host": host,
+                "port": port,
+                "username": device.user,
+                "password": device.password,
+                "timeout": self.timeout,
+            }
+        
+        try:
+            # Equivale a ConnectHandler(**device_config), pero separa la
+            # autenticación de la preparación de la sesión para medirlas
+            ssh_connection = ConnectHandler(auto_connect=False, **device_config)
+            with self.metrics.span("device_auth", device.name, jump_host):
+                ssh_connection._modify_connection_params()
+                ssh_connection.establish_connection()
+            with self.metrics.span("prompt_discovery", device.name, jump_host):
+                self._prepare_session(ssh_connection, device, device_type)
+        except BaseException as e:
+            if channel is not None:
+                self.jump_host_pool.release_channel(channel)
+            if isinstance(e, PLATFORM_ERRORS):
+                self._invalidate_platform(device)
+            raise
+        
+        print(f"✓ Conexión exitosa a {device.name}")
+        return ssh_connection, channel
+    
+    def _prepare_session(self, ssh_connection, device: Device, device_type: str) -> None:
+        """
+        Prepara la sesión, con el perfil guardado del dispositivo si lo hay.
+        
+        Sin perfil (o si el prompt guardado ya no coincide) se hace la
+        preparación completa de Netmiko y se graba el perfil para la
+        siguiente conexión. Si falla, la conexión queda cerrada.
+        """
+        if self.session_profiles is None:
+            ssh_connection._try_session_preparation()
+            return
+        
+        profile = self.session_profiles.get(device.name, device_type)
+        if profile is not None:
             try:
-                if channel is not None:
-                    channel.close()
-                if jump_client is not None:
-                    jump_client.close()
+                if fast_session_preparation(ssh_connection, profile):
+                    return
+                print(f"⚠ El prompt de {device.name} no coincide con el guardado: preparación completa")
+                self.session_profiles.invalidate(device.name)
+                ssh_connection.clear_buffer()
             except Exception:
-                pass
+                ssh_connection.disconnect()
+                raise
         
-        return results
+        self.session_profiles.record(device.name, device_type, ssh_connection)
+    
+    def _get_device_type(
+        self,
+        device: Device,
+        jump_host: Optional[str] = None,
+        jump_user: Optional[str] = None,
+        jump_pass: Optional[str] = None,
+    ) -> str:
+        """Retorna el driver del dispositivo, detectándolo si aún no se conoce."""
+        if self.platform_cache is None:
+            return self.device_type
+        
+        device_type = self.platform_cache.get(device.name)
+        if device_type is not None:
+            return device_type
+        
+        with self.metrics.span("detect", device.name, jump_host):
+            detected = self._detect_device_type(device, jump_host, jump_user, jump_pass)
+        if detected is None:
+            print(f"⚠ Plataforma de {device.name} no identificada: se usa {self.device_type}")
+            self.platform_cache.put(device.name, self.device_type, detected=False)
+            return self.device_type
+        
+        print(f"🔎 Plataforma detectada en {device.name}: {detected}")
+        self.platform_cache.put(device.name, detected)
+        return detected
+    
+    def _detect_device_type(
+        self,
+        device: Device,
+        jump_host: Optional[str] = None,
+        jump_user: Optional[str] = None,
+        jump_pass: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Detecta el driver de Netmiko con SSHDetect en una conexión aparte.
+        
+        Los fallos de conexión o autenticación se propagan, igual que al
+        conectar normalmente.
+        
+        Returns:
+            El driver detectado, o None si no se identifica la plataforma
+        """
+        host, port = device.address
+        device_config = {
+            "device_type": "autodetect",
+            "host": host,
+            "port": port,
+            "username": device.user,
+            "password": device.password,
+            "timeout": self.timeout,
+        }
+        channel = None
+        if jump_host and jump_user and jump_pass:
+            channel = self.jump_host_pool.open_channel(
+                jump_host,
+                jump_user,
+                jump_pass,
+                device.address,
+            )
+            device_config["sock"] = channel
+        
+        try:
+            detector = SSHDetect(**device_config)
+            try:
+                return detector.autodetect()
+            except Exception as e:
+                print(f"⚠ Error detectando la plataforma de {device.name}: {e}")
+                return None
+            finally:
+                detector.connection.disconnect()
+        finally:
+            if channel is not None:
+                self.jump_host_pool.release_channel(channel)
+    
+    def _invalidate_platform(self, device: Device) -> None:
+        """Olvida el driver guardado para que se vuelva a detectar."""
+        if self.platform_cache is not None:
+            self.platform_cache.invalidate(device.name)
+        if self.session_profiles is not None:
+            self.session_profiles.invalidate(device.name)
+    
+    def close_connection(self, ssh_connection, channel=None) -> None:
+        """Cierra una sesión abierta con ``open_connection``."""
+        try:
+            ssh_connection.disconnect()
+        finally:
+            if channel is not None:
+                self.jump_host_pool.release_channel(channel)
+    
+    def _run_on_connection(
+        self,
+        ssh_connection,
+        device: Device,
+        parameters: List[str],
+        results: List[CommandResult],
+        jump_host: Optional[str] = None,
+    ) -> None:
+        """Obtiene los resultados del dispositivo sobre una sesión ya abierta."""
+        indicator = self._get_change_indicator(ssh_connection, device, jump_host)
+        cached_results = self._get_cached_results(device, parameters, indicator)
+        
+        if cached_results is not None:
+            print(f"✓ Sin cambios en {device.name}: se reutilizan resultados en caché")
+            results.extend(cached_results)
+        elif self.snapshot_mode:
+            self._run_snapshot(
+                ssh_connection, device, parameters, results, jump_host
+            )
+        else:
+            flat, sections = split_section_queries(parameters)
+            if not sections:
+                self._run_commands(
+                    ssh_connection, device, parameters, results, jump_host
+                )
+            else:
+                # "| in" no entiende de secciones: las consultas por sección
+                # se resuelven sobre la configuración completa, descargada una vez
+                flat_results: List[CommandResult] = []
+                section_results: List[CommandResult] = []
+                if flat:
+                    self._run_commands(
+                        ssh_connection, device, flat, flat_results, jump_host
+                    )
+                self._run_snapshot(
+                    ssh_connection, device, sections, section_results, jump_host
+                )
+                results.extend(self._merge_results(parameters, flat_results, section_results))
+        
+        if indicator and cached_results is None:
+            # Con pool de parseo, los conteos se guardan cuando terminan de parsearse
+            device_results = list(results)
+            when_parsed(
+                device_results,
+                lambda: self.result_cache.put(device.name, indicator, device_results),
+            )
+    
+    def _run_commands(
+        self,
+        ssh_connection,
+        device: Device,
+        parameters: List[str],
+        results: List[CommandResult],
+        jump_host: Optional[str] = None,
+    ) -> None:
+        """Ejecuta un comando filtrado por cada parámetro."""
+        for param in parameters:
+            command = f"show configuration running-config | in {param}"
+            print(f"\n  → Ejecutando: {command}")
+            
+            try:
+                self.pacer.acquire(device.name, jump_host)
+                command_start = time.perf_counter()
+                if self.streaming_output and self.parse_pool is None:
+                    # Lectura, filtrado y conteo en una sola pasada
+                    with self.metrics.span("command", device.name, jump_host, command=command):
+                        result = self._process_command_lines(
+                            device.name,
+                            param,
+                            StreamingCommandReader(ssh_connection, read_timeout=20).iter_lines(command),
+                        )
+                    self.pacer.record(
+                        device.name, time.perf_counter() - command_start
+                    )
+                else:
+                    with self.metrics.span("command", device.name, jump_host, command=command):
+                        output = ssh_connection.send_command(
+                            command,
+                            expect_string=r"#",
+                            read_timeout=20,
+                        )
+                    self.pacer.record(
+                        device.name, time.perf_counter() - command_start
+                    )
+                    
+                    with self.metrics.span("parse", device.name, jump_host):
+                        result = self._process_command_output(
+                            device.name,
+                            param,
+                            output,
+                        )
+                results.append(result)
+                
+                if result.parsing is None:
+                    print(f"    ✓ Líneas encontradas: {result.line_count}")
+                else:
+                    print("    ⚙ Salida entregada al pool de parseo")
+            
+            except Exception as cmd_error:
+                self.pacer.record(device.name, 0.0, success=False)
+                if isinstance(cmd_error, ReadTimeout):
+                    # El prompt no coincide: posible driver equivocado
+                    self._invalidate_platform(device)
+                error_msg = f"Error ejecutando comando: {str(cmd_error)}"
+                print(f"    ✗ {error_msg}")
+                results.append(
+                    CommandResult(
+                        device_name=device.name,
+                        parameter=param,
+                        output_lines=[],
+                        line_count=0,
+                        success=False,
+                        error_message=error_msg,
+                    )
+                )
+    
+    def _get_change_indicator(
+        self,
+        ssh_connection,
+        device: Device,
+        jump_host: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Obtiene la marca de último cambio de configuración del dispositivo.
+        
+        Returns:
+            La línea indicadora, o None si la caché está desactivada o el
+            dispositivo no la proporciona
+        """
+        if self.result_cache is None:
+            return None
+        
+        try:
+            self.pacer.acquire(device.name, jump_host)
+            with self.metrics.span(
+                "command", device.name, jump_host, command=CHANGE_INDICATOR_COMMAND
+            ):
+                output = ssh_connection.send_command(
+                    CHANGE_INDICATOR_COMMAND,
+                    expect_string=r"#",
+                    read_timeout=20,
+                )
+        except Exception as e:
+            print(f"    ⚠ No se pudo obtener el indicador de cambios: {e}")
+            return None
+        
+        return self._parse_change_indicator(output)
+    
+    def _parse_change_indicator(self, output: str) -> Optional[str]:
+        """Extrae la línea indicadora de cambios de la salida del comando."""
+        for line in output.splitlines():
+            if CHANGE_INDICATOR_MARKER in line:
+                return line.strip()
+        return None
+    
+    def _get_cached_results(
+        self,
+        device: Device,
+        parameters: List[str],
+        indicator: Optional[str],
+    ) -> Optional[List[CommandResult]]:
+        """Retorna los resultados cacheados si el dispositivo no ha cambiado."""
+        if self.result_cache is None or not indicator:
+            return None
+        return self.result_cache.get(device.name, indicator, parameters)
+    
+    def _run_snapshot(
+        self,
+        ssh_connection,
+        device: Device,
+        parameters: List[str],
+        results: List[CommandResult],
+        jump_host: Optional[str] = None,
+    ) -> None:
+        """Descarga la configuración una sola vez y evalúa todos los parámetros."""
+        print(f"\n  → Ejecutando: {SNAPSHOT_COMMAND}")
+        
+        output = None
+        try:
+            self.pacer.acquire(device.name, jump_host)
+            if self.streaming_output and self.parse_pool is None:
+                # Los parámetros se evalúan sobre las líneas según llegan
+                with self.metrics.span("command", device.name, jump_host, command=SNAPSHOT_COMMAND):
+                    reader = StreamingCommandReader(ssh_connection, read_timeout=SNAPSHOT_READ_TIMEOUT)
+                    lines = reader.iter_lines(SNAPSHOT_COMMAND)
+                    writer = self.snapshot_store.writer() if self.snapshot_store else None
+                    if writer is not None:
+                        # Se guarda la configuración completa, antes de filtrarla
+                        lines = writer.tee(lines)
+                    snapshot_results = self._process_snapshot_lines(
+                        device.name,
+                        parameters,
+                        self.output_filter.iter_relevant(lines),
+                    )
+                    if writer is not None:
+                        snapshot_id = writer.close()
+                        for result in snapshot_results:
+                            result.snapshot_id = snapshot_id
+            else:
+                # Sin expect_string: la configuración completa puede contener '#'
+                with self.metrics.span("command", device.name, jump_host, command=SNAPSHOT_COMMAND):
+                    output = ssh_connection.send_command(
+                        SNAPSHOT_COMMAND,
+                        read_timeout=SNAPSHOT_READ_TIMEOUT,
+                    )
+        except Exception as cmd_error:
+            if isinstance(cmd_error, ReadTimeout):
+                self._invalidate_platform(device)
+            error_msg = f"Error ejecutando comando: {str(cmd_error)}"
+            print(f"    ✗ {error_msg}")
+            self._add_error_results(results, device, parameters, error_message=error_msg)
+            return
+        
+        if output is not None:
+            with self.metrics.span("parse", device.name, jump_host):
+                snapshot_results = self._process_snapshot_output(device.name, parameters, output)
+        results.extend(snapshot_results)
+        if any(result.parsing is not None for result in snapshot_results):
+            print("    ⚙ Configuración entregada al pool de parseo")
+            return
+        for result in snapshot_results:
+            print(f"    ✓ Líneas encontradas para {result.parameter}: {result.line_count}")
     
     def _process_command_output(
         self,
@@ -158,28 +594,66 @@ class SSHService:
         parameter: str,
         output: str,
     ) -> CommandResult:
-        """Procesa el output y cuenta líneas relevantes."""
-        all_lines = output.strip().split("\n")
-        
-        filtered_lines = []
-        skip_patterns = [
-            "Building configuration",
-            "Current configuration",
-            "Date:",
-            "!",  # Comentarios de Cisco
-        ]
+        """
+        Procesa el output y cuenta líneas relevantes.
         
-        for line in all_lines:
-            line_stripped = line.strip()
-            if not line_stripped:
-                continue
-            
-            if any(pat.lower() in line_stripped.lower() for pat in skip_patterns):
-                continue
-            
-            filtered_lines.append(line)
+        Con pool de parseo, el resultado queda pendiente (``parsing``) y se
+        completa cuando el pool termina.
+        """
+        if self.parse_pool is not None:
+            future = self.parse_pool.submit(
+                "command", [], output, retain_lines=self.retain_output_lines
+            )
+            return self._deferred_command_result(device_name, parameter, output, future)
         
-        line_count = len(filtered_lines)
+        line_count, filtered_lines = self.output_filter.filter(
+            output,
+            retain_lines=self.retain_output_lines,
+        )
+        return self._command_result(device_name, parameter, output, line_count, filtered_lines)
+    
+    def _deferred_command_result(
+        self,
+        device_name: str,
+        parameter: str,
+        output: str,
+        future: "Future[ParsedOutput]",
+    ) -> CommandResult:
+        """Resultado de un comando cuya salida se está parseando en el pool."""
+        result = self._command_result(device_name, parameter, output, 0, [])
+        return self._deferred_results([result], future)[0]
+    
+    def _command_result(
+        self,
+        device_name: str,
+        parameter: str,
+        output: str,
+        line_count: int,
+        filtered_lines: List[str],
+    ) -> CommandResult:
+        """Resultado de un comando cuya salida ya se ha filtrado."""
+        return CommandResult(
+            device_name=device_name,
+            parameter=parameter,
+            output_lines=filtered_lines,
+            line_count=line_count,
+            success=True,
+            buffer=self.output_buffer,
+            snapshot_id=self.snapshot_store.put(output) if self.snapshot_store else None,
+        )
+    
+    def _process_command_lines(
+        self,
+        device_name: str,
+        parameter: str,
+        lines: Iterable[str],
+    ) -> CommandResult:
+        """Como ``_process_command_output``, consumiendo las líneas según llegan."""
+        writer = self.snapshot_store.writer() if self.snapshot_store else None
+        line_count, filtered_lines = self.output_filter.filter_lines(
+            writer.tee(lines) if writer is not None else lines,
+            retain_lines=self.retain_output_lines,
+        )
         
         return CommandResult(
             device_name=device_name,
@@ -187,7 +661,128 @@ class SSHService:
             output_lines=filtered_lines,
             line_count=line_count,
             success=True,
+            buffer=self.output_buffer,
+            snapshot_id=writer.close() if writer is not None else None,
+        )
+    
+    def _process_snapshot_output(
+        self,
+        device_name: str,
+        parameters: List[str],
+        output: str,
+    ) -> List[CommandResult]:
+        """
+        Evalúa todos los parámetros sobre la configuración completa.
+        
+        Produce los mismos conteos que ejecutar ``| in {param}`` por separado.
+        """
+        if self.parse_pool is not None:
+            future = self.parse_pool.submit(
+                "snapshot", parameters, output, retain_lines=self.retain_output_lines
+            )
+            return self._deferred_snapshot_results(device_name, parameters, output, future)
+        
+        results = self._process_snapshot_lines(
+            device_name, parameters, self.output_filter.iter_lines(output)
+        )
+        if self.snapshot_store is not None:
+            # Todos los parámetros comparten la misma configuración guardada
+            snapshot_id = self.snapshot_store.put(output)
+            for result in results:
+                result.snapshot_id = snapshot_id
+        return results
+    
+    def _deferred_snapshot_results(
+        self,
+        device_name: str,
+        parameters: List[str],
+        output: str,
+        future: "Future[ParsedOutput]",
+    ) -> List[CommandResult]:
+        """Resultados de la configuración completa que se está evaluando en el pool."""
+        snapshot_id = self.snapshot_store.put(output) if self.snapshot_store else None
+        results = self._parsed_results(
+            device_name, parameters, [(0, [])] * len(parameters), snapshot_id
         )
+        return self._deferred_results(results, future)
+    
+    @staticmethod
+    def _deferred_results(
+        results: List[CommandResult],
+        future: "Future[ParsedOutput]",
+    ) -> List[CommandResult]:
+        """
+        Marca los resultados como pendientes del parseo en ``future``.
+        
+        El worker de E/S no espera al pool: los conteos se rellenan cuando
+        termina el parseo y el writer los recoge con ``wait_parsed``.
+        """
+        parsing: Future = Future()
+        
+        def fill(done: Future) -> None:
+            try:
+                for result, (line_count, lines) in zip(results, done.result()):
+                    result.fill(line_count, lines)
+            except Exception as e:
+                for result in results:
+                    result.success = False
+                    result.error_message = f"Error procesando la salida: {str(e)}"
+            parsing.set_result(None)
+        
+        for result in results:
+            result.parsing = parsing
+        future.add_done_callback(fill)
+        return results
+    
+    def _process_snapshot_lines(
+        self,
+        device_name: str,
+        parameters: List[str],
+        relevant_lines: Iterable[str],
+    ) -> List[CommandResult]:
+        """
+        Evalúa todos los parámetros sobre las líneas relevantes.
+        
+        Los parámetros planos se evalúan en una pasada; si hay consultas por
+        sección (``padre >> hijo``) se indexa la configuración una vez.
+        """
+        parsed = match_parameters(parameters, relevant_lines, retain_lines=self.retain_output_lines)
+        return self._parsed_results(device_name, parameters, parsed)
+    
+    def _parsed_results(
+        self,
+        device_name: str,
+        parameters: List[str],
+        parsed: ParsedOutput,
+        snapshot_id: Optional[str] = None,
+    ) -> List[CommandResult]:
+        """Un resultado por parámetro a partir de sus (conteo, líneas)."""
+        return [
+            CommandResult(
+                device_name=device_name,
+                parameter=param,
+                output_lines=matched_lines,
+                line_count=line_count,
+                success=True,
+                buffer=self.output_buffer,
+                snapshot_id=snapshot_id,
+            )
+            for param, (line_count, matched_lines) in zip(parameters, parsed)
+        ]
+    
+    @staticmethod
+    def _merge_results(
+        parameters: List[str],
+        flat_results: List[CommandResult],
+        section_results: List[CommandResult],
+    ) -> List[CommandResult]:
+        """Intercala los resultados planos y por sección en el orden de los parámetros."""
+        flat_iter = iter(flat_results)
+        section_iter = iter(section_results)
+        return [
+            next(section_iter) if is_section_query(param) else next(flat_iter)
+            for param in parameters
+        ]
     
     def _add_error_results(
         self,
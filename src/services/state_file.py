@@ -0,0 +1,116 @@
+"""Ficheros de estado compartidos entre procesos (cachés por dispositivo)."""
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+import json
+import os
+import threading
+import time
+
+from ..config.constants import STATE_LOCK_TIMEOUT
+
+
+# Un lock más antiguo que esto es de un proceso que murió sin borrarlo
+_STALE_LOCK_SECONDS = 60.0
+
+
+@contextmanager
+def locked(path: Path, timeout: float = STATE_LOCK_TIMEOUT) -> Iterator[None]:
+    """
+    Serializa entre procesos la lectura y escritura de un fichero de estado.
+    
+    Usa un fichero ``<nombre>.lock`` creado de forma exclusiva, que
+    funciona igual en Windows y en Linux. Si no se consigue en
+    ``timeout`` segundos se continúa sin él: perder una escritura
+    concurrente es preferible a bloquear el final de la ejecución.
+    """
+    lock_path = path.with_name(path.name + ".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    deadline = time.monotonic() + timeout
+    acquired = False
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            acquired = True
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime > _STALE_LOCK_SECONDS:
+                    lock_path.unlink()
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() >= deadline:
+                print(f"⚠ {lock_path.name} sigue bloqueado; se guarda sin esperar más")
+                break
+            time.sleep(0.05)
+        except OSError:
+            break
+    try:
+        yield
+    finally:
+        if acquired:
+            try:
+                lock_path.unlink()
+            except OSError:
+                pass
+
+
+def write_atomic(path: Path, data: str, mode: Optional[int] = None) -> None:
+    """
+    Escribe el fichero completo en uno temporal y lo reemplaza.
+    
+    El temporal tiene un nombre único por proceso e hilo, así que dos
+    procesos (p. ej. dos shards) nunca escriben en el mismo temporal.
+    
+    Args:
+        mode: Permisos del fichero (p. ej. 0o600); por defecto los del umask
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666 if mode is None else mode)
+    try:
+        with open(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def read_json(path: Path) -> dict:
+    """Lee un fichero JSON; {} si no existe. Lanza OSError/ValueError si está corrupto."""
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data if isinstance(data, dict) else {}
+
+
+def merge_devices(
+    path: Path,
+    entries: Dict[str, dict],
+    touched: Iterable[str],
+) -> Dict[str, dict]:
+    """
+    Combina las entradas por dispositivo de este proceso con las del disco.
+    
+    Otro proceso (p. ej. otro shard) puede haber guardado sus dispositivos
+    desde que este cargó el fichero. Se conservan las entradas del disco
+    y se aplican encima solo las que este proceso añadió, cambió o borró
+    (``touched``). Llamar con el fichero bloqueado (``locked``).
+    """
+    try:
+        on_disk = read_json(path).get("devices", {})
+    except (OSError, ValueError):
+        on_disk = {}
+    
+    touched = set(touched)
+    merged = {name: entry for name, entry in on_disk.items() if name not in touched}
+    for name in touched:
+        if name in entries:
+            merged[name] = entries[name]
+    return merged
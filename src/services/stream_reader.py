@@ -0,0 +1,85 @@
+"""Lectura en streaming de la salida de un comando sobre una sesión Netmiko."""
+from typing import Iterator
+import re
+import select
+import time
+
+from netmiko import ReadTimeout
+
+
+MAX_WAIT = 0.5  # Segundos máximos de espera por datos antes de volver a comprobar el canal
+
+
+class StreamingCommandReader:
+    """
+    Envía un comando y genera las líneas de su salida a medida que llegan.
+    
+    A diferencia de ``send_command``, no acumula la salida completa: solo
+    se mantienen en memoria el último trozo recibido y la línea que aún
+    está incompleta, así que la memoria por sesión no depende del tamaño
+    de la salida. La lectura termina cuando la línea incompleta es el
+    prompt del dispositivo; el eco del comando y el prompt no se generan.
+    """
+    
+    def __init__(self, connection, read_timeout: float = 20):
+        """
+        Args:
+            connection: Sesión Netmiko ya preparada (con ``base_prompt``)
+            read_timeout: Segundos máximos para recibir la salida completa
+        """
+        self.connection = connection
+        self.read_timeout = read_timeout
+        # Netmiko puede recortar base_prompt (IOS lo deja en 16 caracteres)
+        self._prompt = re.compile(re.escape(connection.base_prompt) + r"[^\s>#]*[>#]\s*$")
+    
+    def iter_lines(self, command: str) -> Iterator[str]:
+        """
+        Ejecuta ``command`` y genera cada línea de la salida sin el salto final.
+        
+        Raises:
+            ReadTimeout: Si el prompt no aparece en ``read_timeout`` segundos
+            EOFError: Si el dispositivo cierra la sesión antes del prompt
+        """
+        connection = self.connection
+        connection.write_channel(connection.normalize_cmd(command))
+        deadline = time.monotonic() + self.read_timeout
+        partial = ""
+        echo_pending = True
+        
+        while True:
+            chunk = connection.read_channel()
+            if not chunk:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ReadTimeout(
+                        f"Prompt no detectado tras {self.read_timeout}s ejecutando: {command}"
+                    )
+                self._wait_for_data(min(remaining, MAX_WAIT))
+                continue
+            
+            # Las líneas se cortan en cualquier punto del trozo: la última
+            # parte, sin salto de línea, se completa con el siguiente
+            lines = (partial + chunk).split("\n")
+            partial = lines.pop()
+            for line in lines:
+                if line.endswith("\r"):
+                    line = line[:-1]
+                if echo_pending:
+                    echo_pending = False
+                    if command in line:
+                        continue
+                yield line
+            
+            if self._prompt.search(partial):
+                return
+    
+    def _wait_for_data(self, timeout: float) -> None:
+        """Espera a que el canal tenga datos, o a que se cierre."""
+        channel = getattr(self.connection, "remote_conn", None)
+        if getattr(channel, "eof_received", False) or getattr(channel, "closed", False):
+            raise EOFError("El dispositivo cerró la sesión")
+        try:
+            select.select([channel], [], [], timeout)
+        except (TypeError, ValueError, OSError):
+            # Canal sin descriptor (por ejemplo, telnet): espera corta
+            time.sleep(min(timeout, 0.01))